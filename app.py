@@ -1,34 +1,12 @@
 # app.py
 import os
+import importlib
 import streamlit as st
-from PIL import Image
-import pandas as pd
 from datetime import datetime, timedelta
 import base64 
 import streamlit_cookies_manager 
 import json 
 
-# --- INÍCIO DA CORREÇÃO (Definir Idioma PT-BR) ---
-import locale
-import platform
-
-# Define o locale para Português do Brasil
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-except locale.Error:
-    try:
-        locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil')
-    except locale.Error:
-        print("AVISO: Não foi possível definir o locale para pt-BR.")
-# --- FIM DA CORREÇÃO ---
-
-
-# Importações locais
-from utils.loaders import load_main_base
-from utils.filters import aplicar_filtros
-from pages import inicio, visao_geral, clientes_faturamento, perdas_ganhos, cruzamentos, top10, crowley
-from utils.format import normalize_dataframe
-
 
 # ==================== CONFIGURAÇÕES GERAIS ====================
 st.set_page_config(
@@ -109,6 +87,14 @@ if not st.session_state.authenticated:
 # === O APP PRINCIPAL RODA A PARTIR DAQUI SÓ SE AUTENTICADO ===
 # =============================================================
 
+# Importações locais: só depois do login (pandas e as análises não atrasam a tela de senha)
+from utils.loaders import load_main_base, load_crowley_base
+from utils.filters import aplicar_filtros
+from utils.relatorio import dialogo_relatorio, filtros_relatorio
+from utils.precalculo import precalcular_paginas
+from utils.aquecimento import iniciar_aquecimento
+
+
 def set_favicon(icon_path):
     try:
         if not os.path.exists(icon_path):
@@ -306,8 +292,7 @@ label, .stMarkdown h3, .stMarkdown h4 {
 PALETTE = ["#007dc3", "#00a8e0", "#7ad1e6", "#004b8d", "#0095d9"]
 logo_path = os.path.join("assets", "NOVABRASIL_TH+_LOGOS_VETORIAIS-07.png")
 if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.sidebar.image(logo, width='stretch') 
+    st.sidebar.image(logo_path, width='stretch') 
 
 # ==================== CARREGAMENTO DE DADOS (LÓGICA CORRIGIDA) ====================
 st.title("Dashboard Vendas Ribeirão Preto")
@@ -344,18 +329,29 @@ if df is None or df.empty:
             
     st.stop() 
 
+# Primeira sessão autenticada após iniciar o servidor ou trocar a base: resultados
+# padrão em segundo plano (depois do login, para não disputar CPU com a tela de senha)
+iniciar_aquecimento(df)
+
 
 # ==================== MENU LATERAL (CUSTOMIZADO) ====================
 st.sidebar.title("📋 Navegação")
+# Registro das páginas: nome -> módulo em pages/, importado só quando a página é aberta
+# (a tela de login e o Início não carregam plotly e as demais dependências das análises)
 pages = {
-    "Início": inicio,
-    "Visão Geral": visao_geral,
-    "Clientes & Faturamento": clientes_faturamento,
-    "Perdas & Ganhos": perdas_ganhos,
-    "Cruzamentos & Interseções": cruzamentos,
-    "Top 10": top10,
-    "Crowley ABC": crowley,
+    "Início": "inicio",
+    "Visão Geral": "visao_geral",
+    "Clientes & Faturamento": "clientes_faturamento",
+    "Perdas & Ganhos": "perdas_ganhos",
+    "Cruzamentos & Interseções": "cruzamentos",
+    "Top 10": "top10",
+    "Crowley ABC": "crowley",
+    "Retenção por Coorte": "cohort",
 }
+
+def carregar_pagina(nome):
+    return importlib.import_module(f"pages.{pages[nome]}")
+
 page_display = {
     "Início": "🏠 Início",
     "Visão Geral": "📊 Visão Geral",
@@ -364,6 +360,7 @@ page_display = {
     "Cruzamentos & Interseções": "🔀 Cruzamentos & Interseções",
     "Top 10": "🏆 Top 10",
     "Crowley ABC": "📻 Crowley ABC",
+    "Retenção por Coorte": "🔁 Retenção por Coorte",
 }
 
 query_params = st.query_params
@@ -422,7 +419,8 @@ def modal_boas_vindas():
         * **Perdas & Ganhos:** Monitore Churn (saídas) e Novos Negócios.
         * **Cruzamentos:** Clientes exclusivos vs. compartilhados.
         * **Top 10:** Ranking dos maiores anunciantes.
-        * **Crowley ABC:** Vindo em breve.
+        * **Crowley ABC:** Curva ABC dos clientes e concentração do faturamento por emissora.
+        * **Retenção por Coorte:** Clientes agrupados pela primeira compra e quanto deles segue ativo.
 
         ---
         """)
@@ -465,8 +463,10 @@ if st.session_state.authenticated and should_show_popup:
 
 
 # ==================== ROTEAMENTO ====================
+pagina = carregar_pagina(pagina_ativa)
+
 if pagina_ativa == "Início":
-    pages[pagina_ativa].render(df) 
+    pagina.render(df) 
     st.sidebar.info(f"Registros carregados: {len(df):,}".replace(",", "."))
 else:
     df_filtrado, anos_sel, emis_sel, exec_sel, cli_sel, mes_ini, mes_fim, show_labels = aplicar_filtros(df, cookies)
@@ -477,10 +477,28 @@ else:
     
     st.sidebar.info(f"📊 Registros filtrados: {len(df_filtrado):,}".replace(",", "."))
 
+    # Relatório completo: todas as páginas com os filtros atuais
+    if st.sidebar.button("📑 Relatório completo", width="stretch", type="secondary"):
+        for k in [k for k in st.session_state.keys() if k.startswith("show_") and k.endswith("_export")]:
+            st.session_state[k] = False
+        st.session_state.show_relatorio = True
+
     if pagina_ativa == "Crowley ABC":
-        pages[pagina_ativa].render(df_filtrado)
+        df_crowley, _ = load_crowley_base()
+        pagina.render(df_filtrado, mes_ini, mes_fim, show_labels, df_crowley=df_crowley)
     else:
-        pages[pagina_ativa].render(df_filtrado, mes_ini, mes_fim, show_labels)
+        pagina.render(df_filtrado, mes_ini, mes_fim, show_labels)
+
+    # Um diálogo por vez: a exportação da página aberta depois tem prioridade
+    exportacao_aberta = any(k.startswith("show_") and k.endswith("_export") and v for k, v in st.session_state.items())
+    if exportacao_aberta:
+        st.session_state.show_relatorio = False
+    elif st.session_state.get("show_relatorio", False):
+        df_crowley_rel, _ = load_crowley_base()
+        dialogo_relatorio(df_filtrado, filtros_relatorio(mes_ini, mes_fim, show_labels), df_crowley=df_crowley_rel)
+
+    # Filtros mudaram: as outras páginas são calculadas em segundo plano
+    precalcular_paginas(df_filtrado, mes_ini, mes_fim)
 
 # ==================== RODAPÉ GLOBAL ====================
 st.markdown("---")
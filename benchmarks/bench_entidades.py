@@ -0,0 +1,81 @@
+# benchmarks/bench_entidades.py
+"""
+Confere a resolução de anunciantes (utils/entidades.py) em casos fixos, os
+que devem virar o mesmo cliente e os que não podem ser unidos (o termo que
+sobra é a única diferença entre os nomes), e mede o tempo em nomes sintéticos.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_entidades.py [quantidade]
+Sai com código 1 se algum caso falhar.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.entidades import resolve_entities
+
+MESMO_CLIENTE = [
+    ("Supermercado Savegnago Ltda", "Savegnago Supermercados"),
+    ("Savegnago Ltda - ME", "Savegnago"),
+    ("Casa de Carnes Boi Gordo", "Casa das Carnes Boi Gordo"),
+    ("Silva e Filhos", "Silva Filhos"),
+    ("Drogaria Sao Paulo S.A.", "Drogaria São Paulo"),
+]
+
+CLIENTES_DIFERENTES = [
+    ("Posto E", "Posto A"),
+    ("Posto E", "Posto"),
+    ("Me Leva", "Leva"),
+    ("Sa Imoveis", "Imoveis"),
+    ("Loja 2", "Loja 3"),
+    ("A Casa", "Casa"),
+]
+
+
+def conferir() -> int:
+    nomes = [n for par in MESMO_CLIENTE + CLIENTES_DIFERENTES for n in par]
+    falhas = 0
+    for esperado, pares in ((True, MESMO_CLIENTE), (False, CLIENTES_DIFERENTES)):
+        for a, b in pares:
+            # Cada par sozinho (sem o restante da lista influenciando o canônico)
+            mapa = resolve_entities(pd.Series([a, b]))
+            unidos = mapa[a] == mapa[b]
+            situacao = "ok" if unidos == esperado else "FALHA"
+            falhas += unidos != esperado
+            print(f"  {situacao:<6} {a!r} x {b!r}: {'unidos' if unidos else 'separados'}")
+    # Todos juntos: nenhum par "diferente" pode acabar no mesmo grupo por transitividade
+    mapa = resolve_entities(pd.Series(nomes))
+    for a, b in CLIENTES_DIFERENTES:
+        if mapa[a] == mapa[b]:
+            print(f"  FALHA  {a!r} x {b!r} unidos com a lista completa")
+            falhas += 1
+    return falhas
+
+
+def nomes_sinteticos(quantidade: int) -> pd.Series:
+    rng = np.random.default_rng(0)
+    raizes = [f"Anunciante {i}" for i in range(quantidade // 4)]
+    variantes = ["{}", "{} Ltda", "{} - ME", "Grupo {}", "{} S.A."]
+    escolhidos = rng.choice(len(raizes), quantidade)
+    formatos = rng.choice(len(variantes), quantidade)
+    return pd.Series([variantes[f].format(raizes[r]) for r, f in zip(escolhidos, formatos)])
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print("Casos fixos:")
+    falhas = conferir()
+
+    nomes = nomes_sinteticos(quantidade)
+    inicio = time.perf_counter()
+    mapa = resolve_entities(nomes)
+    print(f"\nTempo ({nomes.nunique()} nomes únicos): {time.perf_counter() - inicio:7.3f}s, "
+          f"{mapa.nunique()} clientes canônicos")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/bench_formatacao.py
+"""
+Confere brl_array (utils/format.py) contra os formatadores por valor que ele
+substituiu (f-string + três replace) em valores de borda (meio centavo,
+meio décimo de milhão, limites das faixas, negativos, NaN) e em valores
+aleatórios, e compara o tempo das duas versões.
+
+Única diferença intencional: valores negativos que arredondam para zero
+saem "R$ 0,00" (o formatador antigo escrevia "R$ -0,00").
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_formatacao.py [quantidade]
+Sai com código 1 se houver divergência.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.format import brl_array
+
+
+def brl_antigo(valor):
+    if pd.isna(valor):
+        return "—"
+    texto = f"R$ {float(valor):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return texto.replace("R$ -0,00", "R$ 0,00")
+
+
+def abrev_antigo(valor):
+    if pd.isna(valor):
+        return "R$ 0"
+    sinal = "-" if valor < 0 else ""
+    absoluto = abs(valor)
+    if absoluto == 0:
+        return "R$ 0"
+    if absoluto >= 1_000_000:
+        return f"{sinal}R$ {absoluto/1_000_000:,.1f} Mi".replace(",", "X").replace(".", ",").replace("X", ".")
+    if absoluto >= 1_000:
+        return f"{sinal}R$ {absoluto/1_000:,.0f} mil".replace(",", "X").replace(".", ",").replace("X", ".")
+    return brl_antigo(valor)
+
+
+def valores_borda() -> np.ndarray:
+    meio_centavo = np.arange(0, 100_000) / 100 + 0.005
+    meio_decimo_mi = (np.arange(10, 5_000) + 0.5) * 100_000
+    limites = [0.0, -0.0, 0.004, -0.004, 0.005, -0.005, 0.015, 0.285, 1.005, 2.675,
+               999.994, 999.995, 999.999, 1_000.0, 999_499.99, 999_500.0, 999_999.99,
+               1_000_000.0, 1_049_999.99, 1_050_000.0, 1e12 + 0.005, np.nan]
+    return np.concatenate([meio_centavo, -meio_centavo, meio_decimo_mi, -meio_decimo_mi, limites])
+
+
+def conferir(nome, valores, novo, antigo) -> int:
+    esperado = [antigo(v) for v in valores]
+    divergentes = [(v, a, b) for v, a, b in zip(valores, novo, esperado) if a != b]
+    print(f"  {nome:<34} {len(valores):>9} valores, {len(divergentes)} divergências")
+    for v, a, b in divergentes[:5]:
+        print(f"      {v!r}: {a!r} != {b!r}")
+    return len(divergentes)
+
+
+def cronometrar(func):
+    inicio = time.perf_counter()
+    func()
+    return time.perf_counter() - inicio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = np.random.default_rng(0)
+    aleatorios = np.concatenate([
+        np.round(rng.uniform(-1e6, 1e6, quantidade // 2), 3),
+        rng.lognormal(10, 3, quantidade - quantidade // 2) * rng.choice([-1, 1], quantidade - quantidade // 2),
+    ])
+    borda = valores_borda()
+
+    print("Paridade com os formatadores antigos:")
+    falhas = 0
+    for nome, valores in (("borda", borda), ("aleatórios", aleatorios)):
+        falhas += conferir(f"completo ({nome})", valores, brl_array(valores), brl_antigo)
+        falhas += conferir(f"abreviado ({nome})", valores, brl_array(valores, abreviado=True), abrev_antigo)
+
+    print("\nTempo (aleatórios, formato completo):")
+    print(f"  brl_array            {cronometrar(lambda: brl_array(aleatorios)):7.3f}s")
+    print(f"  por valor (antigo)   {cronometrar(lambda: [brl_antigo(v) for v in aleatorios]):7.3f}s")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/bench_graficos.py
+"""
+Compara rótulos por anotação (um add_annotation por ponto/célula) com rótulos
+pelo text/texttemplate dos traces (utils/graficos.py): tempo de montagem da
+figura e tamanho do JSON enviado ao navegador.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_graficos.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.format import brl_array
+from utils.graficos import aplicar_rotulos, rotulos_heatmap
+
+
+def _cronometrar(func, repeticoes=1):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def linhas_anotacoes(x, series):
+    fig = go.Figure()
+    for nome, y in series.items():
+        fig.add_trace(go.Scatter(x=x, y=y, name=nome, mode="lines+markers"))
+        for xi, yi, texto in zip(x, y, brl_array(y, abreviado=True)):
+            fig.add_annotation(x=xi, y=yi, text=texto, showarrow=False, yshift=10,
+                               font=dict(size=10, color="black"), bgcolor="rgba(255, 255, 255, 0.7)")
+    return fig
+
+
+def linhas_traces(x, series):
+    fig = go.Figure()
+    for nome, y in series.items():
+        fig.add_trace(go.Scatter(x=x, y=y, name=nome, mode="lines+markers"))
+    return aplicar_rotulos(fig)
+
+
+def heatmap_anotacoes(z, eixos):
+    fig = go.Figure(go.Heatmap(z=z, x=eixos, y=eixos, colorscale="Blues"))
+    textos = brl_array(z, abreviado=True).reshape(z.shape)
+    for i in range(z.shape[0]):
+        for j in range(z.shape[1]):
+            fig.add_annotation(x=eixos[j], y=eixos[i], text=textos[i][j], showarrow=False)
+    return fig
+
+
+def heatmap_traces(z, eixos):
+    fig = go.Figure(go.Heatmap(z=z, x=eixos, y=eixos, colorscale="Blues"))
+    return rotulos_heatmap(fig, brl_array(z, abreviado=True).reshape(z.shape))
+
+
+def _linha(nome, func):
+    tempo, fig = _cronometrar(func)
+    tamanho = len(fig.to_json())
+    print(f"  {nome:<12} montagem {tempo * 1000:8.1f} ms   JSON {tamanho / 1024:8.1f} KiB", flush=True)
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    for n_meses, n_series in [(12, 2), (36, 5), (60, 8)]:
+        x = [f"M{i:03d}" for i in range(n_meses)]
+        series = {f"S{k}": rng.lognormal(11, 1, n_meses) for k in range(n_series)}
+        print(f"Linhas: {n_series} séries x {n_meses} pontos")
+        _linha("anotações", lambda: linhas_anotacoes(x, series))
+        _linha("text", lambda: linhas_traces(x, series))
+
+    for n in [5, 12, 20]:
+        eixos = [f"E{i}" for i in range(n)]
+        z = rng.lognormal(11, 1, (n, n))
+        print(f"Heatmap: {n} x {n}")
+        _linha("anotações", lambda: heatmap_anotacoes(z, eixos))
+        _linha("texttemplate", lambda: heatmap_traces(z, eixos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_importacao.py
+"""
+Tempo de importação até a tela de login e a página Início ficarem prontas,
+cada cenário num interpretador novo (importação a frio, sem sys.modules
+aproveitado), e quais bibliotecas pesadas foram carregadas.
+
+Cenários:
+    Login          imports do app.py antes da tela de senha
+    Início         todos os imports do app.py + a página Início (carregada
+                   pelo roteador)
+    Todas (antigo) todos os imports do app.py + todas as páginas +
+                   plotly.io/openpyxl/PIL, como o app fazia antes do registro
+                   preguiçoso de páginas
+
+O próprio streamlit já importa plotly.graph_objects e plotly.io; eles
+aparecem em todos os cenários.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_importacao.py [repetições]
+"""
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGINAS = ["inicio", "visao_geral", "clientes_faturamento", "perdas_ganhos", "cruzamentos", "top10", "crowley", "cohort"]
+PESADOS = ["plotly.express", "plotly.graph_objects", "plotly.io", "openpyxl", "PIL.Image", "xlsxwriter"]
+
+CODIGO = """
+import json, os, sys, time
+sys.path.insert(0, {raiz!r})
+os.chdir({raiz!r})
+_t0 = time.perf_counter()
+{imports}
+_segundos = time.perf_counter() - _t0
+print(json.dumps({{"segundos": _segundos, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+# Linha do app.py que separa a tela de login do app autenticado
+MARCA_LOGIN = "O APP PRINCIPAL RODA A PARTIR DAQUI"
+
+
+def imports_app() -> tuple:
+    """
+    Instruções de import de nível de módulo do app.py, na ordem do arquivo:
+    (antes da marca do login, todas).
+    """
+    with open(os.path.join(RAIZ, "app.py"), encoding="utf-8") as f:
+        fonte = f.read()
+    linha_login = next((i for i, linha in enumerate(fonte.splitlines(), start=1) if MARCA_LOGIN in linha), None)
+    imports = [no for no in ast.parse(fonte).body if isinstance(no, (ast.Import, ast.ImportFrom))]
+    antes = [no for no in imports if linha_login is None or no.lineno < linha_login]
+    return [ast.unparse(no) for no in antes], [ast.unparse(no) for no in imports]
+
+
+def medir(imports: list, repeticoes: int):
+    codigo = CODIGO.format(raiz=RAIZ, imports="\n".join(imports), pesados=PESADOS)
+    tempos, pesados = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], capture_output=True, text=True, check=True, cwd=RAIZ
+        ).stdout
+        resultado = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(resultado["segundos"])
+        pesados = resultado["pesados"]
+    return statistics.median(tempos), pesados
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    login, app = imports_app()
+    cenarios = {
+        "Login": login,
+        "Início": app + ["import pages.inicio"],
+        "Todas (antigo)": app + [f"import pages.{p}" for p in PAGINAS] + [
+            "import plotly.io", "import openpyxl", "import PIL.Image",
+        ],
+    }
+
+    print(f"Importação a frio, mediana de {repeticoes} execuções\n")
+    print(f"{'Cenário':<16} {'tempo':>9}   bibliotecas pesadas carregadas")
+    for nome, imports in cenarios.items():
+        segundos, pesados = medir(imports, repeticoes)
+        print(f"{nome:<16} {segundos * 1000:7.0f}ms   {', '.join(pesados) or '—'}")
+
+
+if __name__ == "__main__":
+    main()
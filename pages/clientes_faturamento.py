@@ -1,24 +1,168 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-from utils.format import brl, PALETTE
+from dataclasses import dataclass
+from utils.format import brl_array
 from utils.loaders import load_main_base
+from utils.comparativo import TabelaComparativa, build_comparative_table, build_multi_year_table, formatos_exportacao, get_dimension_year_aggregate
+from utils.filters import selecionar_comparacao, anos_comparacao
+from utils.cache import resultado_pagina
+from utils.calendario import GRANULARIDADES, calendar_lookup
+from utils.tabela import tabela_paginada
 # CORREÇÃO: Importa a nova função ZIP
-from utils.export import create_zip_package 
-
-# Função helper de coloração
-def color_delta(val):
-    if pd.isna(val) or val == 0:
-        return ""
-    try:
-        v = float(val)
-        if v > 0:
-            return "color: #16a34a; font-weight: 600;" # verde
-        if v < 0:
-            return "color: #dc2626; font-weight: 600;" # vermelho
-    except (ValueError, TypeError):
-        return ""
-    return ""
+from utils.export import dialogo_exportacao
+
+def _tabela_media_cliente(base_periodo):
+    """1.4: faturamento, clientes e média por cliente de cada emissora, com Totalizador."""
+    t16_raw = base_periodo.groupby("emissora").agg(
+        Faturamento=("faturamento", "sum"),
+        Clientes=("cliente", "nunique")
+    ).reset_index()
+    
+    t16_raw["Média por cliente"] = np.where(
+        t16_raw["Clientes"] == 0, 
+        np.nan, 
+        t16_raw["Faturamento"] / t16_raw["Clientes"]
+    )
+    
+    if not t16_raw.empty:
+        total_fat = t16_raw["Faturamento"].sum()
+        total_cli = t16_raw["Clientes"].sum()
+        total_media = (total_fat / total_cli) if total_cli > 0 else np.nan
+
+        total_row = {
+            "emissora": "Totalizador",
+            "Faturamento": total_fat,
+            "Clientes": total_cli,
+            "Média por cliente": total_media
+        }
+        t16_raw = pd.concat([t16_raw, pd.DataFrame([total_row])], ignore_index=True)
+
+    t16_raw.insert(0, "#", list(range(1, len(t16_raw))) + ["Total"])
+    return t16_raw
+
+
+def _tabela_total_emissora(base_periodo):
+    """1.5: faturamento total por emissora (maior para o menor), com Totalizador."""
+    t15_raw = base_periodo.groupby("emissora", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
+    
+    if not t15_raw.empty:
+        total_row = {
+            "emissora": "Totalizador",
+            "faturamento": t15_raw["faturamento"].sum()
+        }
+        t15_raw = pd.concat([t15_raw, pd.DataFrame([total_row])], ignore_index=True)
+
+    t15_raw.insert(0, "#", list(range(1, len(t15_raw))) + ["Total"])
+    return t15_raw
+
+
+def _tabela_periodo(base_periodo, granularidade):
+    """1.6: faturamento por período do calendário (linhas) e ano (colunas), com Totalizador."""
+    # Agrega por (ano, mês) e junta os atributos do calendário só nas linhas agregadas
+    t14_agg = base_periodo.groupby(["ano", "mes"], as_index=False)["faturamento"].sum()
+    col_rotulo, col_ordem = GRANULARIDADES[granularidade]
+    t14_agg["periodo_nome"] = calendar_lookup(t14_agg["ano"].to_numpy(), t14_agg["mes"].to_numpy(), col_rotulo)
+    t14_agg["ordem"] = calendar_lookup(t14_agg["ano"].to_numpy(), t14_agg["mes"].to_numpy(), col_ordem)
+
+    t14_raw = t14_agg.pivot_table(
+        index=["ordem", "periodo_nome"],
+        columns="ano",
+        values="faturamento",
+        aggfunc="sum",
+        fill_value=0.0
+    )
+
+    if not t14_raw.empty:
+        t14_raw = t14_raw.sort_index(level="ordem")
+        t14_raw.index = t14_raw.index.get_level_values("periodo_nome")
+        t14_raw.index.name = granularidade
+        t14_raw.columns.name = None
+        
+        total_row = t14_raw.sum()
+        total_row.name = "Totalizador"
+        
+        t14_raw = pd.concat([t14_raw, pd.DataFrame([total_row])])
+    return t14_raw
+
+
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (seletores de exibição não entram)
+FILTROS_CLIENTES = ("mes_ini", "mes_fim", "ano_base", "ano_comp")
+
+# 1.7: até 5 anos lado a lado, a partir de 3
+ANOS_PLURIANUAL = 5
+MINIMO_PLURIANUAL = 3
+
+
+@dataclass
+class ResultadoClientes:
+    """Tabelas de Clientes & Faturamento para um recorte da base e um par de anos."""
+    ano_base: int
+    ano_comp: int
+    clientes_emissora: TabelaComparativa   # 1.1
+    fat_emissora: TabelaComparativa        # 1.2
+    fat_executivo: TabelaComparativa       # 1.3
+    media_cliente: pd.DataFrame            # 1.4
+    total_emissora: pd.DataFrame           # 1.5
+    por_periodo: dict                      # 1.6: granularidade -> tabela
+    anos_multi: list
+    plurianual: dict                       # 1.7: (dimensão, métrica) -> TabelaComparativa
+
+
+@resultado_pagina(*FILTROS_CLIENTES)
+def compute_clientes_faturamento(df, filtros) -> ResultadoClientes:
+    """Todas as tabelas da página, incluindo cada agrupamento da 1.6 e cada dimensão/métrica da 1.7."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    anos = sorted(int(a) for a in df["ano"].dropna().unique())
+    ano_base, ano_comp = anos_comparacao(anos, filtros.get("ano_base"), filtros.get("ano_comp"))
+
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+
+    # Agregados por (dimensão, ano): servem todas as comparações da página
+    agregados = {dim: get_dimension_year_aggregate(base_periodo, dim) for dim in ("emissora", "executivo")}
+
+    anos_multi = anos[-ANOS_PLURIANUAL:]
+    plurianual = {}
+    if len(anos_multi) >= MINIMO_PLURIANUAL:
+        plurianual = {
+            (dim, met): build_multi_year_table(agregados[dim], dim, anos_multi, valor=met)
+            for dim in ("emissora", "executivo") for met in ("faturamento", "clientes")
+        }
+
+    return ResultadoClientes(
+        ano_base=ano_base,
+        ano_comp=ano_comp,
+        clientes_emissora=build_comparative_table(agregados["emissora"], "emissora", ano_base, ano_comp, valor="clientes"),
+        fat_emissora=build_comparative_table(agregados["emissora"], "emissora", ano_base, ano_comp),
+        fat_executivo=build_comparative_table(agregados["executivo"], "executivo", ano_base, ano_comp),
+        media_cliente=_tabela_media_cliente(base_periodo),
+        total_emissora=_tabela_total_emissora(base_periodo),
+        por_periodo={g: _tabela_periodo(base_periodo, g) for g in GRANULARIDADES},
+        anos_multi=anos_multi,
+        plurianual=plurianual,
+    )
+
+
+def secao_relatorio(df, filtros):
+    """Tabelas da página para o relatório completo, sem elementos de tela."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    if not df["ano"].notna().any():
+        return {}
+    resultado = compute_clientes_faturamento(df, filtros)
+
+    secao = {
+        "1.1 Clientes (Emissora)": {'df': resultado.clientes_emissora.raw, 'formatos': formatos_exportacao(resultado.clientes_emissora.raw, "clientes")},
+        "1.2 Fat. (Emissora)": {'df': resultado.fat_emissora.raw, 'formatos': formatos_exportacao(resultado.fat_emissora.raw)},
+        "1.3 Fat. (Executivo)": {'df': resultado.fat_executivo.raw, 'formatos': formatos_exportacao(resultado.fat_executivo.raw)},
+        "1.4 Média (Cliente)": {'df': resultado.media_cliente},
+        "1.5 Fat. Total (Emissora)": {'df': resultado.total_emissora},
+        "1.6 Comp. (Período)": {'df': resultado.por_periodo["Mês"].reset_index(), 'formatos': formatos_exportacao(resultado.por_periodo["Mês"])},
+    }
+    if resultado.plurianual:
+        t17_raw = resultado.plurianual[("emissora", "faturamento")].raw
+        secao["1.7 Plurianual (CAGR)"] = {'df': t17_raw, 'formatos': formatos_exportacao(t17_raw)}
+    return secao
 
 
 # --- INÍCIO DA ALTERAÇÃO (Aceita show_labels) ---
@@ -33,6 +177,8 @@ def render(df, mes_ini, mes_fim, show_labels):
     t16_raw = pd.DataFrame()
     t15_raw = pd.DataFrame()
     t14_raw = pd.DataFrame()
+    t17_raw = pd.DataFrame()
+    formatos_1_7 = {}
     # ---
 
     df = df.rename(columns={c: c.lower() for c in df.columns})
@@ -46,65 +192,25 @@ def render(df, mes_ini, mes_fim, show_labels):
     if not anos:
         st.info("Sem anos válidos.")
         return
-    if len(anos) >= 2:
-        ano_base, ano_comp = anos[-2], anos[-1]
-    else:
-        ano_base = ano_comp = anos[-1]
+    ano_base, ano_comp = selecionar_comparacao(anos)
 
-    base_periodo = df[df["mes"].between(mes_ini, mes_fim)]
+    resultado = compute_clientes_faturamento(df, {"mes_ini": mes_ini, "mes_fim": mes_fim, "ano_base": ano_base, "ano_comp": ano_comp})
 
     # ==============================
     # 1.1 Número de Clientes por Emissora
     # ==============================
     st.subheader("1.1 Número de Clientes por Emissora (Comparativo)")
-    base_clientes_raw = (
-        base_periodo.groupby(["emissora", "ano"])["cliente"]
-        .nunique().unstack(fill_value=0).reset_index()
-    )
-
-    for ano in [ano_base, ano_comp]:
-        if ano not in base_clientes_raw.columns:
-            base_clientes_raw[ano] = 0
-
-    base_clientes_raw["Δ"] = base_clientes_raw[ano_comp] - base_clientes_raw[ano_base]
-    base_clientes_raw["Δ%"] = np.where(
-        base_clientes_raw[ano_base] > 0,
-        (base_clientes_raw["Δ"] / base_clientes_raw[ano_base]) * 100,
-        np.nan,
-    )
-    
-    if not base_clientes_raw.empty:
-        total_A = base_clientes_raw[ano_base].sum()
-        total_B = base_clientes_raw[ano_comp].sum()
-        total_delta = total_B - total_A
-        total_pct = (total_delta / total_A * 100) if total_A > 0 else np.nan
-        
-        total_row = {
-            "emissora": "Totalizador",
-            ano_base: total_A,
-            ano_comp: total_B,
-            "Δ": total_delta,
-            "Δ%": total_pct
-        }
-        base_clientes_raw = pd.concat([base_clientes_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-    base_clientes_raw.insert(0, "#", list(range(1, len(base_clientes_raw))) + ["Total"])
-    
-    base_clientes_display = base_clientes_raw.copy()
-    base_clientes_display.columns = base_clientes_display.columns.map(str)
-    base_clientes_display['#'] = base_clientes_display['#'].astype(str)
-
-    styler_1_1 = base_clientes_display.style.map(
-        color_delta, subset=["Δ", "Δ%"]
-    ).format(
-        {"Δ%": lambda x: "—" if pd.isna(x) else f"{x:.2f}%"}
-    )
-    
-    st.dataframe(
-        styler_1_1,
-        hide_index=True,
-        width="stretch",
-        column_config={"#": None} 
+    tabela_1_1 = resultado.clientes_emissora
+    base_clientes_raw = tabela_1_1.raw
+
+    tabela_paginada(
+        tabela_1_1.display,
+        key="tabela_1_1",
+        formatos={str(ano_base): "int", str(ano_comp): "int", "Δ": "int", "Δ%": "pct"},
+        colunas_sinal=["Δ", "Δ%"],
+        coluna_busca="emissora",
+        linha_fixa="Totalizador",
+        column_config={"#": None}
     )
     st.divider()
 
@@ -113,59 +219,17 @@ def render(df, mes_ini, mes_fim, show_labels):
     # 1.2 Faturamento por Emissora (Comparativo)
     # ==============================
     st.subheader("1.2 Faturamento por Emissora (Comparativo)")
-    base_emissora_raw = (
-        base_periodo.groupby(["emissora", "ano"])["faturamento"]
-        .sum().unstack(fill_value=0).reset_index()
-    )
-
-    for ano in [ano_base, ano_comp]:
-        if ano not in base_emissora_raw.columns:
-            base_emissora_raw[ano] = 0.0
-
-    base_emissora_raw["Δ"] = base_emissora_raw[ano_comp] - base_emissora_raw[ano_base]
-    base_emissora_raw["Δ%"] = np.where(
-        base_emissora_raw[ano_base] > 0,
-        (base_emissora_raw["Δ"] / base_emissora_raw[ano_base]) * 100,
-        np.nan,
-    )
-    
-    if not base_emissora_raw.empty:
-        total_A = base_emissora_raw[ano_base].sum()
-        total_B = base_emissora_raw[ano_comp].sum()
-        total_delta = total_B - total_A
-        total_pct = (total_delta / total_A * 100) if total_A > 0 else np.nan
-        
-        total_row = {
-            "emissora": "Totalizador",
-            ano_base: total_A,
-            ano_comp: total_B,
-            "Δ": total_delta,
-            "Δ%": total_pct
-        }
-        base_emissora_raw = pd.concat([base_emissora_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-    base_emissora_raw.insert(0, "#", list(range(1, len(base_emissora_raw))) + ["Total"])
-
-    base_emissora_display = base_emissora_raw.copy()
-    base_emissora_display.columns = base_emissora_display.columns.map(str)
-    base_emissora_display['#'] = base_emissora_display['#'].astype(str)
-
-    styler_1_3 = base_emissora_display.style.map(
-        color_delta, subset=["Δ", "Δ%"]
-    ).format(
-        {
-            str(ano_base): brl,
-            str(ano_comp): brl,
-            "Δ": brl,
-            "Δ%": lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
-        }
-    )
-    
-    st.dataframe(
-        styler_1_3,
-        hide_index=True,
-        width="stretch",
-        column_config={"#": None} 
+    tabela_1_2 = resultado.fat_emissora
+    base_emissora_raw = tabela_1_2.raw
+
+    tabela_paginada(
+        tabela_1_2.display,
+        key="tabela_1_2",
+        formatos={str(ano_base): "brl", str(ano_comp): "brl", "Δ": "brl", "Δ%": "pct"},
+        colunas_sinal=["Δ", "Δ%"],
+        coluna_busca="emissora",
+        linha_fixa="Totalizador",
+        column_config={"#": None}
     )
     st.divider()
 
@@ -174,55 +238,17 @@ def render(df, mes_ini, mes_fim, show_labels):
     # 1.3 Faturamento por Executivo
     # ==============================
     st.subheader("1.3 Faturamento por Executivo")
-    tx_raw = (
-        base_periodo.groupby(["executivo", "ano"])["faturamento"]
-        .sum().unstack(fill_value=0).reset_index()
-    )
-
-    for ano in [ano_base, ano_comp]:
-        if ano not in tx_raw.columns:
-            tx_raw[ano] = 0.0
-
-    tx_raw["Δ"] = tx_raw[ano_comp] - tx_raw[ano_base]
-    tx_raw["Δ%"] = np.where(tx_raw[ano_base] > 0, (tx_raw["Δ"] / tx_raw[ano_base]) * 100, np.nan)
-    
-    if not tx_raw.empty:
-        total_A = tx_raw[ano_base].sum()
-        total_B = tx_raw[ano_comp].sum()
-        total_delta = total_B - total_A
-        total_pct = (total_delta / total_A * 100) if total_A > 0 else np.nan
-        
-        total_row = {
-            "executivo": "Totalizador",
-            ano_base: total_A,
-            ano_comp: total_B,
-            "Δ": total_delta,
-            "Δ%": total_pct
-        }
-        tx_raw = pd.concat([tx_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-    tx_raw.insert(0, "#", list(range(1, len(tx_raw))) + ["Total"])
-
-    tx_display = tx_raw.copy()
-    tx_display.columns = tx_display.columns.map(str)
-    tx_display['#'] = tx_display['#'].astype(str)
-
-    styler_1_2 = tx_display.style.map(
-        color_delta, subset=["Δ", "Δ%"]
-    ).format(
-        {
-            str(ano_base): brl,
-            str(ano_comp): brl,
-            "Δ": brl,
-            "Δ%": lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
-        }
-    )
-
-    st.dataframe(
-        styler_1_2,
-        hide_index=True,
-        width="stretch",
-        column_config={"#": None} 
+    tabela_1_3 = resultado.fat_executivo
+    tx_raw = tabela_1_3.raw
+
+    tabela_paginada(
+        tabela_1_3.display,
+        key="tabela_1_3",
+        formatos={str(ano_base): "brl", str(ano_comp): "brl", "Δ": "brl", "Δ%": "pct"},
+        colunas_sinal=["Δ", "Δ%"],
+        coluna_busca="executivo",
+        linha_fixa="Totalizador",
+        column_config={"#": None}
     )
     st.divider()
 
@@ -231,36 +257,12 @@ def render(df, mes_ini, mes_fim, show_labels):
     # 1.4 Média de investimento por cliente (por emissora)
     # ==============================
     st.subheader("1.4 Média de investimento por cliente (por emissora)")
-    t16_raw = base_periodo.groupby("emissora").agg(
-        Faturamento=("faturamento", "sum"),
-        Clientes=("cliente", "nunique")
-    ).reset_index()
-    
-    t16_raw["Média por cliente"] = np.where(
-        t16_raw["Clientes"] == 0, 
-        np.nan, 
-        t16_raw["Faturamento"] / t16_raw["Clientes"]
-    )
-    
-    if not t16_raw.empty:
-        total_fat = t16_raw["Faturamento"].sum()
-        total_cli = t16_raw["Clientes"].sum()
-        total_media = (total_fat / total_cli) if total_cli > 0 else np.nan
-
-        total_row = {
-            "emissora": "Totalizador",
-            "Faturamento": total_fat,
-            "Clientes": total_cli,
-            "Média por cliente": total_media
-        }
-        t16_raw = pd.concat([t16_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-    t16_raw.insert(0, "#", list(range(1, len(t16_raw))) + ["Total"])
+    t16_raw = resultado.media_cliente
     
     t16_disp = t16_raw.copy()
     t16_disp = t16_disp.rename(columns={"emissora": "Emissora"})
-    t16_disp["Faturamento"] = t16_disp["Faturamento"].apply(brl)
-    t16_disp["Média por cliente"] = t16_disp["Média por cliente"].apply(lambda x: "—" if pd.isna(x) else brl(x))
+    t16_disp["Faturamento"] = brl_array(t16_disp["Faturamento"])
+    t16_disp["Média por cliente"] = brl_array(t16_disp["Média por cliente"])
     t16_disp['#'] = t16_disp['#'].astype(str)
     
     st.dataframe(
@@ -276,20 +278,11 @@ def render(df, mes_ini, mes_fim, show_labels):
     # 1.5 Faturamento por Emissora (Total)
     # ==============================
     st.subheader("1.5 Faturamento por Emissora (Total)")
-    t15_raw = base_periodo.groupby("emissora", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
-    
-    if not t15_raw.empty:
-        total_row = {
-            "emissora": "Totalizador",
-            "faturamento": t15_raw["faturamento"].sum()
-        }
-        t15_raw = pd.concat([t15_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-    t15_raw.insert(0, "#", list(range(1, len(t15_raw))) + ["Total"])
+    t15_raw = resultado.total_emissora
 
     t15_disp = t15_raw.copy()
     t15_disp = t15_disp.rename(columns={"emissora": "Emissora", "faturamento": "Faturamento"})
-    t15_disp["Faturamento"] = t15_disp["Faturamento"].apply(brl)
+    t15_disp["Faturamento"] = brl_array(t15_disp["Faturamento"])
     t15_disp['#'] = t15_disp['#'].astype(str)
     
     st.dataframe(
@@ -302,54 +295,66 @@ def render(df, mes_ini, mes_fim, show_labels):
 
 
     # ==============================
-    # 1.6 Comparativo mês a mês (tabela)
+    # 1.6 Comparativo por período (mês, trimestre ou semestre)
     # ==============================
-    st.subheader("1.6 Comparativo mês a mês (tabela)")
-    
-    mes_map = {
-        1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
-        7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"
-    }
-    
-    base_para_tabela = base_periodo.copy()
-    base_para_tabela["mes_nome"] = base_para_tabela["mes"].map(mes_map)
-
-    t14_agg = (
-        base_para_tabela.groupby(["ano", "mes", "mes_nome"])["faturamento"]
-        .sum()
-        .reset_index()
+    st.subheader("1.6 Comparativo por período (tabela)")
+    granularidade = st.radio(
+        "Agrupar por:", list(GRANULARIDADES.keys()), horizontal=True, key="clientes_granularidade"
     )
 
-    t14_raw = t14_agg.pivot(
-        index=["mes", "mes_nome"],
-        columns="ano",
-        values="faturamento"
-    ).fillna(0.0)
+    t14_raw = resultado.por_periodo[granularidade]
 
     if not t14_raw.empty:
-        t14_raw = t14_raw.sort_index(level="mes")
-        t14_raw.index = t14_raw.index.get_level_values('mes_nome')
-        t14_raw.index.name = "Mês"
-        
-        total_row = t14_raw.sum()
-        total_row.name = "Totalizador"
-        
-        t14_raw = pd.concat([t14_raw, pd.DataFrame([total_row])])
-        
         t14_disp = t14_raw.copy()
         t14_disp.columns = t14_disp.columns.map(str) 
         
-        format_dict = {col: brl for col in t14_disp.columns}
+        for col in t14_disp.columns:
+            t14_disp[col] = brl_array(t14_disp[col])
             
         st.dataframe(
-            t14_disp.style.format(format_dict),
+            t14_disp,
             width="stretch", 
             hide_index=False 
         )
     else:
         st.info("Sem dados suficientes para o comparativo mensal.")
+    st.divider()
 
 
+    # ==============================
+    # 1.7 Visão plurianual (CAGR)
+    # ==============================
+    st.subheader("1.7 Visão plurianual (CAGR)")
+    anos_multi = resultado.anos_multi
+
+    if not resultado.plurianual:
+        st.info("Selecione pelo menos 3 anos no filtro global para a visão plurianual.")
+    else:
+        col_dim, col_met = st.columns(2)
+        with col_dim:
+            dim_multi = st.radio("Dimensão:", ["Emissora", "Executivo"], horizontal=True, key="clientes_multi_dim")
+        with col_met:
+            met_multi = st.radio("Métrica:", ["Faturamento", "Clientes"], horizontal=True, key="clientes_multi_met")
+
+        dimensao_multi = dim_multi.lower()
+        tabela_1_7 = resultado.plurianual[(dimensao_multi, met_multi.lower())]
+        t17_raw = tabela_1_7.raw
+
+        fmt_valor = "brl" if met_multi == "Faturamento" else "int"
+        formatos_1_7 = {str(a): fmt_valor for a in anos_multi}
+        formatos_1_7["CAGR %"] = "pct"
+
+        st.caption(f"CAGR entre {anos_multi[0]} e {anos_multi[-1]} ({len(anos_multi) - 1} períodos).")
+        tabela_paginada(
+            tabela_1_7.display,
+            key="tabela_1_7",
+            formatos=formatos_1_7,
+            colunas_sinal=["CAGR %"],
+            coluna_busca=dimensao_multi,
+            linha_fixa="Totalizador",
+            column_config={"#": None}
+        )
+
     # --- SEÇÃO DE EXPORTAÇÃO ---
     st.divider()
     
@@ -358,68 +363,17 @@ def render(df, mes_ini, mes_fim, show_labels):
 
     if st.session_state.get("show_clientes_export", False):
         
-        @st.dialog("Opções de Exportação - Clientes & Faturamento")
-        def export_dialog():
-            
-            table_options = {
-                "1.1 Clientes (Emissora)": {'df': base_clientes_raw},
-                "1.2 Fat. (Emissora)": {'df': base_emissora_raw},
-                "1.3 Fat. (Executivo)": {'df': tx_raw},
+        dialogo_exportacao(
+            "Clientes & Faturamento",
+            {
+                "1.1 Clientes (Emissora)": {'df': base_clientes_raw, 'formatos': formatos_exportacao(base_clientes_raw, "clientes")},
+                "1.2 Fat. (Emissora)": {'df': base_emissora_raw, 'formatos': formatos_exportacao(base_emissora_raw)},
+                "1.3 Fat. (Executivo)": {'df': tx_raw, 'formatos': formatos_exportacao(tx_raw)},
                 "1.4 Média (Cliente)": {'df': t16_raw},
                 "1.5 Fat. Total (Emissora)": {'df': t15_raw},
-                "1.6 Comp. (Mês a Mês)": {'df': t14_raw.reset_index()},
-            }
-            
-            # --- Adicionar gráficos aqui se necessário ---
-            
-            available_options = []
-            for name, data in table_options.items():
-                if data.get('df') is not None and not data['df'].empty:
-                    available_options.append(name)
-                # Não há gráficos nesta página para verificar 'fig'
-
-            if not available_options:
-                st.warning("Nenhuma tabela com dados foi gerada nesta página.")
-                if st.button("Fechar", type="secondary"):
-                    st.session_state.show_clientes_export = False
-                    st.rerun()
-                return
-
-            st.write("Selecione os itens para incluir no **Pacote de Arquivos (.zip)**:")
-            
-            selected_names = st.multiselect(
-                "Itens para exportar",
-                options=available_options,
-                default=available_options
-            )
-            
-            tables_to_export = {}
-            for name in selected_names:
-                # Passa o df
-                if name in table_options:
-                    tables_to_export[name] = table_options[name]
-
-            if not tables_to_export:
-                st.error("Selecione pelo menos um item.")
-                return
-
-            try:
-                # CHAMADA CORRIGIDA: usa create_zip_package
-                zip_data = create_zip_package(tables_to_export)
-                
-                st.download_button(
-                    label="Clique para baixar o pacote de arquivos",
-                    data=zip_data,
-                    file_name="Dashboard_Clientes_Faturamento.zip",
-                    mime="application/zip",
-                    on_click=lambda: st.session_state.update(show_clientes_export=False),
-                    type="secondary" # Mantém o estilo secundário
-                )
-            except Exception as e:
-                st.error(f"Erro ao gerar o pacote ZIP: {e}")
-
-            if st.button("Cancelar", key="cancel_export", type="secondary"):
-                st.session_state.show_clientes_export = False
-                st.rerun()
-
-        export_dialog()
\ No newline at end of file
+                "1.6 Comp. (Período)": {'df': t14_raw.reset_index(), 'formatos': formatos_exportacao(t14_raw)},
+                "1.7 Plurianual (CAGR)": {'df': t17_raw, 'formatos': formatos_1_7},
+            },
+            estado="show_clientes_export",
+            file_name="Dashboard_Clientes_Faturamento.zip",
+        )
\ No newline at end of file
@@ -0,0 +1,162 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from dataclasses import dataclass
+from utils.cache import resultado_pagina
+from utils.format import brl_array
+from utils.cohort import get_cohort_matrix
+from utils.export import dialogo_exportacao
+
+
+def _fig_coorte(matriz, metrica, show_labels):
+    if metrica == "Clientes":
+        hover = "<b>Coorte %{y}</b><br>%{x}: %{z:,.0f} clientes<extra></extra>"
+        texttemplate = "%{z:,.0f}"
+    elif metrica == "Faturamento":
+        hover = "<b>Coorte %{y}</b><br>%{x}: R$ %{z:,.2f}<extra></extra>"
+        texttemplate = "%{z:,.0f}"
+    else:
+        hover = "<b>Coorte %{y}</b><br>%{x}: %{z:.1f}%<extra></extra>"
+        texttemplate = "%{z:.1f}%"
+
+    fig_coorte = go.Figure(
+        data=go.Heatmap(
+            z=matriz.values,
+            x=list(matriz.columns),
+            y=list(matriz.index),
+            colorscale="Blues",
+            hovertemplate=hover,
+            texttemplate=texttemplate if show_labels else None,
+            showscale=True,
+        )
+    )
+    fig_coorte.update_layout(
+        height=max(320, 40 * len(matriz.index) + 120),
+        template="plotly_white",
+        separators=",.",
+        margin=dict(l=0, r=10, t=10, b=0),
+        xaxis=dict(title="Períodos após a primeira compra", side="top"),
+        yaxis=dict(title="Coorte", autorange="reversed", type="category"),
+    )
+    return fig_coorte
+
+
+def _exportacao_matrizes(clientes_raw, faturamento_raw, retencao_raw):
+    return {
+        "Coortes - Clientes": {'df': clientes_raw.reset_index(), 'formatos': dict.fromkeys(clientes_raw.columns, "int")},
+        "Coortes - Faturamento": {'df': faturamento_raw.reset_index(), 'formatos': dict.fromkeys(faturamento_raw.columns, "brl")},
+        "Coortes - Retenção (%)": {'df': retencao_raw.reset_index(), 'formatos': dict.fromkeys(retencao_raw.columns, "pct")},
+    }
+
+
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (a métrica só escolhe qual matriz exibir)
+FILTROS_COORTE = ("mes_ini", "mes_fim", "granularidade_coorte")
+
+
+@dataclass
+class ResultadoCoorte:
+    """Matrizes coorte × períodos após a primeira compra de um recorte da base."""
+    granularidade: str
+    clientes: pd.DataFrame
+    faturamento: pd.DataFrame
+    retencao: pd.DataFrame
+
+    def matriz(self, metrica: str) -> pd.DataFrame:
+        return {"Clientes": self.clientes, "Faturamento": self.faturamento}.get(metrica, self.retencao)
+
+
+@resultado_pagina(*FILTROS_COORTE)
+def compute_cohort(df, filtros) -> ResultadoCoorte:
+    """As três matrizes de coorte (clientes, faturamento, retenção) na granularidade pedida."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+    granularidade = filtros.get("granularidade_coorte") or "ano"
+    matrizes = get_cohort_matrix(base_periodo, granularidade)
+    return ResultadoCoorte(granularidade, matrizes["clientes"], matrizes["faturamento"], matrizes["retencao"])
+
+
+def secao_relatorio(df, filtros):
+    """Matrizes de coorte e mapa de retenção para o relatório completo, sem elementos de tela."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    if not df["mes"].between(filtros["mes_ini"], filtros["mes_fim"]).any():
+        return {}
+
+    resultado = compute_cohort(df, filtros)
+    if resultado.clientes.empty:
+        return {}
+    secao = _exportacao_matrizes(resultado.clientes, resultado.faturamento, resultado.retencao)
+    secao["Coortes (Gráfico)"] = {'fig': _fig_coorte(resultado.retencao, "Retenção (%)", filtros.get("show_labels", False))}
+    return secao
+
+
+def render(df, mes_ini, mes_fim, show_labels):
+    st.header("Retenção por Coorte")
+    st.caption("Clientes agrupados pelo período da primeira compra dentro dos filtros aplicados.")
+
+    clientes_raw = pd.DataFrame()
+    faturamento_raw = pd.DataFrame()
+    retencao_raw = pd.DataFrame()
+    fig_coorte = go.Figure()
+
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+
+    if "cliente" not in df.columns or "faturamento" not in df.columns:
+        st.error("Colunas obrigatórias 'Cliente' e 'Faturamento' ausentes.")
+        return
+
+    if not df["mes"].between(mes_ini, mes_fim).any():
+        st.info("Sem dados para o período selecionado.")
+        return
+
+    col1, col2 = st.columns(2)
+    granularidade_label = col1.radio("Coorte por", ["Ano", "Mês"], horizontal=True, key="coorte_granularidade")
+    metrica = col2.radio(
+        "Métrica", ["Retenção (%)", "Clientes", "Faturamento"], horizontal=True, key="coorte_metrica"
+    )
+    granularidade = "mes" if granularidade_label == "Mês" else "ano"
+
+    resultado = compute_cohort(df, {"mes_ini": mes_ini, "mes_fim": mes_fim, "granularidade_coorte": granularidade})
+    clientes_raw = resultado.clientes
+    faturamento_raw = resultado.faturamento
+    retencao_raw = resultado.retencao
+
+    if clientes_raw.empty:
+        st.info("Sem dados suficientes para montar as coortes.")
+        return
+
+    matriz = resultado.matriz(metrica)
+
+    st.markdown(f"<p class='custom-chart-title'>Matriz de Coortes - {metrica}</p>", unsafe_allow_html=True)
+
+    fig_coorte = _fig_coorte(matriz, metrica, show_labels)
+    st.plotly_chart(fig_coorte, width="stretch")
+
+    st.subheader("Tabela da coorte")
+    tabela = matriz.copy()
+    if metrica == "Faturamento":
+        tabela = tabela.apply(lambda col: brl_array(col, na_rep=""))
+    elif metrica == "Clientes":
+        tabela = tabela.apply(lambda col: col.map(lambda x: "" if pd.isna(x) else f"{x:,.0f}".replace(",", ".")))
+    else:
+        tabela = tabela.apply(lambda col: col.map(lambda x: "" if pd.isna(x) else f"{x:.1f}%"))
+    st.dataframe(tabela, width="stretch")
+
+
+    # --- SEÇÃO DE EXPORTAÇÃO ---
+    st.divider()
+
+    if st.button("📥 Exportar Dados da Página", type="secondary"):
+        st.session_state.show_cohort_export = True
+
+    if st.session_state.get("show_cohort_export", False):
+
+        dialogo_exportacao(
+            "Retenção por Coorte",
+            {
+                **_exportacao_matrizes(clientes_raw, faturamento_raw, retencao_raw),
+                "Coortes (Gráfico)": {'fig': fig_coorte},
+            },
+            estado="show_cohort_export",
+            file_name="Dashboard_Coortes.zip",
+        )
@@ -1,5 +1,304 @@
 import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from dataclasses import dataclass
+from utils.cache import resultado_pagina
+from utils.format import brl_array, normalize_key, PALETTE
+from utils.abc import get_abc_classification, CORTE_A_PADRAO, CORTE_B_PADRAO, TOP_K_PADRAO
+from utils.crowley import get_share_comparison
+from utils.export import dialogo_exportacao
 
-def render(df=None, df_crowley=None):
+
+def _fig_share(share_raw, show_labels):
+    fig_share = go.Figure()
+    fig_share.add_trace(go.Bar(
+        x=share_raw["Emissora"], y=share_raw["Share de Mercado (%)"],
+        name="Share de Mercado", marker_color=PALETTE[3],
+    ))
+    fig_share.add_trace(go.Bar(
+        x=share_raw["Emissora"], y=share_raw["Share de Faturamento (%)"],
+        name="Share de Faturamento", marker_color=PALETTE[1],
+    ))
+    fig_share.update_layout(
+        barmode="group", height=400, template="plotly_white", separators=",.",
+        legend=dict(orientation="h", y=1.1), yaxis=dict(ticksuffix="%"),
+    )
+    if show_labels:
+        fig_share.update_traces(texttemplate="%{y:.1f}%", textposition="outside")
+    return fig_share
+
+
+def _crowley_periodo(df_crowley, base_periodo, mes_ini, mes_fim):
+    """
+    Base Crowley restrita aos anos, às emissoras da base de vendas filtrada e
+    aos meses do filtro: share de mercado e share de faturamento ficam sobre
+    o mesmo conjunto de emissoras.
+    """
+    anos_vendas = base_periodo["ano"].unique()
+    emissoras = normalize_key(pd.Series(base_periodo["emissora"].unique(), dtype=object))
+    return df_crowley[
+        df_crowley["Ano"].isin(anos_vendas)
+        & df_crowley["Mes"].between(mes_ini, mes_fim)
+        & normalize_key(df_crowley["Emissora"].astype(object)).isin(emissoras)
+    ]
+
+
+# Formatos do Excel que o nome da coluna não revela (% acumulado da curva ABC)
+FORMATOS_CLASSIFICACAO = {"acumulado": "pct"}
+
+
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (emissora/ano da curva só consultam a classificação)
+FILTROS_CROWLEY = ("mes_ini", "mes_fim", "corte_a", "corte_b", "top_k")
+
+
+@dataclass
+class ResultadoCrowley:
+    """Classificação ABC, concentração e share de mercado de um recorte da base."""
+    corte_a: float
+    corte_b: float
+    top_k: int
+    classificacao: pd.DataFrame
+    concentracao: pd.DataFrame
+    tem_crowley: bool            # False sem base Crowley carregada
+    share: pd.DataFrame
+    oportunidades: pd.DataFrame
+
+
+@resultado_pagina(*FILTROS_CROWLEY)
+def compute_crowley(df, filtros, df_crowley=None) -> ResultadoCrowley:
+    """Curva ABC de todas as emissoras × anos e comparação com a base Crowley (se houver)."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+
+    corte_a = filtros.get("corte_a") or CORTE_A_PADRAO
+    corte_b = max(filtros.get("corte_b") or CORTE_B_PADRAO, corte_a)
+    top_k = filtros.get("top_k") or TOP_K_PADRAO
+    classificacao_raw, concentracao_raw = get_abc_classification(base_periodo, corte_a, corte_b, top_k)
+
+    tem_crowley = df_crowley is not None and not df_crowley.empty
+    share_raw, oportunidades_raw = pd.DataFrame(), pd.DataFrame()
+    if tem_crowley:
+        crowley_periodo = _crowley_periodo(df_crowley, base_periodo, filtros["mes_ini"], filtros["mes_fim"])
+        share_raw, oportunidades_raw = get_share_comparison(base_periodo, crowley_periodo)
+
+    return ResultadoCrowley(
+        corte_a=corte_a,
+        corte_b=corte_b,
+        top_k=top_k,
+        classificacao=classificacao_raw,
+        concentracao=concentracao_raw,
+        tem_crowley=tem_crowley,
+        share=share_raw,
+        oportunidades=oportunidades_raw,
+    )
+
+
+def curva_abc(resultado, emis, ano):
+    """Curva ABC de uma emissora no ano e o resumo por classe (quantidade e % de clientes e faturamento)."""
+    classificacao = resultado.classificacao
+    curva = classificacao[(classificacao["emissora"] == emis) & (classificacao["ano"] == ano)]
+    if curva.empty:
+        return curva, pd.DataFrame()
+
+    resumo_raw = curva.groupby("classe").agg(
+        Clientes=("cliente", "size"),
+        Faturamento=("faturamento", "sum"),
+    ).reindex(["A", "B", "C"], fill_value=0).reset_index().rename(columns={"classe": "Classe"})
+    resumo_raw["% Clientes"] = resumo_raw["Clientes"] / resumo_raw["Clientes"].sum() * 100
+    resumo_raw["% Faturamento"] = resumo_raw["Faturamento"] / resumo_raw["Faturamento"].sum() * 100
+    return curva, resumo_raw
+
+
+def secao_relatorio(df, filtros, df_crowley=None):
+    """Classificação ABC, concentração e share de mercado para o relatório completo, sem elementos de tela."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    if not df["mes"].between(filtros["mes_ini"], filtros["mes_fim"]).any():
+        return {}
+    resultado = compute_crowley(df, filtros, df_crowley=df_crowley)
+
+    secao = {
+        "Concentração (Emissoras)": {'df': resultado.concentracao},
+        "Classificação ABC (Clientes)": {'df': resultado.classificacao, 'formatos': FORMATOS_CLASSIFICACAO},
+    }
+    if resultado.tem_crowley:
+        secao["Share Mercado vs Faturamento"] = {'df': resultado.share}
+        if not resultado.share.empty:
+            secao["Share Mercado (Gráfico)"] = {'fig': _fig_share(resultado.share, filtros.get("show_labels", False))}
+        secao["Anunciantes sem Faturamento"] = {'df': resultado.oportunidades}
+    return secao
+
+
+def render(df, mes_ini, mes_fim, show_labels, df_crowley=None):
     st.header("Crowley ABC")
-    st.info("⚙️ Módulo Crowley desativado temporariamente. Em breve voltará a funcionar.")
+
+    classificacao_raw = pd.DataFrame()
+    concentracao_raw = pd.DataFrame()
+    resumo_raw = pd.DataFrame()
+    share_raw = pd.DataFrame()
+    oportunidades_raw = pd.DataFrame()
+    fig_pareto = go.Figure()
+    fig_share = go.Figure()
+
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+
+    if "cliente" not in df.columns or "emissora" not in df.columns or "faturamento" not in df.columns:
+        st.error("Colunas obrigatórias 'Cliente', 'Emissora' e 'Faturamento' ausentes.")
+        return
+
+    if not df["mes"].between(mes_ini, mes_fim).any():
+        st.info("Sem dados para o período selecionado.")
+        return
+
+    # ==============================
+    # Parâmetros da curva ABC
+    # ==============================
+    col1, col2, col3 = st.columns(3)
+    corte_a = col1.slider("Corte classe A (% acumulado)", 50, 95, int(CORTE_A_PADRAO), step=5, key="abc_corte_a")
+    corte_b = col2.slider("Corte classe B (% acumulado)", 50, 100, int(CORTE_B_PADRAO), step=5, key="abc_corte_b")
+    top_k = col3.selectbox("Top-k para concentração", [5, 10, 20], index=[5, 10, 20].index(TOP_K_PADRAO), key="abc_top_k")
+
+    resultado = compute_crowley(
+        df, {"mes_ini": mes_ini, "mes_fim": mes_fim, "corte_a": corte_a, "corte_b": corte_b, "top_k": top_k},
+        df_crowley=df_crowley,
+    )
+    corte_b = resultado.corte_b
+    classificacao_raw, concentracao_raw = resultado.classificacao, resultado.concentracao
+
+    if classificacao_raw.empty:
+        st.info("Sem faturamento positivo para classificar.")
+        return
+
+    # ==============================
+    # Concentração por emissora
+    # ==============================
+    st.subheader("Concentração de faturamento por emissora")
+    conc_disp = concentracao_raw.rename(columns={
+        "emissora": "Emissora", "ano": "Ano", "clientes": "Clientes",
+        "clientes_a": "Classe A", "clientes_b": "Classe B", "clientes_c": "Classe C",
+        "faturamento": "Faturamento", "hhi": "HHI", "gini": "Gini", f"top{top_k}_share": f"Top {top_k} (%)",
+    }).copy()
+    conc_disp["Ano"] = conc_disp["Ano"].astype(str)
+    conc_disp["Faturamento"] = brl_array(conc_disp["Faturamento"])
+    conc_disp["HHI"] = conc_disp["HHI"].map(lambda x: f"{x:,.0f}".replace(",", "."))
+    conc_disp["Gini"] = conc_disp["Gini"].map(lambda x: f"{x:.3f}".replace(".", ","))
+    conc_disp[f"Top {top_k} (%)"] = conc_disp[f"Top {top_k} (%)"].map(lambda x: f"{x:.2f}%")
+    st.dataframe(conc_disp, width="stretch", hide_index=True)
+    st.caption("HHI: 0 a 10.000 (acima de 2.500 = alta concentração) • Gini: 0 (igualitário) a 1 (concentrado).")
+    st.divider()
+
+    # ==============================
+    # Curva ABC da emissora / ano
+    # ==============================
+    emis_list = sorted(classificacao_raw["emissora"].unique())
+    anos_list = sorted(classificacao_raw["ano"].unique())
+
+    col4, col5 = st.columns(2)
+    emis = col4.selectbox("Emissora", emis_list, key="abc_emissora")
+    ano = col5.selectbox("Ano", anos_list, index=len(anos_list) - 1, key="abc_ano")
+
+    curva, resumo_raw = curva_abc(resultado, emis, ano)
+
+    st.subheader(f"Curva ABC - {emis} ({ano})")
+    if curva.empty:
+        st.info("Sem dados para essa emissora/ano.")
+    else:
+        resumo_disp = resumo_raw.copy()
+        resumo_disp["Faturamento"] = brl_array(resumo_disp["Faturamento"])
+        resumo_disp["% Clientes"] = resumo_disp["% Clientes"].map(lambda x: f"{x:.2f}%")
+        resumo_disp["% Faturamento"] = resumo_disp["% Faturamento"].map(lambda x: f"{x:.2f}%")
+        st.dataframe(resumo_disp, width="stretch", hide_index=True)
+
+        cores = {"A": PALETTE[3], "B": PALETTE[0], "C": PALETTE[2]}
+        fig_pareto = go.Figure()
+        fig_pareto.add_trace(go.Bar(
+            x=curva["cliente"],
+            y=curva["faturamento"],
+            marker_color=curva["classe"].map(cores),
+            name="Faturamento",
+            customdata=curva["classe"],
+            hovertemplate="<b>%{x}</b><br>Classe %{customdata}<br>R$ %{y:,.2f}<extra></extra>",
+        ))
+        fig_pareto.add_trace(go.Scatter(
+            x=curva["cliente"],
+            y=curva["acumulado"],
+            yaxis="y2",
+            mode="lines",
+            line=dict(color="#dc2626"),
+            name="% Acumulado",
+            hovertemplate="%{y:.1f}%<extra></extra>",
+        ))
+        fig_pareto.update_layout(
+            height=420,
+            template="plotly_white",
+            separators=",.",
+            showlegend=False,
+            xaxis=dict(showticklabels=len(curva) <= 40, title=None),
+            yaxis=dict(title="Faturamento"),
+            yaxis2=dict(title="% Acumulado", overlaying="y", side="right", range=[0, 105], ticksuffix="%"),
+        )
+        for corte in (corte_a, corte_b):
+            fig_pareto.add_hline(y=corte, line_dash="dot", line_color="#999", yref="y2")
+        st.plotly_chart(fig_pareto, width="stretch")
+
+        detalhe = curva[["rank", "cliente", "faturamento", "participacao", "acumulado", "classe"]].rename(columns={
+            "rank": "#", "cliente": "Cliente", "faturamento": "Faturamento",
+            "participacao": "Participação", "acumulado": "% Acumulado", "classe": "Classe",
+        }).copy()
+        detalhe["Faturamento"] = brl_array(detalhe["Faturamento"])
+        detalhe["Participação"] = detalhe["Participação"].map(lambda x: f"{x:.2f}%")
+        detalhe["% Acumulado"] = detalhe["% Acumulado"].map(lambda x: f"{x:.2f}%")
+        st.dataframe(detalhe, width="stretch", hide_index=True)
+
+    st.divider()
+
+    # ==============================
+    # Share de mercado (Crowley) vs share de faturamento
+    # ==============================
+    st.subheader("Share de Mercado (Crowley) vs Share de Faturamento")
+    if not resultado.tem_crowley:
+        st.info("Nenhuma base Crowley encontrada. Coloque as exportações de monitoramento (.xlsx, .csv ou .parquet) na pasta data/crowley.")
+    else:
+        share_raw, oportunidades_raw = resultado.share, resultado.oportunidades
+
+        if share_raw.empty:
+            st.info("Sem dados Crowley para o período selecionado.")
+        else:
+            fig_share = _fig_share(share_raw, show_labels)
+            st.plotly_chart(fig_share, width="stretch")
+
+            share_disp = share_raw.copy()
+            share_disp["Faturamento"] = brl_array(share_disp["Faturamento"])
+            for col in ["Share de Mercado (%)", "Cobertura (%)", "Share de Faturamento (%)"]:
+                share_disp[col] = share_disp[col].map(lambda x: "—" if pd.isna(x) else f"{x:.2f}%")
+            st.dataframe(share_disp, width="stretch", hide_index=True)
+
+            st.markdown("**Anunciantes monitorados sem faturamento na base**")
+            if oportunidades_raw.empty:
+                st.info("Todos os anunciantes monitorados já faturam em alguma emissora.")
+            else:
+                st.dataframe(oportunidades_raw.head(50), width="stretch", hide_index=True)
+
+
+    # --- SEÇÃO DE EXPORTAÇÃO ---
+    st.divider()
+
+    if st.button("📥 Exportar Dados da Página", type="secondary"):
+        st.session_state.show_crowley_export = True
+
+    if st.session_state.get("show_crowley_export", False):
+
+        dialogo_exportacao(
+            "Crowley ABC",
+            {
+                "Concentração (Emissoras)": {'df': concentracao_raw},
+                "Classificação ABC (Clientes)": {'df': classificacao_raw, 'formatos': FORMATOS_CLASSIFICACAO},
+                "Resumo ABC": {'df': resumo_raw},
+                "Curva ABC (Gráfico)": {'fig': fig_pareto},
+                "Share Mercado vs Faturamento": {'df': share_raw},
+                "Share Mercado (Gráfico)": {'fig': fig_share},
+                "Anunciantes sem Faturamento": {'df': oportunidades_raw},
+            },
+            estado="show_crowley_export",
+            file_name="Dashboard_Crowley_ABC.zip",
+        )
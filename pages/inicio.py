@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image
 import os
 # import time  <-- Removido
 
@@ -23,7 +22,7 @@ def render(df=None):
         .nb-grid {
             display: grid;
             grid-template-columns: repeat(3, 240px);
-            grid-template-rows: repeat(2, 130px);
+            grid-auto-rows: 130px;
             gap: 1.5rem;
             justify-content: center;
         }
@@ -85,8 +84,7 @@ def render(df=None):
     logo_path = next((p for p in logo_candidates if os.path.exists(p)), None)
 
     if logo_path:
-        logo = Image.open(logo_path)
-        st.image(logo, width=240)
+        st.image(logo_path, width=240)
     else:
         st.warning("⚠️ Logo não encontrada na pasta /assets")
 
@@ -109,6 +107,7 @@ def render(df=None):
         <a href="?nav=4" target="_self" class="nb-card">Cruzamentos & Interseções</a>
         <a href="?nav=5" target="_self" class="nb-card">Top 10 Anunciantes</a>
         <a href="?nav=6" target="_self" class="nb-card">Crowley ABC</a>
+        <a href="?nav=7" target="_self" class="nb-card">Retenção por Coorte</a>
       </div>
     </div>
     """, unsafe_allow_html=True)
\ No newline at end of file
@@ -1,22 +1,165 @@
 import streamlit as st
-from utils.format import brl
+from utils.format import brl, brl_array
 import pandas as pd
-import numpy as np
+import plotly.graph_objects as go
+from dataclasses import dataclass
+from utils.churn import get_churn_decomposition
+from utils.comparativo import TabelaComparativa, build_comparative_table, formatos_exportacao, get_dimension_year_aggregate
+from utils.filters import selecionar_comparacao, anos_comparacao
+from utils.cache import resultado_pagina
+from utils.tabela import tabela_paginada
 # CORREÇÃO: Importa a nova função ZIP
-from utils.export import create_zip_package 
-
-def color_delta(val):
-    if pd.isna(val) or val == 0:
-        return ""
-    try:
-        v = float(val)
-        if v > 0:
-            return "color: #16a34a; font-weight: 600;" # verde
-        if v < 0:
-            return "color: #dc2626; font-weight: 600;" # vermelho
-    except (ValueError, TypeError):
-        return ""
-    return ""
+from utils.export import dialogo_exportacao
+
+def _tabela_clientes(base, clientes):
+    """Faturamento dos clientes da lista (maior para o menor), com Totalizador."""
+    tabela = (
+        base[base["cliente"].isin(clientes)][["cliente", "faturamento"]]
+        .groupby("cliente")
+        .sum()
+        .sort_values("faturamento", ascending=False)
+        .reset_index()
+    )
+    
+    if not tabela.empty:
+        total_row = {
+            "cliente": "Totalizador",
+            "faturamento": tabela["faturamento"].sum()
+        }
+        tabela = pd.concat([tabela, pd.DataFrame([total_row])], ignore_index=True)
+    
+    tabela.insert(0, "#", list(range(1, len(tabela))) + ["Total"])
+    return tabela
+
+
+def _decomposicoes(base_periodo, ano_base, ano_comp):
+    """Decomposição de perdas & ganhos por emissora e por executivo, com Totalizador."""
+    nomes_colunas = {
+        "Clientes Base": f"Clientes {ano_base}",
+        "Clientes Comp.": f"Clientes {ano_comp}",
+        "Fat. Base": f"Fat. {ano_base}",
+        "Fat. Comp.": f"Fat. {ano_comp}",
+    }
+    decomp_raw = {}
+    for label, dimensao in [("Emissora", "emissora"), ("Executivo", "executivo")]:
+        decomp = get_churn_decomposition(base_periodo, dimensao, ano_base, ano_comp).rename(columns=nomes_colunas)
+        if not decomp.empty:
+            total_row = decomp.drop(columns=[dimensao]).sum()
+            total_row[dimensao] = "Totalizador"
+            decomp = pd.concat([decomp, pd.DataFrame([total_row])], ignore_index=True)
+            decomp.insert(0, "#", list(range(1, len(decomp))) + ["Total"])
+        decomp_raw[label] = decomp
+    return decomp_raw
+
+
+def _fig_ponte(total, ano_base, ano_comp, show_labels):
+    """Ponte de receita a partir da linha Totalizador da decomposição."""
+    colunas_valor = [f"Fat. {ano_base}", "Novos", "Expansão", "Contração", "Perdas", f"Fat. {ano_comp}"]
+    passos = [
+        total[f"Fat. {ano_base}"], total["Novos"], total["Expansão"],
+        -total["Contração"], -total["Perdas"], total[f"Fat. {ano_comp}"],
+    ]
+    fig_ponte = go.Figure(go.Waterfall(
+        x=colunas_valor,
+        y=passos,
+        measure=["absolute", "relative", "relative", "relative", "relative", "total"],
+        text=brl_array(passos) if show_labels else None,
+        textposition="outside",
+        increasing=dict(marker=dict(color="#16a34a")),
+        decreasing=dict(marker=dict(color="#dc2626")),
+        totals=dict(marker=dict(color="#007dc3")),
+    ))
+    fig_ponte.update_layout(height=400, template="plotly_white", showlegend=False)
+    return fig_ponte
+
+
+# Perdidos/Ganhos/Retidos da decomposição são contagens de clientes; as
+# parcelas da ponte (Novos/Expansão/Contração/Perdas) são valores em R$
+FORMATOS_DECOMPOSICAO = {
+    **dict.fromkeys(["Perdidos", "Ganhos", "Retidos"], "int"),
+    **dict.fromkeys(["Novos", "Expansão", "Contração", "Perdas"], "brl"),
+}
+
+
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (seletores de exibição não entram)
+FILTROS_PERDAS_GANHOS = ("mes_ini", "mes_fim", "ano_base", "ano_comp")
+
+
+@dataclass
+class ResultadoPerdasGanhos:
+    """Perdas, ganhos, variações e decomposição para um recorte da base e um par de anos."""
+    ano_base: int
+    ano_comp: int
+    perdas: list
+    ganhos: list
+    total_base: float
+    total_comp: float
+    perdas_valor: float
+    ganhos_valor: float
+    clientes_perdidos: pd.DataFrame
+    clientes_ganhos: pd.DataFrame
+    variacao_cliente: TabelaComparativa
+    variacao_emissora: TabelaComparativa
+    decomposicao: dict   # "Emissora"/"Executivo" -> tabela com Totalizador
+
+
+@resultado_pagina(*FILTROS_PERDAS_GANHOS)
+def compute_perdas_ganhos(df, filtros) -> ResultadoPerdasGanhos:
+    """Cards, listas de clientes perdidos/ganhos, variações e decomposição (emissora e executivo)."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    ano_base, ano_comp = anos_comparacao(df["ano"].dropna().unique(), filtros.get("ano_base"), filtros.get("ano_comp"))
+
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+    baseA = base_periodo[base_periodo["ano"] == ano_base]
+    baseB = base_periodo[base_periodo["ano"] == ano_comp]
+
+    cliA, cliB = set(baseA["cliente"].unique()), set(baseB["cliente"].unique())
+    perdas = sorted(cliA - cliB)
+    ganhos = sorted(cliB - cliA)
+
+    return ResultadoPerdasGanhos(
+        ano_base=ano_base,
+        ano_comp=ano_comp,
+        perdas=perdas,
+        ganhos=ganhos,
+        total_base=baseA["faturamento"].sum(),
+        total_comp=baseB["faturamento"].sum(),
+        perdas_valor=baseA[baseA["cliente"].isin(perdas)]["faturamento"].sum(),
+        ganhos_valor=baseB[baseB["cliente"].isin(ganhos)]["faturamento"].sum(),
+        clientes_perdidos=_tabela_clientes(baseA, perdas) if perdas else pd.DataFrame(),
+        clientes_ganhos=_tabela_clientes(baseB, ganhos) if ganhos else pd.DataFrame(),
+        variacao_cliente=build_comparative_table(
+            get_dimension_year_aggregate(base_periodo, "cliente"), "cliente", ano_base, ano_comp, numerar=False
+        ),
+        variacao_emissora=build_comparative_table(
+            get_dimension_year_aggregate(base_periodo, "emissora"), "emissora", ano_base, ano_comp, numerar=False
+        ),
+        decomposicao=_decomposicoes(base_periodo, ano_base, ano_comp),
+    )
+
+
+def secao_relatorio(df, filtros):
+    """Tabelas e gráfico da página para o relatório completo, sem elementos de tela."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    if not df["ano"].notna().any():
+        return {}
+    resultado = compute_perdas_ganhos(df, filtros)
+    decomp_raw = resultado.decomposicao
+
+    secao = {
+        "1. Clientes Perdidos": {'df': resultado.clientes_perdidos},
+        "2. Clientes Ganhos": {'df': resultado.clientes_ganhos},
+        "3. Variações (Cliente)": {'df': resultado.variacao_cliente.raw, 'formatos': formatos_exportacao(resultado.variacao_cliente.raw)},
+        "4. Variações (Emissora)": {'df': resultado.variacao_emissora.raw, 'formatos': formatos_exportacao(resultado.variacao_emissora.raw)},
+        "5. Decomposição (Emissora)": {'df': decomp_raw["Emissora"], 'formatos': FORMATOS_DECOMPOSICAO},
+        "6. Decomposição (Executivo)": {'df': decomp_raw["Executivo"], 'formatos': FORMATOS_DECOMPOSICAO},
+    }
+    if not decomp_raw["Emissora"].empty and resultado.ano_base != resultado.ano_comp:
+        secao["7. Ponte de Receita (Gráfico)"] = {'fig': _fig_ponte(
+            decomp_raw["Emissora"].iloc[-1], resultado.ano_base, resultado.ano_comp, filtros.get("show_labels", False)
+        )}
+    return secao
 
 
 # --- INÍCIO DA ALTERAÇÃO (Aceita show_labels) ---
@@ -27,36 +170,31 @@ def render(df, mes_ini, mes_fim, show_labels):
     df_ganhos_raw = pd.DataFrame()
     var_cli_raw = pd.DataFrame()
     var_emis_raw = pd.DataFrame()
+    decomp_raw = {}
+    fig_ponte = go.Figure()
     
+    titulo = st.empty()
     df = df.rename(columns={c: c.lower() for c in df.columns})
     anos = sorted(df["ano"].dropna().unique())
     if not anos:
+        titulo.header("Perdas & Ganhos")
         st.info("Sem anos válidos na base.")
         return
 
-    if len(anos) >= 2:
-        ano_base, ano_comp = anos[-2], anos[-1]
-    else:
-        ano_base = ano_comp = anos[-1]
-
-    st.header(f"Perdas & Ganhos ({ano_base} vs {ano_comp})")
+    ano_base, ano_comp = selecionar_comparacao(anos)
+    titulo.header(f"Perdas & Ganhos ({ano_base} vs {ano_comp})")
 
     if "cliente" not in df.columns or "faturamento" not in df.columns:
         st.error("Colunas obrigatórias 'Cliente' e 'Faturamento' ausentes.")
         return
 
-    base_periodo = df[df["mes"].between(mes_ini, mes_fim)]
-    baseA = base_periodo[base_periodo["ano"] == ano_base]
-    baseB = base_periodo[base_periodo["ano"] == ano_comp]
-
-    cliA, cliB = set(baseA["cliente"].unique()), set(baseB["cliente"].unique())
-    perdas = sorted(cliA - cliB)
-    ganhos = sorted(cliB - cliA)
+    resultado = compute_perdas_ganhos(df, {"mes_ini": mes_ini, "mes_fim": mes_fim, "ano_base": ano_base, "ano_comp": ano_comp})
+    perdas, ganhos = resultado.perdas, resultado.ganhos
 
-    totalA = baseA["faturamento"].sum()
-    totalB = baseB["faturamento"].sum()
-    perdas_valor = baseA[baseA["cliente"].isin(perdas)]["faturamento"].sum()
-    ganhos_valor = baseB[baseB["cliente"].isin(ganhos)]["faturamento"].sum()
+    totalA = resultado.total_base
+    totalB = resultado.total_comp
+    perdas_valor = resultado.perdas_valor
+    ganhos_valor = resultado.ganhos_valor
 
     perdas_pct = (perdas_valor / totalA * 100) if totalA > 0 else 0
     ganhos_pct = (ganhos_valor / totalB * 100) if totalB > 0 else 0
@@ -77,26 +215,11 @@ def render(df, mes_ini, mes_fim, show_labels):
     with colA:
         st.subheader("Clientes Perdidos")
         if perdas:
-            df_perdas_raw = (
-                baseA[baseA["cliente"].isin(perdas)][["cliente", "faturamento"]]
-                .groupby("cliente")
-                .sum()
-                .sort_values("faturamento", ascending=False)
-                .reset_index()
-            )
-            
-            if not df_perdas_raw.empty:
-                total_row = {
-                    "cliente": "Totalizador",
-                    "faturamento": df_perdas_raw["faturamento"].sum()
-                }
-                df_perdas_raw = pd.concat([df_perdas_raw, pd.DataFrame([total_row])], ignore_index=True)
-            
-            df_perdas_raw.insert(0, "#", list(range(1, len(df_perdas_raw))) + ["Total"])
+            df_perdas_raw = resultado.clientes_perdidos
             
             t_display = df_perdas_raw.copy()
             t_display['#'] = t_display['#'].astype(str)
-            t_display["faturamento"] = t_display["faturamento"].apply(brl)
+            t_display["faturamento"] = brl_array(t_display["faturamento"])
 
             st.dataframe(
                 t_display, 
@@ -110,26 +233,11 @@ def render(df, mes_ini, mes_fim, show_labels):
     with colB:
         st.subheader("Clientes Ganhos")
         if ganhos:
-            df_ganhos_raw = (
-                baseB[baseB["cliente"].isin(ganhos)][["cliente", "faturamento"]]
-                .groupby("cliente")
-                .sum()
-                .sort_values("faturamento", ascending=False)
-                .reset_index()
-            )
-            
-            if not df_ganhos_raw.empty:
-                total_row = {
-                    "cliente": "Totalizador",
-                    "faturamento": df_ganhos_raw["faturamento"].sum()
-                }
-                df_ganhos_raw = pd.concat([df_ganhos_raw, pd.DataFrame([total_row])], ignore_index=True)
-
-            df_ganhos_raw.insert(0, "#", list(range(1, len(df_ganhos_raw))) + ["Total"])
+            df_ganhos_raw = resultado.clientes_ganhos
             
             t_display = df_ganhos_raw.copy()
             t_display['#'] = t_display['#'].astype(str)
-            t_display["faturamento"] = t_display["faturamento"].apply(brl)
+            t_display["faturamento"] = brl_array(t_display["faturamento"])
 
             st.dataframe(
                 t_display, 
@@ -143,88 +251,62 @@ def render(df, mes_ini, mes_fim, show_labels):
     st.divider()
 
     st.subheader("Variações de faturamento por Cliente")
-    var_cli_raw = base_periodo.groupby(["cliente", "ano"])["faturamento"].sum().unstack(fill_value=0).reset_index()
-    
-    for ano in [ano_base, ano_comp]:
-        if ano not in var_cli_raw.columns:
-            var_cli_raw[ano] = 0.0
-            
-    var_cli_raw["Δ"] = var_cli_raw[ano_comp] - var_cli_raw[ano_base]
-    var_cli_raw["Δ%"] = np.where(var_cli_raw[ano_base] > 0, (var_cli_raw["Δ"] / var_cli_raw[ano_base]) * 100, np.nan)
+    tabela_cli = resultado.variacao_cliente
+    var_cli_raw = tabela_cli.raw
     
-    if not var_cli_raw.empty:
-        total_A = var_cli_raw[ano_base].sum()
-        total_B = var_cli_raw[ano_comp].sum()
-        total_delta = total_B - total_A
-        total_pct = (total_delta / total_A * 100) if total_A > 0 else np.nan
-        
-        total_row = {
-            "cliente": "Totalizador",
-            ano_base: total_A,
-            ano_comp: total_B,
-            "Δ": total_delta,
-            "Δ%": total_pct
-        }
-        var_cli_raw = pd.concat([var_cli_raw, pd.DataFrame([total_row])], ignore_index=True)
-    
-    var_cli_disp = var_cli_raw.copy()
-    var_cli_disp.columns = var_cli_disp.columns.map(str)
-    
-    styler_cli = var_cli_disp.style.map(
-        color_delta, subset=["Δ", "Δ%"]
-    ).format(
-        {
-            str(ano_base): brl,
-            str(ano_comp): brl,
-            "Δ": brl,
-            "Δ%": lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
-        },
-        na_rep="—"
+    tabela_paginada(
+        tabela_cli.display,
+        key="perdas_var_cli",
+        formatos={str(ano_base): "brl", str(ano_comp): "brl", "Δ": "brl", "Δ%": "pct"},
+        colunas_sinal=["Δ", "Δ%"],
+        coluna_busca="cliente",
+        linha_fixa="Totalizador",
     )
-    st.dataframe(styler_cli, width="stretch", hide_index=True)
     st.divider()
 
 
     st.subheader("Variações de faturamento por Emissora")
-    var_emis_raw = base_periodo.groupby(["emissora", "ano"])["faturamento"].sum().unstack(fill_value=0).reset_index()
-    
-    for ano in [ano_base, ano_comp]:
-        if ano not in var_emis_raw.columns:
-            var_emis_raw[ano] = 0.0
-            
-    var_emis_raw["Δ"] = var_emis_raw[ano_comp] - var_emis_raw[ano_base]
-    var_emis_raw["Δ%"] = np.where(var_emis_raw[ano_base] > 0, (var_emis_raw["Δ"] / var_emis_raw[ano_base]) * 100, np.nan)
-    
-    if not var_emis_raw.empty:
-        total_A = var_emis_raw[ano_base].sum()
-        total_B = var_emis_raw[ano_comp].sum()
-        total_delta = total_B - total_A
-        total_pct = (total_delta / total_A * 100) if total_A > 0 else np.nan
-        
-        total_row = {
-            "emissora": "Totalizador",
-            ano_base: total_A,
-            ano_comp: total_B,
-            "Δ": total_delta,
-            "Δ%": total_pct
-        }
-        var_emis_raw = pd.concat([var_emis_raw, pd.DataFrame([total_row])], ignore_index=True)
-        
-    var_emis_disp = var_emis_raw.copy()
-    var_emis_disp.columns = var_emis_disp.columns.map(str)
+    tabela_emis = resultado.variacao_emissora
+    var_emis_raw = tabela_emis.raw
     
-    styler_emis = var_emis_disp.style.map(
-        color_delta, subset=["Δ", "Δ%"]
-    ).format(
-        {
-            str(ano_base): brl,
-            str(ano_comp): brl,
-            "Δ": brl,
-            "Δ%": lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
-        },
-        na_rep="—"
+    tabela_paginada(
+        tabela_emis.display,
+        key="perdas_var_emis",
+        formatos={str(ano_base): "brl", str(ano_comp): "brl", "Δ": "brl", "Δ%": "pct"},
+        colunas_sinal=["Δ", "Δ%"],
+        coluna_busca="emissora",
+        linha_fixa="Totalizador",
     )
-    st.dataframe(styler_emis, width="stretch", hide_index=True)
+    st.divider()
+
+
+    st.subheader("Decomposição de Perdas & Ganhos por Emissora / Executivo")
+    dim_label = st.radio("Quebrar por", ["Emissora", "Executivo"], horizontal=True, key="perdas_decomp_dim")
+
+    colunas_valor = [f"Fat. {ano_base}", "Novos", "Expansão", "Contração", "Perdas", f"Fat. {ano_comp}"]
+    decomp_raw = resultado.decomposicao
+
+    decomp_sel = decomp_raw[dim_label]
+    if decomp_sel.empty or ano_base == ano_comp:
+        st.info("São necessários dois anos com dados para a decomposição.")
+    else:
+        decomp_disp = decomp_sel.copy()
+        decomp_disp['#'] = decomp_disp['#'].astype(str)
+        for col in colunas_valor:
+            decomp_disp[col] = brl_array(decomp_disp[col])
+
+        st.dataframe(
+            decomp_disp,
+            width="stretch",
+            hide_index=True,
+            column_config={"#": None}
+        )
+
+        # Ponte de receita (total dos filtros)
+        fig_ponte = _fig_ponte(decomp_sel.iloc[-1], ano_base, ano_comp, show_labels)
+
+        st.markdown("<p class='custom-chart-title'>Ponte de Receita</p>", unsafe_allow_html=True)
+        st.plotly_chart(fig_ponte, width="stretch")
     
     
     # --- SEÇÃO DE EXPORTAÇÃO ---
@@ -235,60 +317,17 @@ def render(df, mes_ini, mes_fim, show_labels):
 
     if st.session_state.get("show_perdas_export", False):
         
-        @st.dialog("Opções de Exportação - Perdas & Ganhos")
-        def export_dialog():
-            
-            table_options = {
+        dialogo_exportacao(
+            "Perdas & Ganhos",
+            {
                 "1. Clientes Perdidos": {'df': df_perdas_raw},
                 "2. Clientes Ganhos": {'df': df_ganhos_raw},
-                "3. Variações (Cliente)": {'df': var_cli_raw},
-                "4. Variações (Emissora)": {'df': var_emis_raw}
-            }
-            
-            available_options = [name for name, data in table_options.items() if data.get('df') is not None and not data['df'].empty]
-            
-            if not available_options:
-                st.warning("Nenhuma tabela com dados foi gerada nesta página.")
-                if st.button("Fechar", type="secondary"):
-                    st.session_state.show_perdas_export = False
-                    st.rerun()
-                return
-
-            st.write("Selecione os itens para incluir no **Pacote de Arquivos (.zip)**:")
-            
-            selected_names = st.multiselect(
-                "Itens para exportar",
-                options=available_options,
-                default=available_options
-            )
-            
-            tables_to_export = {}
-            for name in selected_names:
-                # Passa o df
-                if name in table_options:
-                    tables_to_export[name] = table_options[name]
-
-            if not tables_to_export:
-                st.error("Selecione pelo menos um item.")
-                return
-
-            try:
-                # CHAMADA CORRIGIDA: usa create_zip_package
-                zip_data = create_zip_package(tables_to_export)
-                
-                st.download_button(
-                    label="Clique para baixar o pacote de arquivos",
-                    data=zip_data,
-                    file_name="Dashboard_Perdas_Ganhos.zip",
-                    mime="application/zip",
-                    on_click=lambda: st.session_state.update(show_perdas_export=False),
-                    type="secondary" # Mantém o estilo secundário
-                )
-            except Exception as e:
-                st.error(f"Erro ao gerar o pacote ZIP: {e}")
-
-            if st.button("Cancelar", key="cancel_export", type="secondary"):
-                st.session_state.show_perdas_export = False
-                st.rerun()
-
-        export_dialog()
\ No newline at end of file
+                "3. Variações (Cliente)": {'df': var_cli_raw, 'formatos': formatos_exportacao(var_cli_raw)},
+                "4. Variações (Emissora)": {'df': var_emis_raw, 'formatos': formatos_exportacao(var_emis_raw)},
+                "5. Decomposição (Emissora)": {'df': decomp_raw.get("Emissora", pd.DataFrame()), 'formatos': FORMATOS_DECOMPOSICAO},
+                "6. Decomposição (Executivo)": {'df': decomp_raw.get("Executivo", pd.DataFrame()), 'formatos': FORMATOS_DECOMPOSICAO},
+                "7. Ponte de Receita (Gráfico)": {'fig': fig_ponte},
+            },
+            estado="show_perdas_export",
+            file_name="Dashboard_Perdas_Ganhos.zip",
+        )
\ No newline at end of file
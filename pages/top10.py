@@ -1,159 +1,227 @@
 # pages/top10.py
 import streamlit as st
 import plotly.express as px
-from utils.format import brl, PALETTE
+from utils.format import brl_array, PALETTE
 # CORREÇÃO: Importa a nova função ZIP
-from utils.export import create_zip_package 
+from utils.export import dialogo_exportacao
+from utils.ranking import get_top_n_index, get_rank_table, build_rank_movers, TOP_N_OPCOES
 import pandas as pd
 import plotly.graph_objects as go
-import numpy as np # Adicionado para a função get_pretty_ticks
-
-# Função de formatação para abreviações em Português
-def format_pt_br_abrev(val):
-    if pd.isna(val):
-        return "R$ 0" # Neutro para NaN
-    
-    # Salva o sinal
-    sign = "-" if val < 0 else ""
-    val_abs = abs(val)
-
-    if val_abs == 0:
-        return "R$ 0"
-    if val_abs >= 1_000_000:
-        # Ex: "R$ 1,2 Mi"
-        return f"{sign}R$ {val_abs/1_000_000:,.1f} Mi".replace(",", "X").replace(".", ",").replace("X", ".")
-    if val_abs >= 1_000:
-         # Ex: "R$ 12 mil"
-        return f"{sign}R$ {val_abs/1_000:,.0f} mil".replace(",", "X").replace(".", ",").replace("X", ".")
-    
-    # Para valores < 1000, usa a formatação completa (brl)
-    return brl(val)
-
-# Função para criar "ticks bonitos" (copiada do visao_geral)
-def get_pretty_ticks(max_val, num_ticks=5):
-    if max_val <= 0:
-        return [0], ["R$ 0"], 100 
-        
-    ideal_interval = max_val / num_ticks
-    magnitude = 10**np.floor(np.log10(ideal_interval))
-    residual = ideal_interval / magnitude
+import numpy as np
+from dataclasses import dataclass
+from utils.cache import resultado_pagina
+from utils.graficos import get_pretty_ticks, aplicar_rotulos, figura_cacheada
+
+def _fig_top(top10_raw, show_labels):
+    # --- Alteração: Renomear eixos e formatar Y-axis ---
+    fig = px.bar(
+        top10_raw, 
+        x="cliente",
+        y="faturamento",
+        color_discrete_sequence=[PALETTE[0]],
+        labels={ # Renomeia os eixos X e Y
+            "cliente": "Cliente",
+            "faturamento": "Faturamento"
+        }
+    )
     
-    if residual < 1.5: nice_interval = 1 * magnitude
-    elif residual < 3: nice_interval = 2 * magnitude
-    elif residual < 7: nice_interval = 5 * magnitude
-    else: nice_interval = 10 * magnitude
-        
-    max_y_rounded = np.ceil(max_val / nice_interval) * nice_interval
+    # Formatação do Eixo Y (PT-BR Abreviação)
+    max_y = top10_raw['faturamento'].max()
+    tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
+
+    fig.update_layout(
+        height=400, 
+        showlegend=False, 
+        template="plotly_white",
+    )
     
-    # Usa a função de formatação PT-BR local
-    tick_values = np.arange(0, max_y_rounded + nice_interval, nice_interval)
-    tick_texts = [format_pt_br_abrev(v) for v in tick_values] 
+    fig.update_yaxes(
+        tickvals=tick_values,
+        ticktext=tick_texts,
+        range=[0, y_axis_cap],
+        title="Faturamento" # Garante o título Faturamento
+    )
     
-    y_axis_cap = max_y_rounded * 1.05
+    if show_labels:
+        aplicar_rotulos(fig)
+    return fig
+
+
+def _tabela_top(top10_raw):
+    """Ranking com Totalizador e numeração (#)."""
+    top10_with_total = top10_raw.copy()
+    total_row = {
+        "cliente": "Totalizador",
+        "faturamento": top10_with_total["faturamento"].sum()
+    }
+    top10_with_total = pd.concat([top10_with_total, pd.DataFrame([total_row])], ignore_index=True)
     
-    return tick_values, tick_texts, y_axis_cap
-
+    top10_with_total.insert(0, "#", list(range(1, len(top10_raw) + 1)) + ["Total"])
+    return top10_with_total
 
-def render(df, mes_ini, mes_fim, show_labels):
-    
-    st.header("Top 10 Maiores Anunciantes")
-    
-    top10_raw = pd.DataFrame()
-    fig = go.Figure() 
-    top10_raw_export = pd.DataFrame()
 
-    df = df.rename(columns={c: c.lower() for c in df.columns})
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (emissora, ano e tamanho do ranking só consultam o índice)
+FILTROS_TOP10 = ("mes_ini", "mes_fim")
 
-    if "emissora" not in df.columns or "ano" not in df.columns:
-        st.error("Colunas 'Emissora' e/ou 'Ano' ausentes.")
-        return
 
-    base_periodo = df[df["mes"].between(mes_ini, mes_fim)]
+@dataclass
+class ResultadoTop10:
+    """Rankings de todas as emissoras × anos de um recorte da base."""
+    emissoras: list
+    anos: list
+    rankings: dict           # (emissora, ano) -> maiores clientes, já ordenados
+    rank_table: pd.DataFrame
 
-    emis_list = sorted(base_periodo["emissora"].dropna().unique())
-    anos_list = sorted(base_periodo["ano"].dropna().unique())
 
-    if not emis_list or not anos_list:
-        st.info("Sem dados para selecionar emissora/ano.")
-        return
+@resultado_pagina(*FILTROS_TOP10)
+def compute_top10(df, filtros) -> ResultadoTop10:
+    """Índice de rankings e tabela de ranks (base do Rank Movers) do período filtrado."""
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+    return ResultadoTop10(
+        emissoras=sorted(base_periodo["emissora"].dropna().unique()),
+        anos=sorted(int(a) for a in base_periodo["ano"].dropna().unique()),
+        rankings=get_top_n_index(base_periodo),
+        rank_table=get_rank_table(base_periodo),
+    )
 
-    col1, col2 = st.columns(2)
-    emis = col1.selectbox("Emissora", emis_list)
-    ano = col2.selectbox("Ano", anos_list, index=len(anos_list)-1)
 
-    base = base_periodo[
-        (base_periodo["ano"] == ano) & (base_periodo["emissora"] == emis)
-    ]
-    
-    top10_raw = (
-        base.groupby("cliente", as_index=False)["faturamento"]
-        .sum()
-        .sort_values("faturamento", ascending=False)
-        .head(10)
-    )
+def ranking_emissora(resultado, emis, ano, top_n):
+    """Top N de uma emissora no ano (vazio se ela não faturou no ano)."""
+    return resultado.rankings.get((emis, int(ano)), pd.DataFrame(columns=["cliente", "faturamento"])).head(top_n)
+
+
+def secao_relatorio(df, filtros):
+    """Ranking de cada emissora no ano e Rank Movers para o relatório completo, sem elementos de tela."""
+    resultado = compute_top10(df, filtros)
+    if not resultado.anos:
+        return {}
+    ano = resultado.anos[-1]
+    top_n = filtros.get("top_n") or TOP_N_OPCOES[0]
+
+    secao = {}
+    for emis in resultado.emissoras:
+        top10_raw = ranking_emissora(resultado, emis, ano, top_n)
+        if top10_raw.empty:
+            continue
+        secao[f"Top {top_n} {emis} {ano} (Dados)"] = {'df': _tabela_top(top10_raw)}
+        secao[f"Top {top_n} {emis} {ano} (Gráfico)"] = {'fig': _fig_top(top10_raw, filtros.get("show_labels", False))}
+
+    movers = build_rank_movers(resultado.rank_table, ano, top_n)
+    secao["Rank Movers (Dados)"] = {'df': movers.reset_index(drop=True)}
+    return secao
+
+
+def _selecao(resultado):
+    """
+    Emissora, ano e tamanho do ranking escolhidos (session_state), com os
+    padrões da página quando a escolha não existe mais no recorte atual.
+    """
+    for chave, opcoes in (("top10_emissora", resultado.emissoras), ("top10_ano", resultado.anos), ("top10_n", TOP_N_OPCOES)):
+        if st.session_state.get(chave) not in opcoes:
+            st.session_state.pop(chave, None)
+    emis = st.session_state.get("top10_emissora", resultado.emissoras[0])
+    ano = st.session_state.get("top10_ano", resultado.anos[-1])
+    top_n = st.session_state.get("top10_n", TOP_N_OPCOES[0])
+    return emis, ano, top_n
+
+
+def _movers_emissora(resultado, emis, ano, top_n):
+    movers_todas = build_rank_movers(resultado.rank_table, int(ano), top_n)
+    return movers_todas[movers_todas["emissora"] == emis].drop(columns=["emissora"]).reset_index(drop=True)
+
+
+@st.fragment
+def _secao_ranking(resultado, show_labels):
+    """
+    Seletores, ranking, gráfico e Rank Movers. Trocar emissora, ano ou
+    tamanho do ranking reexecuta só este trecho, sobre o resultado já calculado.
+    """
+    emis, ano, top_n = _selecao(resultado)
+    titulo = st.empty()
+
+    col1, col2, col3 = st.columns(3)
+    emis = col1.selectbox("Emissora", resultado.emissoras, index=resultado.emissoras.index(emis), key="top10_emissora")
+    ano = col2.selectbox("Ano", resultado.anos, index=resultado.anos.index(ano), key="top10_ano")
+    top_n = col3.selectbox("Tamanho do ranking", TOP_N_OPCOES, index=TOP_N_OPCOES.index(top_n), key="top10_n")
+    titulo.header(f"Top {top_n} Maiores Anunciantes")
+
+    top10_raw = ranking_emissora(resultado, emis, ano, top_n)
 
     if not top10_raw.empty:
         
-        top10_with_total = top10_raw.copy()
-        total_row = {
-            "cliente": "Totalizador",
-            "faturamento": top10_with_total["faturamento"].sum()
-        }
-        top10_with_total = pd.concat([top10_with_total, pd.DataFrame([total_row])], ignore_index=True)
-        
-        top10_with_total.insert(0, "#", list(range(1, len(top10_raw) + 1)) + ["Total"])
-        
-        top10_raw_export = top10_with_total.copy()
+        top10_with_total = _tabela_top(top10_raw)
 
         top10_display = top10_with_total.copy()
         top10_display['#'] = top10_display['#'].astype(str)
         
-        top10_display["faturamento_fmt"] = top10_display["faturamento"].apply(brl)
+        top10_display["faturamento_fmt"] = brl_array(top10_display["faturamento"])
 
         tabela = top10_display[["#", "cliente", "faturamento_fmt"]].rename(
             columns={"cliente": "Cliente", "faturamento_fmt": "Faturamento"}
         )
         st.dataframe(tabela, width="stretch", hide_index=True) 
 
-        # --- Alteração: Renomear eixos e formatar Y-axis ---
-        fig = px.bar(
-            top10_raw.head(10), 
-            x="cliente",
-            y="faturamento",
-            color_discrete_sequence=[PALETTE[0]],
-            labels={ # Renomeia os eixos X e Y
-                "cliente": "Cliente",
-                "faturamento": "Faturamento"
-            }
-        )
-        
-        # Formatação do Eixo Y (PT-BR Abreviação)
-        max_y = top10_raw.head(10)['faturamento'].max()
-        tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
-
-        fig.update_layout(
-            height=400, 
-            showlegend=False, 
-            template="plotly_white",
-        )
-        
-        fig.update_yaxes(
-            tickvals=tick_values,
-            ticktext=tick_texts,
-            range=[0, y_axis_cap],
-            title="Faturamento" # Garante o título Faturamento
-        )
-        
-        if show_labels:
-            fig.update_traces(
-                text=top10_raw.head(10)['faturamento'].apply(format_pt_br_abrev),
-                textposition='outside'
-            )
-        
+        fig = figura_cacheada("top10_barras", _fig_top, top10_raw, show_labels=show_labels)
         st.plotly_chart(fig, width="stretch") 
     else:
         st.info("Sem dados para essa emissora/ano.")
 
+    # ==============================
+    # Rank Movers (ano anterior vs ano selecionado)
+    # ==============================
+    st.divider()
+    st.subheader(f"Rank Movers - {emis} ({int(ano) - 1} vs {int(ano)})")
+
+    movers_raw = _movers_emissora(resultado, emis, ano, top_n)
+
+    if movers_raw.empty:
+        st.info(f"Sem dados de {int(ano) - 1} para comparar o ranking desta emissora.")
+    else:
+        contagem = movers_raw["status"].value_counts()
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric(f"Entraram no Top {top_n}", int(contagem.get(f"Entrou no Top {top_n}", 0)))
+        m2.metric(f"Saíram do Top {top_n}", int(contagem.get(f"Saiu do Top {top_n}", 0)))
+        m3.metric("Subiram", int(contagem.get("Subiu", 0)))
+        m4.metric("Caíram", int(contagem.get("Caiu", 0)))
+
+        delta = movers_raw["delta_rank"]
+        movimento = np.where(
+            delta.isna(), "—",
+            np.where(delta > 0, "▲ ", np.where(delta < 0, "▼ ", "● ")) + delta.abs().fillna(0).astype(int).astype(str)
+        )
+        movers_disp = pd.DataFrame({
+            "Cliente": movers_raw["cliente"],
+            f"Rank {int(ano) - 1}": movers_raw["rank_anterior"].map(lambda x: "—" if pd.isna(x) else f"{int(x)}º"),
+            f"Rank {int(ano)}": movers_raw["rank"].map(lambda x: "—" if pd.isna(x) else f"{int(x)}º"),
+            "Movimento": movimento,
+            "Percentil": movers_raw["percentil"].map(lambda x: "—" if pd.isna(x) else f"{x:.0f}"),
+            "Faturamento": brl_array(movers_raw["faturamento"]),
+            "Status": movers_raw["status"],
+        })
+        st.dataframe(movers_disp, width="stretch", hide_index=True)
+
+
+def render(df, mes_ini, mes_fim, show_labels):
+
+    df = df.rename(columns={c: c.lower() for c in df.columns})
+
+    if "emissora" not in df.columns or "ano" not in df.columns:
+        st.header("Top 10 Maiores Anunciantes")
+        st.error("Colunas 'Emissora' e/ou 'Ano' ausentes.")
+        return
+
+    # Rankings de todas as emissoras × anos calculados uma vez por versão/filtro
+    resultado = compute_top10(df, {"mes_ini": mes_ini, "mes_fim": mes_fim})
+
+    if not resultado.emissoras or not resultado.anos:
+        st.header("Top 10 Maiores Anunciantes")
+        st.info("Sem dados para selecionar emissora/ano.")
+        return
+
+    _secao_ranking(resultado, show_labels)
+
 
     # --- SEÇÃO DE EXPORTAÇÃO ---
     st.divider()
@@ -162,64 +230,22 @@ def render(df, mes_ini, mes_fim, show_labels):
         st.session_state.show_top10_export = True
 
     if st.session_state.get("show_top10_export", False):
+
+        # Itens da seleção atual (o ranking e o gráfico saem dos caches)
+        emis, ano, top_n = _selecao(resultado)
+        top10_raw = ranking_emissora(resultado, emis, ano, top_n)
+        top10_raw_export, fig = pd.DataFrame(), go.Figure()
+        if not top10_raw.empty:
+            top10_raw_export = _tabela_top(top10_raw)
+            fig = figura_cacheada("top10_barras", _fig_top, top10_raw, show_labels=show_labels)
         
-        @st.dialog("Opções de Exportação - Top 10")
-        def export_dialog():
-            
-            all_options = {
-                "Top 10 (Dados)": {'df': top10_raw_export}, 
-                "Top 10 (Gráfico)": {'fig': fig} # Passa o objeto fig
-            }
-            
-            available_options = []
-            for name, data in all_options.items():
-                if data.get('df') is not None and not data['df'].empty:
-                    available_options.append(name)
-                elif data.get('fig') is not None and data['fig'].data:
-                    available_options.append(name)
-            
-            if not available_options:
-                st.warning("Nenhuma tabela com dados foi gerada nesta página.")
-                if st.button("Fechar", type="secondary"):
-                    st.session_state.show_top10_export = False
-                    st.rerun()
-                return
-
-            st.write("Selecione os itens para incluir no **Pacote de Arquivos (.zip)**:")
-            
-            selected_names = st.multiselect(
-                "Itens para exportar",
-                options=available_options,
-                default=available_options
-            )
-            
-            tables_to_export = {}
-            for name in selected_names:
-                # Passa o df ou a fig
-                if name in all_options:
-                    tables_to_export[name] = all_options[name]
-            
-            if not tables_to_export:
-                st.error("Selecione pelo menos um item.")
-                return
-
-            try:
-                # CHAMADA CORRIGIDA: usa create_zip_package
-                zip_data = create_zip_package(tables_to_export)
-                
-                st.download_button(
-                    label="Clique para baixar o pacote de arquivos",
-                    data=zip_data,
-                    file_name="Dashboard_Top10.zip",
-                    mime="application/zip",
-                    on_click=lambda: st.session_state.update(show_top10_export=False),
-                    type="secondary" # Mantém o estilo secundário
-                )
-            except Exception as e:
-                st.error(f"Erro ao gerar o pacote ZIP: {e}")
-
-            if st.button("Cancelar", key="cancel_export", type="secondary"):
-                st.session_state.show_top10_export = False
-                st.rerun()
-
-        export_dialog()
\ No newline at end of file
+        dialogo_exportacao(
+            "Top 10",
+            {
+                f"Top {top_n} (Dados)": {'df': top10_raw_export},
+                f"Top {top_n} (Gráfico)": {'fig': fig},
+                "Rank Movers (Dados)": {'df': _movers_emissora(resultado, emis, ano, top_n)},
+            },
+            estado="show_top10_export",
+            file_name="Dashboard_Top10.zip",
+        )
@@ -1,165 +1,239 @@
 import streamlit as st
 import plotly.express as px
-from utils.format import brl, PALETTE
+from utils.format import brl_abrev, PALETTE
 import pandas as pd
 import plotly.graph_objects as go 
-import numpy as np
+from dataclasses import dataclass
 # Importa a nova função de pacote ZIP
-from utils.export import create_zip_package 
+from utils.export import dialogo_exportacao
+from utils.comparativo import get_dimension_year_aggregate
+from utils.filters import selecionar_comparacao, anos_comparacao
+from utils.periodos import get_period_kernels
+from utils.calendario import calendar_lookup, rotulo_mes
+from utils.cache import resultado_pagina
+from utils.graficos import get_pretty_ticks, aplicar_rotulos, figura_cacheada, top_n_com_outros, barras_para_largura
 
-# Função de formatação (agora lida com negativos)
-def format_pt_br_abrev(val):
-    if pd.isna(val):
-        return "R$ 0" # Neutro para NaN
+# ==================== CONSTRUTORES DE GRÁFICOS (em cache via figura_cacheada) ====================
+def _fig_evolucao(evol_raw, show_labels):
+    fig_evol = px.line(
+        evol_raw,
+        x="meslabel",
+        y="faturamento",
+        color=evol_raw["ano"].astype(str),
+        markers=True,
+        template="plotly_white",
+        color_discrete_sequence=PALETTE,
+        labels={
+            "meslabel": "Mês",
+            "faturamento": "Faturamento",
+            "ano": "Ano"
+        }
+    )
     
-    # Salva o sinal
-    sign = "-" if val < 0 else ""
-    val_abs = abs(val)
-
-    if val_abs == 0:
-        return "R$ 0"
-    if val_abs >= 1_000_000:
-        return f"{sign}R$ {val_abs/1_000_000:,.1f} Mi".replace(",", "X").replace(".", ",").replace("X", ".")
-    if val_abs >= 1_000: # 1000 a 999.999
-        return f"{sign}R$ {val_abs/1_000:,.0f} mil".replace(",", "X").replace(".", ",").replace("X", ".")
+    # Correção Eixo Y (PT-BR)
+    max_y = evol_raw['faturamento'].max()
+    tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
+
+    fig_evol.update_layout(
+        height=400, 
+        legend=dict(orientation="h", y=1.1, title_text="Ano"),
+        template="plotly_white"
+    )
+    
+    fig_evol.update_yaxes(
+        tickvals=tick_values,
+        ticktext=tick_texts,
+        range=[0, y_axis_cap]
+    )
     
-    # Para valores < 1000, usa a formatação completa (brl)
-    return brl(val)
+    # Rótulos pelo text de cada série (uma atualização por trace, sem anotações)
+    if show_labels:
+        aplicar_rotulos(fig_evol)
+    return fig_evol
 
-# Função para criar "ticks bonitos"
-def get_pretty_ticks(max_val, num_ticks=5):
-    if max_val <= 0:
-        return [0], ["R$ 0"], 100 
-        
-    ideal_interval = max_val / num_ticks
-    magnitude = 10**np.floor(np.log10(ideal_interval))
-    residual = ideal_interval / magnitude
+
+def _fig_barras(base_raw, coluna, cor, show_labels):
+    fig = px.bar(base_raw, x=coluna, y="faturamento", color_discrete_sequence=[cor])
     
-    if residual < 1.5: nice_interval = 1 * magnitude
-    elif residual < 3: nice_interval = 2 * magnitude
-    elif residual < 7: nice_interval = 5 * magnitude
-    else: nice_interval = 10 * magnitude
-        
-    max_y_rounded = np.ceil(max_val / nice_interval) * nice_interval
+    # Correção Eixo Y (PT-BR)
+    max_y = base_raw['faturamento'].max()
+    tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
     
-    tick_values = np.arange(0, max_y_rounded + nice_interval, nice_interval)
-    tick_texts = [format_pt_br_abrev(v) for v in tick_values]
+    fig.update_layout(
+        height=400, 
+        xaxis_title=None, 
+        yaxis_title="Faturamento", 
+        template="plotly_white"
+    )
     
-    y_axis_cap = max_y_rounded * 1.05
+    fig.update_yaxes(
+        tickvals=tick_values,
+        ticktext=tick_texts,
+        range=[0, y_axis_cap]
+    )
     
-    return tick_values, tick_texts, y_axis_cap
+    if show_labels:
+        aplicar_rotulos(fig)
+    return fig
 
-def render(df, mes_ini, mes_fim, show_labels):
-    st.header("Visão Geral")
-    
-    evol_raw = pd.DataFrame()
-    base_emis_raw = pd.DataFrame()
-    base_exec_raw = pd.DataFrame()
-    fig_evol = go.Figure()
-    fig_emis = go.Figure()
-    fig_exec = go.Figure()
 
-    df = df.rename(columns={c: c.lower() for c in df.columns})
+def _fig_periodos(plot_periodos, dimensao, coluna_met, titulo_met, titulo_dim):
+    fig_periodos = px.line(
+        plot_periodos,
+        x="meslabel",
+        y=coluna_met,
+        color=dimensao,
+        markers=True,
+        template="plotly_white",
+        color_discrete_sequence=PALETTE,
+        labels={"meslabel": "Mês", coluna_met: titulo_met, dimensao: titulo_dim}
+    )
+    fig_periodos.update_layout(height=400, legend=dict(orientation="h", y=-0.2, title_text=None))
+    if coluna_met == "mom_pct":
+        fig_periodos.update_yaxes(ticksuffix="%")
+    else:
+        tick_values, tick_texts, y_axis_cap = get_pretty_ticks(plot_periodos[coluna_met].max())
+        fig_periodos.update_yaxes(tickvals=tick_values, ticktext=tick_texts, range=[0, y_axis_cap])
+    return fig_periodos
 
+
+def _preparar_base(df):
+    df = df.rename(columns={c: c.lower() for c in df.columns})
     if "meslabel" not in df.columns:
         if "ano" in df.columns and "mes" in df.columns:
-            df["meslabel"] = pd.to_datetime(dict(
-                year=df["ano"].astype(int),
-                month=df["mes"].astype(int),
-                day=1
-            )).dt.strftime("%b/%y")
+            df["meslabel"] = calendar_lookup(df["ano"].to_numpy(), df["mes"].to_numpy())
         else:
             df["meslabel"] = ""
+    return df
+
+
+def _agregados_faturamento(base_periodo):
+    """Evolução mensal e faturamento por emissora / executivo (maior para o menor)."""
+    evol_raw = base_periodo.groupby(["ano", "meslabel", "mes"], as_index=False)["faturamento"].sum().sort_values(["ano", "mes"])
+    base_emis_raw = base_periodo.groupby("emissora", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
+    base_exec_raw = base_periodo.groupby("executivo", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
+    return evol_raw, base_emis_raw, base_exec_raw
+
+
+def _indicadores_periodo(base_periodo, dimensao):
+    """Kernels de período (MoM, YTD, TTM) por entidade, com rótulo do mês, e a linha Total separada."""
+    kernels = get_period_kernels(base_periodo, dimensao)
+    total_periodo = kernels[kernels[dimensao] == "Total"]
+    total_periodo = total_periodo[total_periodo["faturamento"] > 0]
+    periodos_raw = kernels[kernels[dimensao] != "Total"].copy()
+    periodos_raw["meslabel"] = calendar_lookup(periodos_raw["ano"].to_numpy(), periodos_raw["mes"].to_numpy())
+    return periodos_raw, total_periodo
+
+
+# ==================== CÁLCULO DA PÁGINA (sem Streamlit) ====================
+# Filtros que mudam o resultado (rótulos e seletores de exibição não entram)
+FILTROS_VISAO_GERAL = ("mes_ini", "mes_fim", "ano_base", "ano_comp")
+
+
+@dataclass
+class ResultadoVisaoGeral:
+    """Agregados da Visão Geral para um recorte da base e um par de anos."""
+    ano_base: int
+    ano_comp: int
+    total_base: float
+    total_comp: float
+    evolucao: pd.DataFrame
+    por_emissora: pd.DataFrame
+    por_executivo: pd.DataFrame
+    periodos: dict   # "emissora"/"executivo" -> (indicadores por entidade, linha Total)
+
+
+@resultado_pagina(*FILTROS_VISAO_GERAL)
+def compute_visao_geral(df, filtros) -> ResultadoVisaoGeral:
+    """Cards, evolução mensal, barras e indicadores de período (por emissora e por executivo)."""
+    df = _preparar_base(df)
+    ano_base, ano_comp = anos_comparacao(df["ano"].dropna().unique(), filtros.get("ano_base"), filtros.get("ano_comp"))
+
+    base_periodo = df[df["mes"].between(filtros["mes_ini"], filtros["mes_fim"])]
+    evol_raw, base_emis_raw, base_exec_raw = _agregados_faturamento(base_periodo)
+    fat_ano = get_dimension_year_aggregate(base_periodo, "emissora").groupby("ano")["faturamento"].sum()
+
+    return ResultadoVisaoGeral(
+        ano_base=ano_base,
+        ano_comp=ano_comp,
+        total_base=float(fat_ano.get(ano_base, 0.0)),
+        total_comp=float(fat_ano.get(ano_comp, 0.0)),
+        evolucao=evol_raw,
+        por_emissora=base_emis_raw,
+        por_executivo=base_exec_raw,
+        periodos={dim: _indicadores_periodo(base_periodo, dim) for dim in ("emissora", "executivo")},
+    )
+
+
+def secao_relatorio(df, filtros):
+    """Tabelas e gráficos da página para o relatório completo, sem elementos de tela."""
+    resultado = compute_visao_geral(df, filtros)
+    show_labels = filtros.get("show_labels", False)
+
+    periodos_raw, _ = resultado.periodos["emissora"]
+    plot_periodos = periodos_raw.dropna(subset=["ttm"])
+
+    secao = {
+        "Evolução Mensal (Dados)": {'df': resultado.evolucao},
+        "Fat. por Emissora (Dados)": {'df': resultado.por_emissora},
+        "Fat. por Executivo (Dados)": {'df': resultado.por_executivo},
+        "Indicadores de Período (Dados)": {'df': periodos_raw},
+    }
+    if not resultado.evolucao.empty:
+        secao["Evolução Mensal (Gráfico)"] = {'fig': _fig_evolucao(resultado.evolucao, show_labels)}
+        secao["Fat. por Emissora (Gráfico)"] = {'fig': _fig_barras(
+            top_n_com_outros(resultado.por_emissora, "emissora", barras_para_largura("inteira")), "emissora", PALETTE[0], show_labels
+        )}
+        secao["Fat. por Executivo (Gráfico)"] = {'fig': _fig_barras(
+            top_n_com_outros(resultado.por_executivo, "executivo", barras_para_largura("inteira")), "executivo", PALETTE[3], show_labels
+        )}
+    if not plot_periodos.empty:
+        secao["Indicadores de Período (Gráfico)"] = {'fig': _fig_periodos(
+            plot_periodos, "emissora", "ttm", "Últimos 12 meses (TTM)", "Emissora"
+        )}
+    return secao
+
+
+def render(df, mes_ini, mes_fim, show_labels):
+    st.header("Visão Geral")
+    
+    fig_evol = go.Figure()
+    periodos_raw = pd.DataFrame()
+    fig_periodos = go.Figure()
+    fig_emis = go.Figure()
+    fig_exec = go.Figure()
 
     anos = sorted(df["ano"].dropna().unique())
     if not anos:
         st.info("Sem anos válidos na base.")
         return
-    if len(anos) >= 2:
-        ano_base, ano_comp = anos[-2], anos[-1]
-    else:
-        ano_base = ano_comp = anos[-1]
+    ano_base, ano_comp = selecionar_comparacao(anos)
+
+    resultado = compute_visao_geral(df, {"mes_ini": mes_ini, "mes_fim": mes_fim, "ano_base": ano_base, "ano_comp": ano_comp})
+    evol_raw, base_emis_raw, base_exec_raw = resultado.evolucao, resultado.por_emissora, resultado.por_executivo
 
     ano_base_str = str(ano_base)[-2:]
     ano_comp_str = str(ano_comp)[-2:]
     label_delta_abs = f"Δ Absoluto ({ano_comp_str}-{ano_base_str})"
     label_delta_pct = f"Δ % ({ano_comp_str} vs {ano_base_str})"
 
-    base_periodo = df[df["mes"].between(mes_ini, mes_fim)]
-    baseA = base_periodo[base_periodo["ano"] == ano_base]
-    baseB = base_periodo[base_periodo["ano"] == ano_comp]
-
-    totalA = float(baseA["faturamento"].sum()) if not baseA.empty else 0.0
-    totalB = float(baseB["faturamento"].sum()) if not baseB.empty else 0.0
+    totalA = resultado.total_base
+    totalB = resultado.total_comp
     delta_abs = totalB - totalA
     delta_pct = (delta_abs / totalA * 100) if totalA > 0.0 else 0
 
     # Cards Abreviados
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric(f"Total {ano_base}", format_pt_br_abrev(totalA))
-    c2.metric(f"Total {ano_comp}", format_pt_br_abrev(totalB))
-    c3.metric(label_delta_abs, format_pt_br_abrev(delta_abs))
+    c1.metric(f"Total {ano_base}", brl_abrev(totalA))
+    c2.metric(f"Total {ano_comp}", brl_abrev(totalB))
+    c3.metric(label_delta_abs, brl_abrev(delta_abs))
     c4.metric(label_delta_pct, f"{delta_pct:.2f}%" if totalA > 0 else "—")
 
     
     st.markdown("<p class='custom-chart-title'>Evolução Mensal</p>", unsafe_allow_html=True)
     
-    evol_raw = base_periodo.groupby(["ano", "meslabel", "mes"], as_index=False)["faturamento"].sum().sort_values(["ano", "mes"])
-    
     if not evol_raw.empty:
-        fig_evol = px.line(
-            evol_raw,
-            x="meslabel",
-            y="faturamento",
-            color=evol_raw["ano"].astype(str),
-            markers=True,
-            template="plotly_white",
-            color_discrete_sequence=PALETTE,
-            labels={
-                "meslabel": "Mês",
-                "faturamento": "Faturamento",
-                "ano": "Ano"
-            }
-        )
-        
-        # Correção Eixo Y (PT-BR)
-        max_y = evol_raw['faturamento'].max()
-        tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
-
-        fig_evol.update_layout(
-            height=400, 
-            legend=dict(orientation="h", y=1.1, title_text="Ano"),
-            template="plotly_white"
-        )
-        
-        fig_evol.update_yaxes(
-            tickvals=tick_values,
-            ticktext=tick_texts,
-            range=[0, y_axis_cap]
-        )
-        
-        # Correção Rótulos (Fundo Branco e Fonte Preta)
-        if show_labels:
-            for trace in fig_evol.data:
-                ano_trace = trace.name
-                df_trace = evol_raw[evol_raw["ano"].astype(str) == ano_trace]
-                
-                for i in range(len(df_trace)):
-                    row = df_trace.iloc[i]
-                    fig_evol.add_annotation(
-                        x=row["meslabel"],
-                        y=row["faturamento"],
-                        text=format_pt_br_abrev(row["faturamento"]),
-                        showarrow=False,
-                        yshift=10, 
-                        font=dict(
-                            size=10,
-                            color="black" # Fonte preta
-                        ),
-                        bgcolor="rgba(255, 255, 255, 0.7)", # Fundo branco 70%
-                        borderpad=2
-                    )
-        
+        fig_evol = figura_cacheada("visao_evolucao", _fig_evolucao, evol_raw, show_labels=show_labels)
         st.plotly_chart(fig_evol, width="stretch") 
     else:
         st.info("Sem dados para o período selecionado.")
@@ -169,72 +243,77 @@ def render(df, mes_ini, mes_fim, show_labels):
 
     with col1:
         st.markdown("<p class='custom-chart-title'>Faturamento por Emissora</p>", unsafe_allow_html=True)
-        base_emis_raw = base_periodo.groupby("emissora", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
         
         if not base_emis_raw.empty:
-            fig_emis = px.bar(base_emis_raw, x="emissora", y="faturamento", color_discrete_sequence=[PALETTE[0]])
-            
-            # Correção Eixo Y (PT-BR)
-            max_y = base_emis_raw['faturamento'].max()
-            tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
-            
-            fig_emis.update_layout(
-                height=400, 
-                xaxis_title=None, 
-                yaxis_title="Faturamento", 
-                template="plotly_white"
-            )
-            
-            fig_emis.update_yaxes(
-                tickvals=tick_values,
-                ticktext=tick_texts,
-                range=[0, y_axis_cap]
+            # Gráfico em meia largura: maiores emissoras + "Outros"
+            plot_emis = top_n_com_outros(base_emis_raw, "emissora", barras_para_largura("metade"))
+            fig_emis = figura_cacheada(
+                "visao_emissora", _fig_barras, plot_emis, coluna="emissora", cor=PALETTE[0], show_labels=show_labels
             )
             
-            if show_labels:
-                fig_emis.update_traces(
-                    text=base_emis_raw['faturamento'].apply(format_pt_br_abrev),
-                    textposition='outside'
-                )
-            
             st.plotly_chart(fig_emis, width="stretch") 
         else:
             st.info("Sem dados de emissoras para o período.")
 
     with col2:
         st.markdown("<p class='custom-chart-title'>Faturamento por Executivo</p>", unsafe_allow_html=True)
-        base_exec_raw = base_periodo.groupby("executivo", as_index=False)["faturamento"].sum().sort_values("faturamento", ascending=False)
         
         if not base_exec_raw.empty:
-            fig_exec = px.bar(base_exec_raw, x="executivo", y="faturamento", color_discrete_sequence=[PALETTE[3]])
-            
-            # Correção Eixo Y (PT-BR)
-            max_y = base_exec_raw['faturamento'].max()
-            tick_values, tick_texts, y_axis_cap = get_pretty_ticks(max_y)
-
-            fig_exec.update_layout(
-                height=400, 
-                xaxis_title=None, 
-                yaxis_title="Faturamento", 
-                template="plotly_white"
-            )
-            
-            fig_exec.update_yaxes(
-                tickvals=tick_values,
-                ticktext=tick_texts,
-                range=[0, y_axis_cap]
+            plot_exec = top_n_com_outros(base_exec_raw, "executivo", barras_para_largura("metade"))
+            fig_exec = figura_cacheada(
+                "visao_executivo", _fig_barras, plot_exec, coluna="executivo", cor=PALETTE[3], show_labels=show_labels
             )
-
-            if show_labels:
-                fig_exec.update_traces(
-                    text=base_exec_raw['faturamento'].apply(format_pt_br_abrev),
-                    textposition='outside'
-                )
             
             st.plotly_chart(fig_exec, width="stretch") 
         else:
             st.info("Sem dados de executivos para o período.")
 
+    # ==================== INDICADORES DE PERÍODO (MoM, YTD, TTM) ====================
+    st.divider()
+    st.markdown("<p class='custom-chart-title'>Indicadores de Período</p>", unsafe_allow_html=True)
+
+    col_dim, col_met = st.columns(2)
+    with col_dim:
+        dim_periodo = st.radio("Abrir por:", ["Emissora", "Executivo"], horizontal=True, key="visao_periodo_dim")
+    with col_met:
+        met_periodo = st.radio(
+            "Métrica:", ["Últimos 12 meses (TTM)", "Acumulado no ano (YTD)", "Variação mensal (MoM %)"],
+            horizontal=True, key="visao_periodo_met"
+        )
+
+    dimensao_periodo = dim_periodo.lower()
+    periodos_raw, total_periodo = resultado.periodos[dimensao_periodo]
+
+    if total_periodo.empty:
+        st.info("Sem dados mensais para os indicadores de período.")
+    else:
+        ref = total_periodo.iloc[-1]
+        mes_ref = rotulo_mes(ref["ano"], ref["mes"])
+
+        def fmt_pct(v):
+            return None if pd.isna(v) else f"{v:.2f}%"
+
+        p1, p2, p3 = st.columns(3)
+        p1.metric(f"Faturamento {mes_ref} (MoM)", brl_abrev(ref["faturamento"]), fmt_pct(ref["mom_pct"]))
+        p2.metric(f"YTD {int(ref['ano'])} vs YTD {int(ref['ano']) - 1}", brl_abrev(ref["ytd"]), fmt_pct(ref["ytd_pct"]))
+        if pd.isna(ref["ttm"]):
+            p3.metric(f"Últimos 12 meses (até {mes_ref})", "—")
+        else:
+            p3.metric(f"Últimos 12 meses (até {mes_ref})", brl_abrev(ref["ttm"]))
+
+        coluna_met = {"Últimos 12 meses (TTM)": "ttm", "Acumulado no ano (YTD)": "ytd", "Variação mensal (MoM %)": "mom_pct"}[met_periodo]
+        plot_periodos = periodos_raw.dropna(subset=[coluna_met])
+
+        if plot_periodos.empty:
+            st.info("Histórico insuficiente para esta métrica (o TTM exige 12 meses seguidos dentro do filtro de meses).")
+        else:
+            fig_periodos = figura_cacheada(
+                "visao_periodos", _fig_periodos, plot_periodos[["meslabel", dimensao_periodo, coluna_met]],
+                casas=1 if coluna_met == "mom_pct" else 0,
+                dimensao=dimensao_periodo, coluna_met=coluna_met, titulo_met=met_periodo, titulo_dim=dim_periodo
+            )
+            st.plotly_chart(fig_periodos, width="stretch")
+
     ultima = st.session_state.get("ultima_atualizacao", None)
     if ultima:
         st.caption(f"Última atualização da base de dados: {ultima}")
@@ -248,70 +327,18 @@ def render(df, mes_ini, mes_fim, show_labels):
 
     if st.session_state.get("show_visao_geral_export", False):
         
-        @st.dialog("Opções de Exportação - Visão Geral")
-        def export_dialog():
-            
-            all_options = {
+        dialogo_exportacao(
+            "Visão Geral",
+            {
                 "Evolução Mensal (Dados)": {'df': evol_raw},
-                "Evolução Mensal (Gráfico)": {'fig': fig_evol}, 
+                "Evolução Mensal (Gráfico)": {'fig': fig_evol},
                 "Fat. por Emissora (Dados)": {'df': base_emis_raw},
-                "Fat. por Emissora (Gráfico)": {'fig': fig_emis}, 
+                "Fat. por Emissora (Gráfico)": {'fig': fig_emis},
                 "Fat. por Executivo (Dados)": {'df': base_exec_raw},
                 "Fat. por Executivo (Gráfico)": {'fig': fig_exec},
-            }
-            
-            available_options = []
-            for name, data in all_options.items():
-                if data.get('df') is not None and not data['df'].empty:
-                    available_options.append(name)
-                elif data.get('fig') is not None and data['fig'].data:
-                    available_options.append(name)
-
-            if not available_options:
-                st.warning("Nenhuma tabela ou gráfico com dados foi gerado nesta página.")
-                if st.button("Fechar", type="secondary"):
-                    st.session_state.show_visao_geral_export = False
-                    st.rerun()
-                return
-
-            st.write("Selecione os itens para incluir no **Pacote de Arquivos (.zip)**:")
-            
-            selected_names = st.multiselect(
-                "Itens para exportar",
-                options=available_options,
-                default=available_options 
-            )
-            
-            tables_to_export = {}
-            for name in selected_names:
-                data = all_options[name]
-                
-                # Garante que passamos o df ou a fig
-                if 'fig' in data or 'df' in data:
-                    tables_to_export[name] = data
-
-            if not tables_to_export:
-                st.error("Selecione pelo menos um item.")
-                return
-
-            try:
-                # CHAMADA CORRIGIDA: usa create_zip_package
-                zip_data = create_zip_package(tables_to_export) 
-                
-                # CORREÇÃO 2: Botão volta para o estilo 'secondary' e rótulo atualizado
-                st.download_button(
-                    label="Clique para baixar o pacote de arquivos",
-                    data=zip_data,
-                    file_name="Dashboard_Vendas_Export.zip",
-                    mime="application/zip",
-                    on_click=lambda: st.session_state.update(show_visao_geral_export=False),
-                    type="secondary" # Volta para o estilo secundário (branco/azul)
-                )
-            except Exception as e:
-                st.error(f"Erro ao gerar o pacote ZIP: {e}")
-
-            if st.button("Cancelar", key="cancel_export", type="secondary"):
-                st.session_state.show_visao_geral_export = False
-                st.rerun()
-
-        export_dialog()
\ No newline at end of file
+                "Indicadores de Período (Dados)": {'df': periodos_raw},
+                "Indicadores de Período (Gráfico)": {'fig': fig_periodos},
+            },
+            estado="show_visao_geral_export",
+            file_name="Dashboard_Vendas_Export.zip",
+        )
\ No newline at end of file
@@ -0,0 +1,116 @@
+# utils/abc.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+CORTE_A_PADRAO = 80.0
+CORTE_B_PADRAO = 95.0
+TOP_K_PADRAO = 10
+
+
+def build_abc_classification(
+    df: pd.DataFrame,
+    corte_a: float = CORTE_A_PADRAO,
+    corte_b: float = CORTE_B_PADRAO,
+    top_k: int = TOP_K_PADRAO,
+) -> tuple:
+    """
+    Curva ABC (Pareto) dos clientes por emissora e ano, e índices de
+    concentração de todas as emissoras.
+
+    Ordena o agregado (emissora, ano, cliente) uma vez, calcula a participação
+    acumulada com um único np.cumsum (descontando o acumulado dos grupos
+    anteriores) e resume cada grupo com np.add.reduceat. Classe A até corte_a %
+    do faturamento acumulado, B até corte_b %, C o restante.
+
+    Retorna (classificacao, concentracao).
+    """
+    col_class = ["emissora", "ano", "rank", "cliente", "faturamento", "participacao", "acumulado", "classe"]
+    col_conc = ["emissora", "ano", "clientes", "clientes_a", "clientes_b", "clientes_c",
+                "faturamento", "hhi", "gini", f"top{top_k}_share"]
+
+    agg = df.groupby(["emissora", "ano", "cliente"], observed=True, as_index=False)["faturamento"].sum()
+    agg = agg[agg["faturamento"] > 0]
+    if agg.empty:
+        return pd.DataFrame(columns=col_class), pd.DataFrame(columns=col_conc)
+
+    grupos, grupos_uni = pd.factorize(pd.MultiIndex.from_frame(agg[["emissora", "ano"]]))
+    valores = agg["faturamento"].to_numpy(dtype=np.float64)
+
+    # Ordena por grupo e, dentro dele, por faturamento decrescente
+    ordem = np.lexsort((-valores, grupos))
+    g = grupos[ordem]
+    v = valores[ordem]
+
+    inicios = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    tamanhos = np.diff(np.r_[inicios, len(g)])
+    totais = np.add.reduceat(v, inicios)
+
+    acum = np.cumsum(v)
+    acum_antes_grupo = np.r_[0.0, acum[inicios[1:] - 1]]
+    acum_grupo = acum - np.repeat(acum_antes_grupo, tamanhos)
+    total_rep = np.repeat(totais, tamanhos)
+
+    rank = np.arange(len(g)) - np.repeat(inicios, tamanhos) + 1
+    participacao = v / total_rep * 100
+    acumulado = acum_grupo / total_rep * 100
+    acumulado_antes = acumulado - participacao
+    classe = np.where(acumulado_antes < corte_a, "A", np.where(acumulado_antes < corte_b, "B", "C"))
+
+    classificacao = pd.DataFrame({
+        "emissora": agg["emissora"].to_numpy()[ordem],
+        "ano": agg["ano"].to_numpy()[ordem],
+        "rank": rank,
+        "cliente": agg["cliente"].to_numpy()[ordem],
+        "faturamento": v,
+        "participacao": participacao,
+        "acumulado": acumulado,
+        "classe": classe,
+    })
+
+    # Concentração: HHI (0-10.000), Gini e participação do top-k, todos por reduceat
+    n_rep = np.repeat(tamanhos, tamanhos)
+    hhi = np.add.reduceat((v / total_rep) ** 2, inicios) * 10_000
+    # Gini com posições em ordem crescente (i = n - rank + 1)
+    soma_ponderada = np.add.reduceat((n_rep - rank + 1) * v, inicios)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gini = np.where(
+            tamanhos > 1,
+            2 * soma_ponderada / (tamanhos * totais) - (tamanhos + 1) / tamanhos,
+            0.0,
+        )
+    top_share = np.add.reduceat(np.where(rank <= top_k, v, 0.0), inicios) / totais * 100
+
+    conta_classe = {
+        c: np.add.reduceat((classe == c).astype(np.int64), inicios) for c in ("A", "B", "C")
+    }
+    chaves = grupos_uni[g[inicios]]
+    concentracao = pd.DataFrame({
+        "emissora": chaves.get_level_values(0),
+        "ano": chaves.get_level_values(1),
+        "clientes": tamanhos,
+        "clientes_a": conta_classe["A"],
+        "clientes_b": conta_classe["B"],
+        "clientes_c": conta_classe["C"],
+        "faturamento": totais,
+        "hhi": hhi,
+        "gini": gini,
+        f"top{top_k}_share": top_share,
+    })
+    return classificacao, concentracao
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _abc_cached(chave: str, corte_a: float, corte_b: float, top_k: int, _df: pd.DataFrame) -> tuple:
+    return build_abc_classification(_df, corte_a, corte_b, top_k)
+
+
+def get_abc_classification(
+    df: pd.DataFrame,
+    corte_a: float = CORTE_A_PADRAO,
+    corte_b: float = CORTE_B_PADRAO,
+    top_k: int = TOP_K_PADRAO,
+) -> tuple:
+    """Versão em cache de build_abc_classification (por versão dos dados e filtros)."""
+    return _abc_cached(frame_key(df), float(corte_a), float(corte_b), int(top_k), df)
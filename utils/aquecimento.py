@@ -0,0 +1,106 @@
+# utils/aquecimento.py
+import threading
+import time
+import traceback
+import pandas as pd
+import streamlit as st
+from .cache import data_version, frame_key
+from .comparativo import get_dimension_year_aggregate
+from .filters import recorte_padrao
+from .loaders import arquivo_base_principal, ler_base_principal, load_crowley_base
+from .precalculo import extras_calculo, filtros_padrao, funcao_calculo
+from .ranking import get_rank_table, get_top_n_index
+from .relatorio import SECOES
+
+
+def _imprimir_etapa(nome: str, segundos: float):
+    print(f"  {nome:<48} {segundos:8.2f}s", flush=True)
+
+
+def _cronometro(etapas: list, relatar):
+    """etapa(nome, funcao, *args): executa, guarda (nome, segundos) em `etapas` e chama `relatar`."""
+    def etapa(nome, funcao, *args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        etapas.append((nome, time.perf_counter() - inicio))
+        if relatar is not None:
+            relatar(*etapas[-1])
+        return resultado
+
+    return etapa
+
+
+def aquecer_disco(relatar=_imprimir_etapa) -> tuple:
+    """
+    Caches em disco (data/.cache), os únicos que sobrevivem ao processo:
+    cache colunar da base principal e da Crowley e mapeamento de entidades
+    (resolução de clientes), gravados na leitura das bases de data/.
+
+    `relatar(etapa, segundos)` é chamado ao fim de cada etapa.
+    Retorna (df, [(etapa, segundos)]); df é None sem base principal válida.
+    """
+    etapas = []
+    etapa = _cronometro(etapas, relatar)
+
+    file_path = arquivo_base_principal()
+    if file_path is None:
+        return None, etapas
+    df, _ = etapa("Base principal (leitura e normalização)", ler_base_principal, file_path)
+    etapa("Base Crowley", load_crowley_base)
+    return (None if df.empty else df), etapas
+
+
+def aquecer(df: pd.DataFrame, relatar=_imprimir_etapa) -> list:
+    """
+    Deixa prontos, na memória do processo, os caches que o primeiro usuário
+    pagaria: versão dos dados, base Crowley, índices de ranking, agregados
+    por dimensão × ano e o resultado de todas as páginas com os filtros
+    padrão (período padrão, todas as emissoras, executivos e meses).
+
+    `relatar(etapa, segundos)` é chamado ao fim de cada etapa. Retorna [(etapa, segundos)].
+    """
+    etapas = []
+    etapa = _cronometro(etapas, relatar)
+
+    df_filtrado, mes_ini, mes_fim = etapa("Filtros padrão", recorte_padrao, df)
+    etapa("Versão dos dados e do recorte", lambda: (data_version(df_filtrado), frame_key(df_filtrado)))
+    df_crowley, _ = etapa("Base Crowley", load_crowley_base)
+
+    # Mesmo recorte por mês que os compute_<página> usam (as chaves de cache coincidem)
+    base_periodo = df_filtrado[df_filtrado["mes"].between(mes_ini, mes_fim)]
+    etapa("Índices de ranking (Top-N e ranks)", lambda: (get_top_n_index(base_periodo), get_rank_table(base_periodo)))
+    etapa("Agregados dimensão × ano", lambda: [
+        get_dimension_year_aggregate(base_periodo, dim) for dim in ("emissora", "executivo", "cliente")
+    ])
+
+    filtros = filtros_padrao(df_filtrado, mes_ini, mes_fim)
+    for titulo, modulo, _ in SECOES:
+        compute = funcao_calculo(modulo)
+        etapa(f"Página: {titulo}", compute, df_filtrado, filtros, **extras_calculo(modulo, df_crowley))
+
+    return etapas
+
+
+@st.cache_resource(show_spinner=False)
+def _aquecimento(versao: str, _df: pd.DataFrame):
+    """Uma thread de aquecimento por versão dos dados (primeira sessão autenticada e cada recarga da base)."""
+    def executar():
+        print(f"Aquecimento dos caches (dados {versao}):", flush=True)
+        try:
+            etapas = aquecer(_df)
+            print(f"  {'Total':<48} {sum(s for _, s in etapas):8.2f}s", flush=True)
+        except Exception:
+            traceback.print_exc()
+
+    thread = threading.Thread(target=executar, name="aquecimento", daemon=True)
+    thread.start()
+    return thread
+
+
+def iniciar_aquecimento(df: pd.DataFrame):
+    """
+    Dispara, em segundo plano, o aquecimento dos resultados padrão para a
+    versão de `df` (só na primeira vez que a versão aparece no processo).
+    """
+    # Cópia rasa: a normalização dos filtros não mexe no DataFrame da sessão
+    return _aquecimento(data_version(df), df.copy(deep=False))
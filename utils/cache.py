@@ -0,0 +1,152 @@
+# utils/cache.py
+import functools
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+import pandas as pd
+
+
+def data_version(df: pd.DataFrame) -> str:
+    """
+    Identificador da versão dos dados de um DataFrame.
+    Usa o carimbo gravado pelo loader em df.attrs["data_version"]; se ele não
+    existir (DataFrame montado fora do loader), calcula um hash do conteúdo.
+    """
+    versao = df.attrs.get("data_version")
+    if versao:
+        return str(versao)
+    conteudo = pd.util.hash_pandas_object(df, index=True).values
+    return hashlib.blake2b(conteudo.tobytes(), digest_size=16).hexdigest()
+
+
+def frame_key(df: pd.DataFrame) -> str:
+    """
+    Chave de cache de um recorte da base: versão dos dados + linhas selecionadas.
+    Os filtros só removem linhas da base (índice preservado), então o hash do
+    índice identifica o estado dos filtros sem percorrer o conteúdo.
+    """
+    indice = df.index
+    if indice.dtype.kind in "iu":
+        valores = indice.values
+    else:
+        valores = pd.util.hash_pandas_object(indice, index=False).values
+    linhas = hashlib.blake2b(valores.tobytes(), digest_size=16).hexdigest()
+    colunas = ",".join(map(str, df.columns))
+    return f"{data_version(df)}:{linhas}:{colunas}"
+
+
+def content_key(df: pd.DataFrame) -> str:
+    """
+    Hash do conteúdo de um DataFrame pequeno (agregados prontos para gráfico):
+    chave de caches que dependem só dos valores exibidos.
+    """
+    conteudo = pd.util.hash_pandas_object(df, index=True).values
+    colunas = ",".join(map(str, df.columns))
+    h = hashlib.blake2b(conteudo.tobytes(), digest_size=16)
+    h.update(colunas.encode())
+    return h.hexdigest()
+
+
+# Chaves das figuras já vistas: id(fig) -> (referência fraca, chave)
+_chaves_figura = {}
+
+
+def registrar_chave_figura(fig, chave: str) -> None:
+    """Associa à figura a chave dos dados que a geraram (dispensa serializá-la para o hash)."""
+    _chaves_figura[id(fig)] = (weakref.ref(fig, lambda _, i=id(fig): _chaves_figura.pop(i, None)), chave)
+
+
+def figure_key(fig) -> str:
+    """
+    Chave de uma figura Plotly: a registrada por figura_cacheada (hash do
+    agregado + opções) ou, para figuras montadas fora dela, o hash do JSON,
+    calculado uma única vez por objeto enquanto ele existir.
+    """
+    registro = _chaves_figura.get(id(fig))
+    if registro is not None and registro[0]() is fig:
+        return registro[1]
+    chave = hashlib.blake2b(fig.to_json().encode(), digest_size=16).hexdigest()
+    registrar_chave_figura(fig, chave)
+    return chave
+
+
+# ==================== RESULTADOS DAS PÁGINAS (LRU do processo) ====================
+
+# Resultados compute_<página> guardados (todas as sessões, todas as páginas)
+MAX_RESULTADOS = 64
+
+_resultados = OrderedDict()
+_trava_resultados = threading.Lock()
+
+
+def _valor_json(valor):
+    """Escalares NumPy viram o tipo Python equivalente (2024 e np.int64(2024) geram a mesma chave)."""
+    return valor.item() if hasattr(valor, "item") else str(valor)
+
+
+def filtros_key(filtros: dict) -> str:
+    """Hash estável de um dicionário de filtros (ordem das chaves não importa)."""
+    texto = json.dumps(filtros, sort_keys=True, default=_valor_json)
+    return hashlib.blake2b(texto.encode(), digest_size=16).hexdigest()
+
+
+def _chave_extra(valor) -> str:
+    if valor is None:
+        return "-"
+    if isinstance(valor, pd.DataFrame):
+        return data_version(valor)
+    return json.dumps(valor, sort_keys=True, default=_valor_json)
+
+
+def resultado_pagina(*chaves_filtro: str):
+    """
+    Decorador das funções compute_<página>(df, filtros, **extras).
+
+    O resultado fica num LRU do processo (MAX_RESULTADOS entradas), pela chave
+    (função, versão/recorte da base, hash dos filtros que a função usa,
+    versão das bases extras). Só as `chaves_filtro` entram no hash: o mesmo
+    dicionário de filtros pode ser passado a todas as páginas, e opções só de
+    exibição (rótulos, seletores de visualização) não geram recálculo.
+    Voltar a uma página com os mesmos filtros não recalcula nada.
+
+    O resultado é compartilhado entre sessões: quem o recebe não deve alterá-lo.
+    A função decorada ganha `.em_cache(df, filtros, **extras)`, que diz se o
+    resultado já está pronto.
+    """
+    def decorador(funcao):
+        nome = f"{funcao.__module__}.{funcao.__qualname__}"
+
+        def chave(df, filtros, extras):
+            usados = {k: filtros.get(k) for k in chaves_filtro}
+            return (
+                nome,
+                frame_key(df),
+                filtros_key(usados),
+                tuple(sorted((k, _chave_extra(v)) for k, v in extras.items())),
+            )
+
+        @functools.wraps(funcao)
+        def memorizada(df: pd.DataFrame, filtros: dict, **extras):
+            k = chave(df, filtros, extras)
+            with _trava_resultados:
+                if k in _resultados:
+                    _resultados.move_to_end(k)
+                    return _resultados[k]
+            resultado = funcao(df, filtros, **extras)
+            with _trava_resultados:
+                _resultados[k] = resultado
+                _resultados.move_to_end(k)
+                while len(_resultados) > MAX_RESULTADOS:
+                    _resultados.popitem(last=False)
+            return resultado
+
+        def em_cache(df: pd.DataFrame, filtros: dict, **extras) -> bool:
+            with _trava_resultados:
+                return chave(df, filtros, extras) in _resultados
+
+        memorizada.em_cache = em_cache
+        return memorizada
+
+    return decorador
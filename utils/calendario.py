@@ -0,0 +1,78 @@
+# utils/calendario.py
+import numpy as np
+import pandas as pd
+
+# Nomes fixos em pt-BR: não dependem do locale do processo
+MESES_ABREV = {
+    1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
+    7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"
+}
+MESES_ABREV_INVERSO = {v: k for k, v in MESES_ABREV.items()}
+
+# Granularidades de agregação -> coluna de rótulo e de ordenação no calendário
+GRANULARIDADES = {
+    "Mês": ("mes_nome", "mes"),
+    "Trimestre": ("trimestre_nome", "trimestre"),
+    "Semestre": ("semestre_nome", "semestre"),
+}
+
+
+def periodo_key(ano, mes):
+    """Chave inteira do mês (ano * 12 + mes - 1): meses consecutivos têm chaves consecutivas."""
+    return np.asarray(ano, dtype=np.int64) * 12 + np.asarray(mes, dtype=np.int64) - 1
+
+
+def build_calendar(periodo_ini: int, periodo_fim: int) -> pd.DataFrame:
+    """
+    Dimensão calendário: uma linha por mês entre as duas chaves (inclusive),
+    indexada pela chave do período, com ano, mês, trimestre, semestre e os
+    rótulos em pt-BR ("Jan/24", "T1/24", "S1/24").
+    """
+    periodos = np.arange(periodo_ini, periodo_fim + 1, dtype=np.int64)
+    ano = periodos // 12
+    mes = periodos % 12 + 1
+    trimestre = (mes - 1) // 3 + 1
+    semestre = (mes - 1) // 6 + 1
+    aa = pd.Series(ano % 100).astype(str).str.zfill(2).to_numpy(dtype=object)
+    mes_nome = np.array([MESES_ABREV[m] for m in range(1, 13)], dtype=object)[mes - 1]
+
+    return pd.DataFrame({
+        "ano": ano,
+        "mes": mes,
+        "trimestre": trimestre,
+        "semestre": semestre,
+        "mes_nome": mes_nome,
+        "trimestre_nome": "T" + trimestre.astype(str).astype(object),
+        "semestre_nome": "S" + semestre.astype(str).astype(object),
+        "meslabel": mes_nome + "/" + aa,
+        "trimestrelabel": "T" + trimestre.astype(str).astype(object) + "/" + aa,
+        "semestrelabel": "S" + semestre.astype(str).astype(object) + "/" + aa,
+    }, index=pd.Index(periodos, name="periodo"))
+
+
+def calendar_lookup(ano, mes, coluna: str = "meslabel") -> np.ndarray:
+    """
+    Atributo do calendário para cada linha (ano, mes), por junção na chave
+    inteira: o calendário tem uma linha por mês distinto e a busca é posicional.
+    Meses fora de 1..12 ficam vazios.
+    """
+    ano = np.asarray(ano, dtype=np.int64)
+    mes = np.asarray(mes, dtype=np.int64)
+    validos = (mes >= 1) & (mes <= 12)
+    if not validos.any():
+        return np.full(len(ano), "", dtype=object)
+
+    chave = periodo_key(ano, mes)
+    inicio, fim = chave[validos].min(), chave[validos].max()
+    valores = build_calendar(inicio, fim)[coluna].to_numpy()
+    posicao = np.clip(chave - inicio, 0, fim - inicio)
+    resultado = valores[posicao]
+    if not validos.all():
+        resultado = resultado.astype(object)
+        resultado[~validos] = ""
+    return resultado
+
+
+def rotulo_mes(ano: int, mes: int) -> str:
+    """Rótulo pt-BR de um único mês ("Set/25")."""
+    return f"{MESES_ABREV[int(mes)]}/{int(ano) % 100:02d}"
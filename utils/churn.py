@@ -0,0 +1,75 @@
+# utils/churn.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+
+def build_churn_decomposition(df: pd.DataFrame, dimensao: str, ano_base: int, ano_comp: int) -> pd.DataFrame:
+    """
+    Perdas, ganhos e retenção de clientes por emissora/executivo, com a ponte
+    de receita: Fat. base + Novos + Expansão − Contração − Perdidos = Fat. comparação.
+
+    Agrega uma única vez por (cliente, dimensão, ano), classifica cada par
+    (cliente, dimensão) de forma vetorizada e soma tudo em um só groupby pela
+    dimensão. Um cliente conta como perdido numa emissora se deixou de
+    comprar nela, mesmo que continue ativo em outra.
+    """
+    colunas = [
+        dimensao, "Clientes Base", "Clientes Comp.", "Perdidos", "Ganhos", "Retidos",
+        "Fat. Base", "Novos", "Expansão", "Contração", "Perdas", "Fat. Comp.",
+    ]
+    base = df[df["ano"].isin([ano_base, ano_comp])]
+    if base.empty or ano_base == ano_comp:
+        return pd.DataFrame(columns=colunas)
+
+    agg = base.groupby(["cliente", dimensao, "ano"], observed=True)["faturamento"].agg(["sum", "size"])
+    valor = agg["sum"].unstack("ano", fill_value=0.0)
+    linhas = agg["size"].unstack("ano", fill_value=0)
+    for ano in (ano_base, ano_comp):
+        if ano not in valor.columns:
+            valor[ano] = 0.0
+            linhas[ano] = 0
+
+    A = valor[ano_base].to_numpy(dtype=np.float64)
+    B = valor[ano_comp].to_numpy(dtype=np.float64)
+    presA = linhas[ano_base].to_numpy() > 0
+    presB = linhas[ano_comp].to_numpy() > 0
+
+    perdido = presA & ~presB
+    ganho = ~presA & presB
+    retido = presA & presB
+    diff = B - A
+
+    componentes = pd.DataFrame({
+        "Clientes Base": presA.astype(np.int64),
+        "Clientes Comp.": presB.astype(np.int64),
+        "Perdidos": perdido.astype(np.int64),
+        "Ganhos": ganho.astype(np.int64),
+        "Retidos": retido.astype(np.int64),
+        "Fat. Base": A,
+        "Novos": np.where(ganho, B, 0.0),
+        "Expansão": np.where(retido, np.maximum(diff, 0.0), 0.0),
+        "Contração": np.where(retido, np.maximum(-diff, 0.0), 0.0),
+        "Perdas": np.where(perdido, A, 0.0),
+        "Fat. Comp.": B,
+    })
+    chave = valor.index.get_level_values(dimensao)
+
+    resultado = (
+        componentes.groupby(chave.to_numpy(), sort=False).sum()
+        .sort_values("Fat. Comp.", ascending=False)
+        .rename_axis(dimensao)
+        .reset_index()
+    )
+    return resultado[colunas]
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _churn_cached(chave: str, dimensao: str, ano_base: int, ano_comp: int, _df: pd.DataFrame) -> pd.DataFrame:
+    return build_churn_decomposition(_df, dimensao, ano_base, ano_comp)
+
+
+def get_churn_decomposition(df: pd.DataFrame, dimensao: str, ano_base: int, ano_comp: int) -> pd.DataFrame:
+    """Versão em cache de build_churn_decomposition (por versão dos dados e filtros)."""
+    return _churn_cached(frame_key(df), dimensao, int(ano_base), int(ano_comp), df)
@@ -0,0 +1,102 @@
+# utils/cohort.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+
+def _periodos(df: pd.DataFrame, granularidade: str) -> np.ndarray:
+    """Índice inteiro do período de cada linha (ano, ou ano*12 + mês-1)."""
+    if "data_ref" in df.columns and pd.api.types.is_datetime64_any_dtype(df["data_ref"]):
+        anos = df["data_ref"].dt.year.to_numpy(dtype=np.int64)
+        meses = df["data_ref"].dt.month.to_numpy(dtype=np.int64)
+    else:
+        anos = df["ano"].to_numpy(dtype=np.int64)
+        meses = df["mes"].to_numpy(dtype=np.int64)
+
+    if granularidade == "mes":
+        return anos * 12 + (meses - 1)
+    return anos
+
+
+def _rotulo_periodo(periodo: int, granularidade: str) -> str:
+    if granularidade == "mes":
+        return f"{periodo % 12 + 1:02d}/{periodo // 12}"
+    return str(periodo)
+
+
+def build_cohort_matrix(df: pd.DataFrame, granularidade: str = "ano") -> dict:
+    """
+    Matriz de retenção por coorte (período da primeira compra do cliente).
+
+    Linhas = coorte, colunas = períodos após a primeira compra (+0, +1, ...).
+    Calcula a matriz triangular inteira de uma vez com bincount sobre os
+    pares (cliente, período), sem loop por coorte.
+
+    Retorna dict com DataFrames 'clientes', 'faturamento' e 'retencao' (%).
+    """
+    vazio = {"clientes": pd.DataFrame(), "faturamento": pd.DataFrame(), "retencao": pd.DataFrame()}
+    if df.empty or "cliente" not in df.columns:
+        return vazio
+
+    cli_codes, _ = pd.factorize(df["cliente"])
+    periodo = _periodos(df, granularidade)
+    valores = df["faturamento"].to_numpy(dtype=np.float64)
+
+    p_min = int(periodo.min())
+    n_per = int(periodo.max()) - p_min + 1
+    rel = periodo - p_min
+
+    # Primeiro período de cada cliente (coorte)
+    n_cli = int(cli_codes.max()) + 1
+    primeiro = np.full(n_cli, n_per, dtype=np.int64)
+    np.minimum.at(primeiro, cli_codes, rel)
+    coorte = primeiro[cli_codes]
+    celula = coorte * n_per + (rel - coorte)
+
+    # Receita: soma direta por célula (coorte, deslocamento)
+    fat = np.bincount(celula, weights=valores, minlength=n_per * n_per)
+
+    # Clientes: um cliente conta uma vez por período ativo
+    pares = np.unique(cli_codes.astype(np.int64) * n_per + rel)
+    pares_cli = pares // n_per
+    pares_rel = pares % n_per
+    pares_coorte = primeiro[pares_cli]
+    cli = np.bincount(pares_coorte * n_per + (pares_rel - pares_coorte), minlength=n_per * n_per)
+
+    cli = cli.reshape(n_per, n_per).astype(np.float64)
+    fat = fat.reshape(n_per, n_per)
+
+    # Células fora do triângulo (coorte + deslocamento além do último período) ficam vazias
+    fora = np.add.outer(np.arange(n_per), np.arange(n_per)) >= n_per
+    cli[fora] = np.nan
+    fat[fora] = np.nan
+
+    # Descarta coortes sem nenhum cliente (períodos filtrados)
+    ativas = np.nan_to_num(cli[:, 0]) > 0
+    cli, fat = cli[ativas], fat[ativas]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = cli / cli[:, [0]] * 100
+
+    index = pd.Index(
+        [_rotulo_periodo(p_min + i, granularidade) for i in np.flatnonzero(ativas)],
+        name="Coorte",
+    )
+    columns = [f"+{k}" for k in range(n_per)]
+
+    return {
+        "clientes": pd.DataFrame(cli, index=index, columns=columns),
+        "faturamento": pd.DataFrame(fat, index=index, columns=columns),
+        "retencao": pd.DataFrame(ret, index=index, columns=columns),
+    }
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cohort_cached(chave: str, granularidade: str, _df: pd.DataFrame) -> dict:
+    return build_cohort_matrix(_df, granularidade)
+
+
+def get_cohort_matrix(df: pd.DataFrame, granularidade: str = "ano") -> dict:
+    """Versão em cache de build_cohort_matrix (por versão dos dados e filtros)."""
+    return _cohort_cached(frame_key(df), granularidade, df)
@@ -0,0 +1,169 @@
+# utils/comparativo.py
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+
+@dataclass
+class TabelaComparativa:
+    """Tabela ano base × ano comparação: `raw` para exportação, `display` para a tela."""
+    raw: pd.DataFrame
+    display: pd.DataFrame
+
+
+def formatos_exportacao(raw: pd.DataFrame, valor: str = "faturamento") -> dict:
+    """
+    Formatos explícitos das colunas numéricas de uma tabela por ano para a
+    exportação (tables_to_export[nome]['formatos']): colunas de ano e Δ em
+    "brl" (ou "int" para valor="clientes"), Δ% e CAGR % em "pct". Os rótulos
+    de ano não dizem nada ao inferir_formato, que os deixaria no formato geral.
+    """
+    tipo = "int" if valor == "clientes" else "brl"
+    formatos = {
+        str(c): tipo for c in raw.columns
+        if isinstance(c, (int, np.integer)) or c == "Δ"
+    }
+    formatos.update({str(c): "pct" for c in raw.columns if c in ("Δ%", "CAGR %")})
+    return formatos
+
+
+def build_dimension_year_aggregate(df: pd.DataFrame, dimensao: str) -> pd.DataFrame:
+    """
+    Agregado longo por (dimensão, ano): faturamento somado e clientes distintos.
+    É a única passada sobre as linhas brutas; todas as comparações entre anos
+    (qualquer par, ou vários anos lado a lado) são servidas a partir dele.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[dimensao, "ano", "faturamento", "clientes"])
+    return (
+        df.groupby([dimensao, "ano"], observed=True)
+        .agg(faturamento=("faturamento", "sum"), clientes=("cliente", "nunique"))
+        .reset_index()
+    )
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _aggregate_cached(chave: str, dimensao: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return build_dimension_year_aggregate(_df, dimensao)
+
+
+def get_dimension_year_aggregate(df: pd.DataFrame, dimensao: str) -> pd.DataFrame:
+    """Versão em cache de build_dimension_year_aggregate (por versão dos dados e filtros)."""
+    return _aggregate_cached(frame_key(df), dimensao, df)
+
+
+def _matriz_anos(agg: pd.DataFrame, dimensao: str, anos: list, valor: str):
+    """Matriz densa (anos × entradas da dimensão) a partir do agregado, em ordem alfabética."""
+    codigos, rotulos = pd.factorize(agg[dimensao], sort=True)
+    n = len(rotulos)
+    dtype = np.int64 if valor == "clientes" else np.float64
+    matriz = np.zeros((len(anos), n), dtype=dtype)
+    anos_agg = agg["ano"].to_numpy()
+    valores = agg[valor].to_numpy(dtype=dtype)
+    for k, ano in enumerate(anos):
+        mask = anos_agg == ano
+        matriz[k, codigos[mask]] = valores[mask]
+    return matriz, rotulos
+
+
+def _numeracao(n: int, total: bool) -> np.ndarray:
+    numeros = np.empty(n + int(total), dtype=object)
+    numeros[:n] = np.arange(1, n + 1)
+    if total:
+        numeros[n] = "Total"
+    return numeros
+
+
+def _tabela(colunas: dict, numerar: bool, colunas_tela: list = None) -> TabelaComparativa:
+    raw = pd.DataFrame(colunas, copy=False)
+    tela = colunas if colunas_tela is None else {k: colunas[k] for k in colunas_tela}
+    display = pd.DataFrame({str(k): v for k, v in tela.items()}, copy=False)
+    if numerar:
+        display["#"] = display["#"].astype(str)
+    return TabelaComparativa(raw=raw, display=display)
+
+
+def build_comparative_table(
+    agg: pd.DataFrame,
+    dimensao: str,
+    ano_base: int,
+    ano_comp: int,
+    valor: str = "faturamento",
+    numerar: bool = True,
+    total_label: str = "Totalizador",
+) -> TabelaComparativa:
+    """
+    Monta a tabela comparativa (dimensão, ano base, ano comparação, Δ, Δ%,
+    linha Totalizador e coluna "#") a partir do agregado por (dimensão, ano)
+    de get_dimension_year_aggregate, em uma única passada vetorizada.
+
+    valor="faturamento" ou "clientes" (clientes distintos por entrada). As
+    linhas são todas as entradas da dimensão presentes no agregado, em ordem
+    alfabética (como o groupby das páginas).
+
+    `raw` (exportação) traz todos os anos do agregado; `display` só o ano
+    base e o de comparação. `display` compartilha os arrays de `raw`; só os
+    rótulos das colunas viram texto e "#" vira string, para o Styler/st.dataframe.
+    """
+    anos = sorted({int(a) for a in agg["ano"].unique()} | {int(ano_base), int(ano_comp)})
+    matriz, rotulos = _matriz_anos(agg, dimensao, anos, valor)
+    n = len(rotulos)
+
+    # Linha Totalizador anexada antes das contas: Δ e Δ% saem juntos para todas as linhas
+    if n:
+        matriz = np.concatenate([matriz, matriz.sum(axis=1, keepdims=True)], axis=1)
+        rotulos_final = np.append(rotulos.to_numpy(dtype=object), total_label)
+    else:
+        rotulos_final = np.array([], dtype=object)
+
+    A, B = matriz[anos.index(int(ano_base))], matriz[anos.index(int(ano_comp))]
+    delta = B - A
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(A > 0, delta / A * 100, np.nan)
+
+    colunas = {dimensao: rotulos_final}
+    colunas.update({ano: matriz[k] for k, ano in enumerate(anos)})
+    colunas.update({"Δ": delta, "Δ%": delta_pct})
+    colunas_tela = [dimensao, int(ano_base), int(ano_comp), "Δ", "Δ%"]
+    if numerar:
+        colunas = {"#": _numeracao(n, n > 0), **colunas}
+        colunas_tela = ["#"] + colunas_tela
+    return _tabela(colunas, numerar, colunas_tela)
+
+
+def build_multi_year_table(
+    agg: pd.DataFrame,
+    dimensao: str,
+    anos: list,
+    valor: str = "faturamento",
+    total_label: str = "Totalizador",
+) -> TabelaComparativa:
+    """
+    Vários anos lado a lado (uma coluna por ano) com o CAGR entre o primeiro e
+    o último ano, a partir do mesmo agregado por (dimensão, ano).
+    """
+    anos = sorted(anos)
+    matriz, rotulos = _matriz_anos(agg, dimensao, anos, valor)
+    n = len(rotulos)
+
+    if n:
+        matriz = np.concatenate([matriz, matriz.sum(axis=1, keepdims=True)], axis=1)
+        rotulos_final = np.append(rotulos.to_numpy(dtype=object), total_label)
+    else:
+        rotulos_final = np.array([], dtype=object)
+
+    primeiro, ultimo = matriz[0].astype(np.float64), matriz[-1].astype(np.float64)
+    periodos = len(anos) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(
+            (primeiro > 0) & (ultimo > 0) & (periodos > 0),
+            (np.power(ultimo / primeiro, 1 / max(periodos, 1)) - 1) * 100,
+            np.nan,
+        )
+
+    colunas = {"#": _numeracao(n, n > 0), dimensao: rotulos_final}
+    colunas.update({ano: matriz[k] for k, ano in enumerate(anos)})
+    colunas["CAGR %"] = cagr
+    return _tabela(colunas, True)
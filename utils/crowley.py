@@ -0,0 +1,136 @@
+# utils/crowley.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+from .entidades import resolve_entities
+from .format import normalize_key
+
+
+def build_key_index(*chaves: pd.Series) -> pd.Index:
+    """Índice (tabela hash) das chaves normalizadas das bases → código inteiro."""
+    unicos = pd.unique(np.concatenate([np.asarray(c, dtype=object) for c in chaves]))
+    return pd.Index(unicos, dtype=object)
+
+
+def _mapa_anunciantes(df_vendas: pd.DataFrame, df_crowley: pd.DataFrame) -> pd.Series:
+    """
+    Resolução de entidades (utils/entidades.py) sobre os nomes das duas bases
+    juntas: clientes (canônicos e originais) e anunciantes da Crowley. Os
+    nomes da base de vendas pesam mais, então o canônico de um grupo é um
+    cliente sempre que houver. Retorna Series nome -> nome canônico.
+    """
+    colunas = [c for c in ("cliente", "cliente_original") if c in df_vendas.columns]
+    vendas = pd.unique(np.concatenate([df_vendas[c].astype(str).to_numpy() for c in colunas]))
+    anunciantes = df_crowley["Anunciante"].astype(str).to_numpy()
+    nomes = pd.Index(pd.unique(np.concatenate([vendas, anunciantes])))
+    pesos = pd.Series(np.isin(nomes, vendas).astype(np.int64), index=nomes)
+    return resolve_entities(pd.Series(nomes), pesos)
+
+
+def build_share_comparison(df_vendas: pd.DataFrame, df_crowley: pd.DataFrame) -> tuple:
+    """
+    Share de mercado (inserções monitoradas pela Crowley) vs share de
+    faturamento (base de vendas) por emissora.
+
+    Anunciantes da Crowley passam pela mesma resolução de entidades dos
+    clientes (_mapa_anunciantes); anunciantes e emissoras das duas bases são
+    levados a chaves normalizadas, codificadas num índice único de inteiros,
+    e a junção é um merge (hash join) sobre esses códigos, não sobre os nomes.
+
+    Retorna (por_emissora, oportunidades): a tabela por emissora e os
+    anunciantes monitorados que não faturam em nenhuma emissora da base.
+    """
+    col_emis = ["Emissora", "Inserções", "Share de Mercado (%)", "Anunciantes (Crowley)",
+                "Anunciantes Clientes", "Cobertura (%)", "Faturamento", "Share de Faturamento (%)"]
+    col_oport = ["Anunciante", "Inserções", "Emissoras"]
+    if df_vendas.empty or df_crowley.empty:
+        return pd.DataFrame(columns=col_emis), pd.DataFrame(columns=col_oport)
+
+    # --- Chaves normalizadas e índices de inteiros ---
+    mapa = _mapa_anunciantes(df_vendas, df_crowley)
+    cli_key = normalize_key(df_vendas["cliente"].astype(str).map(mapa))
+    emis_key_v = normalize_key(df_vendas["emissora"])
+    emis_key_c = normalize_key(df_crowley["Emissora"].astype(object))
+    anun_key = normalize_key(df_crowley["Anunciante"].astype(str).map(mapa))
+
+    idx_anun = build_key_index(cli_key, anun_key)
+    idx_emis = build_key_index(emis_key_v, emis_key_c)
+
+    vendas = pd.DataFrame({
+        "emis": idx_emis.get_indexer(emis_key_v),
+        "anun": idx_anun.get_indexer(cli_key),
+        "faturamento": df_vendas["faturamento"].to_numpy(dtype=np.float64),
+    }).groupby(["emis", "anun"], as_index=False)["faturamento"].sum()
+
+    crowley = pd.DataFrame({
+        "emis": idx_emis.get_indexer(emis_key_c),
+        "anun": idx_anun.get_indexer(anun_key),
+        "insercoes": df_crowley["Insercoes"].to_numpy(dtype=np.int64),
+    }).groupby(["emis", "anun"], as_index=False)["insercoes"].sum()
+
+    # --- Hash join sobre os códigos (emissora, anunciante) ---
+    juncao = crowley.merge(vendas, on=["emis", "anun"], how="outer")
+    juncao["insercoes"] = juncao["insercoes"].fillna(0)
+    juncao["faturamento"] = juncao["faturamento"].fillna(0.0)
+    juncao["monitorado"] = juncao["insercoes"] > 0
+    juncao["cliente"] = juncao["monitorado"] & (juncao["faturamento"] > 0)
+
+    por_emis = juncao.groupby("emis").agg(
+        insercoes=("insercoes", "sum"),
+        anunciantes=("monitorado", "sum"),
+        clientes=("cliente", "sum"),
+        faturamento=("faturamento", "sum"),
+    )
+    total_ins = por_emis["insercoes"].sum()
+    total_fat = por_emis["faturamento"].sum()
+
+    # Nome de exibição: o da base de vendas quando existir, senão o da Crowley
+    nomes = pd.concat([
+        pd.Series(df_crowley["Emissora"].astype(object).to_numpy(), index=idx_emis.get_indexer(emis_key_c)),
+        pd.Series(df_vendas["emissora"].to_numpy(), index=idx_emis.get_indexer(emis_key_v)),
+    ])
+    nomes = nomes[~nomes.index.duplicated(keep="last")]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        por_emissora = pd.DataFrame({
+            "Emissora": nomes.reindex(por_emis.index).to_numpy(),
+            "Inserções": por_emis["insercoes"].astype(np.int64).to_numpy(),
+            "Share de Mercado (%)": por_emis["insercoes"].to_numpy() / total_ins * 100 if total_ins else 0.0,
+            "Anunciantes (Crowley)": por_emis["anunciantes"].astype(np.int64).to_numpy(),
+            "Anunciantes Clientes": por_emis["clientes"].astype(np.int64).to_numpy(),
+            "Cobertura (%)": np.where(
+                por_emis["anunciantes"] > 0, por_emis["clientes"] / por_emis["anunciantes"] * 100, np.nan
+            ),
+            "Faturamento": por_emis["faturamento"].to_numpy(),
+            "Share de Faturamento (%)": por_emis["faturamento"].to_numpy() / total_fat * 100 if total_fat else 0.0,
+        }).sort_values("Inserções", ascending=False, ignore_index=True)
+
+    # --- Anunciantes do mercado sem faturamento em nenhuma emissora da base ---
+    por_anun = juncao.groupby("anun").agg(
+        insercoes=("insercoes", "sum"),
+        faturamento=("faturamento", "sum"),
+        emissoras=("monitorado", "sum"),
+    )
+    sem_fat = por_anun[(por_anun["insercoes"] > 0) & (por_anun["faturamento"] <= 0)]
+    nomes_anun = pd.Series(
+        df_crowley["Anunciante"].astype(object).to_numpy(), index=idx_anun.get_indexer(anun_key)
+    )
+    nomes_anun = nomes_anun[~nomes_anun.index.duplicated()]
+    oportunidades = pd.DataFrame({
+        "Anunciante": nomes_anun.reindex(sem_fat.index).to_numpy(),
+        "Inserções": sem_fat["insercoes"].astype(np.int64).to_numpy(),
+        "Emissoras": sem_fat["emissoras"].astype(np.int64).to_numpy(),
+    }).sort_values("Inserções", ascending=False, ignore_index=True)
+
+    return por_emissora, oportunidades
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _share_cached(chave_vendas: str, chave_crowley: str, _df_vendas: pd.DataFrame, _df_crowley: pd.DataFrame) -> tuple:
+    return build_share_comparison(_df_vendas, _df_crowley)
+
+
+def get_share_comparison(df_vendas: pd.DataFrame, df_crowley: pd.DataFrame) -> tuple:
+    """Versão em cache de build_share_comparison (por versão das duas bases e filtros)."""
+    return _share_cached(frame_key(df_vendas), frame_key(df_crowley), df_vendas, df_crowley)
@@ -0,0 +1,180 @@
+# utils/entidades.py
+import os
+import hashlib
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from .format import TERMOS_SOCIETARIOS, normalize_key
+
+# Versão do algoritmo: muda a chave do cache persistido quando as regras mudam
+VERSAO_RESOLUCAO = "2"
+
+# Palavras sem poder de distinção entre anunciantes
+STOPWORDS = {"de", "da", "do", "das", "dos", "e", "em", "a", "o", "the", "grupo"}
+
+# Tokens que, quando sobram na assinatura, distinguem o anunciante ("Posto E"
+# x "Posto A", "Me Leva" x "Leva"): dois nomes só se unem por similaridade se
+# tiverem exatamente os mesmos
+_TERMOS_CURTOS = STOPWORDS | {p for termo in TERMOS_SOCIETARIOS for p in termo.split()}
+
+LIMIAR_SIMILARIDADE = 0.8   # Jaccard de trigramas para unir dois nomes
+MAX_BLOCO = 50              # Tokens mais frequentes que isso não geram blocos
+
+
+def _tokens(chave: str) -> tuple:
+    """
+    Tokens de uma chave normalizada, com plural simples removido. Stopwords
+    só saem quando o nome tem outras palavras; as de uma letra só saem entre
+    duas palavras ("Silva E Filhos"), não no início ou no fim ("Posto E").
+    """
+    palavras = chave.split()
+    tem_outras = any(p not in STOPWORDS for p in palavras)
+    tokens = []
+    for pos, t in enumerate(palavras):
+        if t in STOPWORDS and tem_outras and (len(t) > 1 or 0 < pos < len(palavras) - 1):
+            continue
+        if len(t) > 4 and t.endswith("s"):
+            t = t[:-1]
+        tokens.append(t)
+    return tuple(sorted(set(tokens)))
+
+
+def _trigramas(texto: str) -> frozenset:
+    texto = f"  {texto} "
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.pai = np.arange(n)
+
+    def find(self, i):
+        raiz = i
+        while self.pai[raiz] != raiz:
+            raiz = self.pai[raiz]
+        while self.pai[i] != raiz:
+            self.pai[i], i = raiz, self.pai[i]
+        return raiz
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.pai[max(ra, rb)] = min(ra, rb)
+
+
+def resolve_entities(nomes: pd.Series, pesos: pd.Series = None) -> pd.Series:
+    """
+    Resolve nomes de anunciantes para um nome canônico.
+
+    1. Chave sem acento/pontuação/termos societários finais, tokens ordenados
+       ("Supermercado Savegnago Ltda" e "Savegnago Supermercados" viram a
+       mesma assinatura e se unem direto).
+    2. Blocagem por índice invertido de tokens: só nomes que compartilham um
+       token não muito frequente são comparados.
+    3. Dentro dos blocos, une pares com Jaccard de trigramas >= LIMIAR_SIMILARIDADE
+       e os mesmos números, letras soltas e termos curtos.
+
+    O custo fica próximo de linear no número de nomes (blocos limitados a
+    MAX_BLOCO). O nome canônico de cada grupo é o mais frequente (pesos).
+
+    Retorna Series nome_original -> nome_canonico.
+    """
+    nomes = pd.Index(pd.unique(nomes.astype(str)))
+    if pesos is None:
+        pesos = pd.Series(1, index=nomes)
+    pesos = pesos.reindex(nomes, fill_value=0)
+
+    chaves = normalize_key(pd.Series(nomes, dtype=object)).to_numpy()
+    assinaturas = [_tokens(c) for c in chaves]
+
+    # Etapa 1: assinaturas idênticas
+    assin_codes, assin_unicas = pd.factorize(pd.Series([" ".join(a) for a in assinaturas], dtype=object))
+    n = len(assin_unicas)
+    uf = _UnionFind(n)
+
+    # Etapa 2: índice invertido token -> assinaturas
+    tokens_assin = [a.split() for a in assin_unicas]
+    indice = defaultdict(list)
+    for i, toks in enumerate(tokens_assin):
+        for t in toks:
+            indice[t].append(i)
+
+    # Etapa 3: similaridade apenas dentro dos blocos. Tokens com dígitos
+    # ("Hb23" x "Hb25", "Loja 2" x "Loja 3"), letras soltas e termos curtos
+    # que ficaram na assinatura ("Posto E" x "Posto A") precisam coincidir exatamente.
+    trigramas = [_trigramas(a) for a in assin_unicas]
+    exatos = [
+        frozenset(t for t in toks if len(t) == 1 or t in _TERMOS_CURTOS or any(ch.isdigit() for ch in t))
+        for toks in tokens_assin
+    ]
+    vistos = set()
+    for membros in indice.values():
+        if len(membros) < 2 or len(membros) > MAX_BLOCO:
+            continue
+        for pos, i in enumerate(membros):
+            for j in membros[pos + 1:]:
+                if (i, j) in vistos:
+                    continue
+                vistos.add((i, j))
+                if exatos[i] != exatos[j]:
+                    continue
+                a, b = trigramas[i], trigramas[j]
+                if len(a & b) / len(a | b) >= LIMIAR_SIMILARIDADE:
+                    uf.union(i, j)
+
+    grupo = np.array([uf.find(i) for i in range(n)])[assin_codes]
+    # Assinatura vazia (nome em branco) não se agrupa com nada
+    vazias = np.array([len(a) == 0 for a in assinaturas])
+    grupo = np.where(vazias, -1 - np.arange(len(nomes)), grupo)
+
+    # Nome canônico: maior peso no grupo; empate -> nome mais curto
+    tabela = pd.DataFrame({
+        "nome": nomes,
+        "grupo": grupo,
+        "peso": pesos.to_numpy(),
+        "tamanho": nomes.str.len(),
+    })
+    canonico = (
+        tabela.sort_values(["grupo", "peso", "tamanho", "nome"], ascending=[True, False, True, True])
+        .drop_duplicates("grupo")
+        .set_index("grupo")["nome"]
+    )
+    return pd.Series(canonico.reindex(grupo).to_numpy(), index=nomes, name="canonico")
+
+
+def _chave_nomes(nomes: pd.Index) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    h.update(VERSAO_RESOLUCAO.encode())
+    for nome in sorted(nomes):
+        h.update(nome.encode("utf-8", "ignore"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def resolve_entities_cached(nomes: pd.Series, cache_dir: str) -> pd.Series:
+    """
+    resolve_entities com o mapeamento persistido em cache_dir: o mesmo conjunto
+    de nomes reaproveita o arquivo entre cargas e reinícios do servidor.
+    """
+    contagem = nomes.astype(str).value_counts()
+    chave = _chave_nomes(contagem.index)
+    path = os.path.join(cache_dir, f"entidades-{chave}.parquet")
+
+    if os.path.exists(path):
+        try:
+            salvo = pd.read_parquet(path)
+            return pd.Series(salvo["canonico"].to_numpy(), index=salvo["nome"].to_numpy(), name="canonico")
+        except Exception:
+            pass # Cache corrompido: recalcula
+
+    mapa = resolve_entities(pd.Series(contagem.index), contagem)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for antigo in os.listdir(cache_dir):
+            if antigo.startswith("entidades-") and antigo.endswith(".parquet"):
+                os.remove(os.path.join(cache_dir, antigo))
+        pd.DataFrame({"nome": mapa.index, "canonico": mapa.to_numpy()}).to_parquet(path, index=False)
+    except Exception as e:
+        print(f"AVISO: mapeamento de entidades não gravado: {e}")
+    return mapa
+
@@ -1,103 +1,510 @@
 # utils/export.py
 import io
 import pandas as pd
-import streamlit as st 
-import plotly.io as pio
-import zipfile 
-import openpyxl 
-import os # Importado para manipulação de arquivos no ZIP (write/delete)
-
-# Tenta importar as bibliotecas de imagem
-try:
-    from openpyxl.drawing.image import Image as OpenpyxlImage # type: ignore
-    from PIL import Image as PillowImage # type: ignore
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
-
-def create_zip_package(tables_to_export: dict) -> bytes:
-    """
-    Cria um arquivo ZIP in-memory contendo o arquivo XLSX e os gráficos HTML,
-    excluindo o XLSX se apenas gráficos forem selecionados.
-    
+import streamlit as st
+import zipfile
+import tempfile
+import hashlib
+import html
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from .cache import content_key, figure_key
+
+
+# Acima disso o ZIP em construção sai da memória para um arquivo temporário
+LIMITE_MEMORIA_ZIP = 32 * 1024 * 1024
+
+# Rótulo no seletor do diálogo -> backend das tabelas
+FORMATOS_EXPORTACAO = {
+    "Excel (.xlsx)": "xlsx",
+    "CSV (.csv)": "csv",
+    "Parquet (.parquet)": "parquet",
+}
+
+# Formatos numéricos do Excel por tipo de coluna (aplicados na coluna, não célula a célula)
+FORMATOS_XLSX = {
+    "brl": '"R$" #,##0.00',
+    "pct": '0.00"%"',   # as tabelas guardam percentuais já multiplicados por 100
+    "int": '#,##0',
+    "data": 'dd/mm/yyyy',
+}
+
+_PALAVRAS_PCT = ("%", "pct", "percentil", "share", "particip", "retenção", "retencao", "cagr")
+_PALAVRAS_BRL = ("fat", "valor", "receita", "ytd", "ttm", "ticket", "média", "media", "investimento", "r$")
+_PALAVRAS_INT = ("clientes", "qtd", "quant", "rank", "posição", "ano", "mes", "mês", "#")
+
+
+def _nome_seguro(sheet_name: str) -> str:
+    for caractere in ':/\\?*[]':
+        sheet_name = sheet_name.replace(caractere, "")
+    return sheet_name[:31]
+
+
+def _abas_unicas(nomes) -> list:
+    """Nomes de aba válidos (até 31 caracteres) e distintos, na ordem recebida."""
+    usados, abas = set(), []
+    for nome in nomes:
+        base = _nome_seguro(nome)
+        aba, k = base, 2
+        while aba.lower() in usados:
+            sufixo = f" ({k})"
+            aba, k = base[:31 - len(sufixo)] + sufixo, k + 1
+        usados.add(aba.lower())
+        abas.append(aba)
+    return abas
+
+
+def inferir_formato(nome, serie: pd.Series):
+    """
+    Tipo da coluna para o Excel ("brl", "pct", "int", "data" ou None) pelo
+    dtype e pelo nome; número sem palavra-chave reconhecida fica no formato
+    geral (None). Tabelas podem informar o tipo explicitamente em
+    tables_to_export[nome]['formatos'] (chave = rótulo da coluna como texto),
+    que tem precedência sobre esta inferência.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "data"
+    if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return None
+
+    nome = str(nome).lower()
+    if any(p in nome for p in _PALAVRAS_PCT):
+        return "pct"
+    if any(p in nome for p in _PALAVRAS_BRL):
+        return "brl"
+    if pd.api.types.is_integer_dtype(serie) or any(p in nome for p in _PALAVRAS_INT):
+        return "int"
+    # Sem pista no nome (índices como HHI e Gini): formato geral do Excel
+    return None
+
+
+# ==================== BACKENDS DAS TABELAS ====================
+# Cada backend recebe o ZIP aberto, a lista [(nome, df, formatos)] e uma
+# função avancar(nome) chamada após cada tabela, e grava as tabelas direto
+# nas entradas do ZIP.
+
+def _valores_linha(df: pd.DataFrame):
+    """Linhas como tuplas de escalares Python (vazios viram None, que o xlsxwriter deixa em branco)."""
+    colunas = [
+        serie.astype(object).where(serie.notna(), None).tolist()
+        for _, serie in df.items()
+    ]
+    return zip(*colunas)
+
+
+def _escrever_xlsx(zf: zipfile.ZipFile, tabelas: list, avancar, arquivo: str = 'Dados_Tabelas.xlsx'):
+    """
+    Um único arquivo XLSX (uma aba por tabela) via xlsxwriter em modo
+    constant_memory: as linhas são gravadas em sequência e descarregadas,
+    sem manter as células da planilha em memória.
+    """
+    import xlsxwriter
+
+    with zf.open(arquivo, 'w', force_zip64=True) as entrada:
+        workbook = xlsxwriter.Workbook(entrada, {"constant_memory": True})
+        cabecalho = workbook.add_format({"bold": True})
+        formatos_wb = {tipo: workbook.add_format({"num_format": fmt}) for tipo, fmt in FORMATOS_XLSX.items()}
+
+        for safe_name, df, formatos in tabelas:
+            ws = workbook.add_worksheet(safe_name)
+            for i, (coluna, serie) in enumerate(df.items()):
+                tipo = formatos.get(str(coluna)) or inferir_formato(coluna, serie)
+                largura = min(40, max(12, len(str(coluna)) + 2))
+                ws.set_column(i, i, largura, formatos_wb.get(tipo))
+
+            ws.write_row(0, 0, [str(c) for c in df.columns], cabecalho)
+            for linha, valores in enumerate(_valores_linha(df), start=1):
+                ws.write_row(linha, 0, valores)
+            avancar(safe_name)
+
+        workbook.close()
+
+
+def _escrever_csv(zf: zipfile.ZipFile, tabelas: list, avancar):
+    """Um CSV por tabela, no padrão do Excel em pt-BR (";" e vírgula decimal, UTF-8 com BOM)."""
+    for safe_name, df, _ in tabelas:
+        with zf.open(f"Dados_Tabelas/{safe_name}.csv", 'w', force_zip64=True) as entrada:
+            with io.TextIOWrapper(entrada, encoding="utf-8-sig", newline="") as texto:
+                df.to_csv(texto, sep=";", decimal=",", index=False)
+        avancar(safe_name)
+
+
+def _escrever_parquet(zf: zipfile.ZipFile, tabelas: list, avancar):
+    """Um Parquet por tabela (nomes de coluna como texto; colunas de objetos como string)."""
+    for safe_name, df, _ in tabelas:
+        saida = df.rename(columns=str)
+        objetos = saida.select_dtypes(include="object").columns
+        if len(objetos):
+            saida = saida.astype({c: "string" for c in objetos})
+        with zf.open(f"Dados_Tabelas/{safe_name}.parquet", 'w', force_zip64=True) as entrada:
+            saida.to_parquet(entrada, index=False)
+        avancar(safe_name)
+
+
+BACKENDS = {
+    "xlsx": _escrever_xlsx,
+    "csv": _escrever_csv,
+    "parquet": _escrever_parquet,
+}
+
+
+class PacoteZip:
+    """
+    ZIP pronto, mantido no SpooledTemporaryFile em que foi montado (em
+    memória até LIMITE_MEMORIA_ZIP, em disco acima disso) até o primeiro
+    download.
+
+    O st.download_button só aceita o conteúdo inteiro em memória e o entrega
+    ao gerenciador de mídia a cada renderização do diálogo. Por isso
+    conteudo() lê o arquivo uma única vez por pacote, fecha-o e devolve
+    sempre o mesmo bytes, que o gerenciador reconhece sem guardar outra
+    cópia. O pico de memória de um download continua sendo o ZIP inteiro;
+    evita-se só uma cópia nova a cada renderização e a cada sessão.
+    """
+
+    def __init__(self, arquivo):
+        self._arquivo = arquivo
+        self._conteudo = None
+        self._trava = threading.Lock()
+        self.tamanho = arquivo.seek(0, io.SEEK_END)
+
+    def conteudo(self) -> bytes:
+        with self._trava:
+            if self._conteudo is None:
+                self._arquivo.seek(0)
+                self._conteudo = self._arquivo.read()
+                self._arquivo.close()
+            return self._conteudo
+
+
+def _montar_pacote(escrever) -> PacoteZip:
+    """ZIP gravado por escrever(zf) num SpooledTemporaryFile, devolvido como PacoteZip."""
+    destino = tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA_ZIP)
+    try:
+        with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zf:
+            escrever(zf)
+    except BaseException:
+        destino.close()
+        raise
+    return PacoteZip(destino)
+
+
+def create_zip_package(tables_to_export: dict, formato: str = "xlsx", progresso=None, avisos: list = None) -> PacoteZip:
+    """
+    Cria um arquivo ZIP contendo as tabelas selecionadas (no formato
+    escolhido: "xlsx", "csv" ou "parquet") e os gráficos HTML.
+
+    O conteúdo é decidido antes de abrir o ZIP e cada arquivo é gravado uma
+    única vez, direto na entrada do ZIP. O ZIP é montado num arquivo que fica
+    em memória até LIMITE_MEMORIA_ZIP e passa para o disco acima disso.
+
+    - progresso: função opcional progresso(fração, texto), chamada após cada arquivo.
+    - avisos: lista que recebe as falhas de gráficos; sem ela, as falhas vão para st.error.
+
     Returns:
-        Bytes do arquivo ZIP.
-    """
-    
-    zip_buffer = io.BytesIO()
-    has_real_data = False # Flag para rastrear se alguma tabela foi selecionada
-    
-    # Lista para rastrear os nomes de arquivos no ZIP que devem ser mantidos
-    files_to_keep = []
-
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-        
-        # --- A. Geração do Arquivo Excel (.xlsx) ---
-        excel_buffer = io.BytesIO()
-        engine = 'openpyxl'
-        
-        try:
-            import openpyxl
-        except ImportError:
-            st.error("A biblioteca 'openpyxl' é necessária para criar o Excel.")
-            return b""
-
-        with pd.ExcelWriter(excel_buffer, engine=engine) as writer:
-            
-            
-            for sheet_name, data in tables_to_export.items():
-                if data.get('df') is not None and not data['df'].empty:
-                    safe_name = sheet_name.replace(":", "").replace("/", "")[:31]
-                    data['df'].to_excel(writer, sheet_name=safe_name, index=False)
-                    has_real_data = True
-            
-            # Garante que o ExcelWriter não falhe, mesmo se has_real_data for False
-            if not has_real_data:
-                info_df = pd.DataFrame({'Info': ['Este arquivo de dados não possui tabelas, pois apenas gráficos foram selecionados para exportação.']})
-                info_df.to_excel(writer, sheet_name='Info_Vazio', index=False)
-        
-        # Define o nome do arquivo Excel no ZIP
-        excel_filename = 'Dados_Tabelas.xlsx'
-        zf.writestr(excel_filename, excel_buffer.getvalue())
-
-        # --- B. Geração e Adição dos Gráficos HTML ao ZIP ---
-        for sheet_name, data in tables_to_export.items():
-            fig = data.get('fig')
-            
-            if fig is not None:
-                try:
-                    safe_name = sheet_name.replace(":", "").replace("/", "")[:31]
-                    html_content = pio.to_html(fig, full_html=True, include_plotlyjs='cdn')
-                    
-                    file_name = f"{safe_name}_Grafico.html"
-                    zf.writestr(file_name, html_content)
-                    files_to_keep.append(file_name) # Adiciona o HTML para manter
-                
-                except Exception as e:
-                    st.error(f"Falha ao gerar o HTML para '{sheet_name}'. Gráfico não incluído no pacote. Erro: {e}")
-        
-        # --- C. CORREÇÃO FINAL: Exclusão Condicional do Excel ---
-        # A biblioteca zipfile não tem um método "remove" nativo para arquivos IN-MEMORY.
-        # A forma mais robusta de remover um arquivo IN-MEMORY é recriar o ZIP 
-        # *sem* o arquivo ou manipular o buffer.
-        
-    # --- Solução alternativa: Recriar o ZIP sem o XLSX se has_real_data for False ---
-    zip_buffer.seek(0)
-    if not has_real_data:
-        
-        temp_zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'r') as zip_read:
-            with zipfile.ZipFile(temp_zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_write:
-                
-                for item in zip_read.infolist():
-                    # Ignora o arquivo Excel e qualquer arquivo "Info_Vazio"
-                    if not item.filename.startswith('Dados_Tabelas.xlsx'):
-                        zip_write.writestr(item, zip_read.read(item))
-        
-        temp_zip_buffer.seek(0)
-        return temp_zip_buffer.getvalue()
-
-
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
\ No newline at end of file
+        PacoteZip com o arquivo ZIP.
+    """
+    tabelas = [
+        (_nome_seguro(nome), data['df'], data.get('formatos', {}))
+        for nome, data in tables_to_export.items()
+        if data.get('df') is not None and not data['df'].empty
+    ]
+    figuras = [
+        (nome, data['fig']) for nome, data in tables_to_export.items()
+        if data.get('fig') is not None
+    ]
+
+    total = max(1, len(tabelas) + len(figuras))
+    feitos = 0
+
+    def avancar(nome):
+        nonlocal feitos
+        feitos += 1
+        if progresso is not None:
+            progresso(feitos / total, nome)
+
+    import plotly.io as pio # Só quem exporta paga a importação
+
+    def escrever(zf):
+        # --- A. Tabelas, pelo backend do formato escolhido ---
+        if tabelas:
+            BACKENDS[formato](zf, tabelas, avancar)
+
+        # --- B. Gráficos HTML ---
+        for sheet_name, fig in figuras:
+            try:
+                html_content = pio.to_html(fig, full_html=True, include_plotlyjs='cdn')
+                zf.writestr(f"{_nome_seguro(sheet_name)}_Grafico.html", html_content)
+            except Exception as e:
+                mensagem = f"Falha ao gerar o HTML para '{sheet_name}'. Gráfico não incluído no pacote. Erro: {e}"
+                if avisos is None:
+                    st.error(mensagem)
+                else:
+                    avisos.append(mensagem)
+            avancar(sheet_name)
+
+    return _montar_pacote(escrever)
+
+
+def _escrever_html_graficos(zf: zipfile.ZipFile, figuras: list, arquivo: str, avancar):
+    """
+    Todos os gráficos num único HTML, agrupados por seção, com o plotly.js
+    embutido uma vez no cabeçalho (e não uma vez por gráfico).
+    """
+    import plotly.io as pio
+    from plotly.offline import get_plotlyjs
+
+    with zf.open(arquivo, 'w', force_zip64=True) as entrada:
+        with io.TextIOWrapper(entrada, encoding="utf-8") as saida:
+            saida.write("<!DOCTYPE html>\n<html lang='pt-BR'>\n<head>\n<meta charset='utf-8'>\n")
+            saida.write("<title>Relatório Completo - Gráficos</title>\n<script type='text/javascript'>")
+            saida.write(get_plotlyjs())
+            saida.write("</script>\n</head>\n<body style='font-family: sans-serif;'>\n")
+
+            secao_atual = None
+            for secao, nome, fig in figuras:
+                if secao != secao_atual:
+                    saida.write(f"<h2>{html.escape(secao)}</h2>\n")
+                    secao_atual = secao
+                saida.write(f"<h3>{html.escape(nome)}</h3>\n")
+                saida.write(pio.to_html(fig, full_html=False, include_plotlyjs=False))
+                saida.write("\n")
+                avancar(nome)
+            saida.write("</body>\n</html>\n")
+
+
+def create_report_package(secoes: dict, progresso=None) -> PacoteZip:
+    """
+    Pacote do relatório completo: um único XLSX com uma aba por tabela de
+    todas as páginas (e uma aba "Índice"), e um único HTML com todos os gráficos.
+
+    - secoes: {título da página: (sigla da aba, {nome: {'df': ...} ou {'fig': ...}})}
+    - progresso: função opcional progresso(fração, texto), chamada após cada arquivo.
+    """
+    itens_tabela, figuras = [], []
+    for titulo, (sigla, itens) in secoes.items():
+        for nome, data in itens.items():
+            if data.get('df') is not None and not data['df'].empty:
+                itens_tabela.append((titulo, nome, f"{sigla} {nome}", data['df'], data.get('formatos', {})))
+            elif data.get('fig') is not None and data['fig'].data:
+                figuras.append((titulo, nome, data['fig']))
+
+    abas = _abas_unicas(["Índice"] + [item[2] for item in itens_tabela])
+    indice = pd.DataFrame({
+        "Página": [item[0] for item in itens_tabela],
+        "Item": [item[1] for item in itens_tabela],
+        "Aba": abas[1:],
+    })
+    tabelas = [(abas[0], indice, {})] + [
+        (aba, df, formatos) for aba, (_, _, _, df, formatos) in zip(abas[1:], itens_tabela)
+    ]
+
+    total = max(1, len(tabelas) + len(figuras))
+    feitos = 0
+
+    def avancar(nome):
+        nonlocal feitos
+        feitos += 1
+        if progresso is not None:
+            progresso(feitos / total, nome)
+
+    def escrever(zf):
+        _escrever_xlsx(zf, tabelas, avancar, arquivo='Relatorio_Completo.xlsx')
+        if figuras:
+            _escrever_html_graficos(zf, figuras, 'Relatorio_Graficos.html', avancar)
+
+    return _montar_pacote(escrever)
+
+
+# ==================== EXPORTAÇÃO EM SEGUNDO PLANO ====================
+
+# Pacotes prontos (ou em construção) guardados por processo
+MAX_PACOTES = 16
+
+
+@dataclass
+class TrabalhoExportacao:
+    """Pacote em construção numa thread; o resultado (PacoteZip) fica em future."""
+    future: object = None
+    progresso: float = 0.0
+    etapa: str = "Na fila"
+    avisos: list = field(default_factory=list)
+
+
+@st.cache_resource(show_spinner=False)
+def _fila_exportacao():
+    """Pool de threads e registro de pacotes {chave: TrabalhoExportacao}, compartilhados entre sessões."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="exportacao"), OrderedDict(), threading.Lock()
+
+
+def chave_pacote(tables_to_export: dict, formato: str) -> str:
+    """
+    Hash do conteúdo dos itens selecionados + opções (formato, formatos de
+    coluna). Figuras entram pela chave de figure_key, sem serializá-las a
+    cada reexecução do diálogo.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(formato.encode())
+    for nome, data in tables_to_export.items():
+        h.update(nome.encode())
+        if data.get('df') is not None:
+            h.update(content_key(data['df']).encode())
+            h.update(json.dumps(data.get('formatos', {}), sort_keys=True, default=str).encode())
+        if data.get('fig') is not None:
+            h.update(figure_key(data['fig']).encode())
+    return h.hexdigest()
+
+
+def _executar(trabalho: TrabalhoExportacao, tables_to_export: dict, formato: str) -> PacoteZip:
+    def progresso(fracao, nome):
+        trabalho.progresso = fracao
+        trabalho.etapa = nome
+
+    trabalho.etapa = "Iniciando"
+    return create_zip_package(tables_to_export, formato, progresso=progresso, avisos=trabalho.avisos)
+
+
+def obter_trabalho(chave: str, executar=None, *args):
+    """
+    Trabalho em segundo plano registrado sob `chave`: o já existente (pronto
+    ou em andamento) ou, se `executar` for informado, um novo enviado ao pool
+    de threads como executar(trabalho, *args). Sem trabalho e sem `executar`,
+    retorna None. Trabalhos que falharam são descartados (permitem tentar de novo).
+    """
+    executor, pacotes, trava = _fila_exportacao()
+
+    with trava:
+        trabalho = pacotes.get(chave)
+        if trabalho is not None and trabalho.future.done() and trabalho.future.exception() is not None:
+            del pacotes[chave]
+            trabalho = None
+
+        if trabalho is not None:
+            pacotes.move_to_end(chave)
+            return trabalho
+        if executar is None:
+            return None
+
+        trabalho = TrabalhoExportacao()
+        trabalho.future = executor.submit(executar, trabalho, *args)
+        pacotes[chave] = trabalho
+
+        # Descarta os pacotes prontos mais antigos acima do limite
+        for antiga in list(pacotes):
+            if len(pacotes) <= MAX_PACOTES:
+                break
+            if pacotes[antiga].future.done():
+                del pacotes[antiga]
+        return trabalho
+
+
+def obter_exportacao(tables_to_export: dict, formato: str, iniciar: bool = False):
+    """
+    Trabalho de exportação dos itens/opções informados: o já existente (pronto
+    ou em andamento) ou, com iniciar=True, um novo enviado ao pool de threads.
+    Sem trabalho e sem iniciar, retorna None.
+    """
+    chave = chave_pacote(tables_to_export, formato)
+    if not iniciar:
+        return obter_trabalho(chave)
+    return obter_trabalho(chave, _executar, dict(tables_to_export), formato)
+
+
+INTERVALO_ANDAMENTO = 0.5 # segundos entre as atualizações da barra de progresso
+
+
+def andamento_exportacao(trabalho: TrabalhoExportacao, estado: str, file_name: str):
+    """Barra de progresso (atualizada sozinha enquanto o pacote é gerado) e, no fim, o botão de download."""
+    em_andamento = not trabalho.future.done()
+
+    @st.fragment(run_every=INTERVALO_ANDAMENTO if em_andamento else None)
+    def andamento():
+        if not trabalho.future.done():
+            st.progress(trabalho.progresso, text=f"Gerando pacote... {trabalho.etapa}")
+            return
+        if em_andamento:
+            # Terminou: reexecuta a página para parar a atualização periódica
+            st.rerun()
+
+        if trabalho.future.exception() is not None:
+            st.error(f"Erro ao gerar o pacote ZIP: {trabalho.future.exception()}")
+            return
+        for aviso in trabalho.avisos:
+            st.error(aviso)
+        st.download_button(
+            label="Clique para baixar o pacote de arquivos",
+            data=trabalho.future.result().conteudo(),
+            file_name=file_name,
+            mime="application/zip",
+            on_click=lambda: st.session_state.update({estado: False}),
+            type="secondary"
+        )
+
+    andamento()
+
+
+def dialogo_exportacao(titulo: str, all_options: dict, estado: str, file_name: str):
+    """
+    Diálogo de exportação comum às páginas. O pacote é gerado em segundo
+    plano (com barra de progresso); se os mesmos itens e opções já foram
+    exportados, o botão de download aparece direto.
+
+    - all_options: {nome: {'df': DataFrame} ou {'fig': Figure}} (opcionalmente 'formatos')
+    - estado: chave do session_state que mantém o diálogo aberto
+    - file_name: nome do .zip baixado
+    """
+
+    @st.dialog(f"Opções de Exportação - {titulo}")
+    def export_dialog():
+
+        available_options = []
+        for name, data in all_options.items():
+            if data.get('df') is not None and not data['df'].empty:
+                available_options.append(name)
+            elif data.get('fig') is not None and data['fig'].data:
+                available_options.append(name)
+
+        if not available_options:
+            st.warning("Nenhuma tabela ou gráfico com dados foi gerado nesta página.")
+            if st.button("Fechar", type="secondary"):
+                st.session_state[estado] = False
+                st.rerun()
+            return
+
+        st.write("Selecione os itens para incluir no **Pacote de Arquivos (.zip)**:")
+
+        selected_names = st.multiselect(
+            "Itens para exportar",
+            options=available_options,
+            default=available_options
+        )
+
+        tables_to_export = {name: all_options[name] for name in selected_names if name in all_options}
+
+        if any('df' in data for data in tables_to_export.values()):
+            rotulo_formato = st.radio(
+                "Formato das tabelas:", list(FORMATOS_EXPORTACAO), horizontal=True, key=f"{estado}_formato"
+            )
+        else:
+            rotulo_formato = next(iter(FORMATOS_EXPORTACAO))
+
+        if not tables_to_export:
+            st.error("Selecione pelo menos um item.")
+            return
+
+        formato = FORMATOS_EXPORTACAO[rotulo_formato]
+        trabalho = obter_exportacao(tables_to_export, formato)
+
+        if trabalho is None and st.button("Gerar pacote", key=f"{estado}_gerar", type="primary"):
+            trabalho = obter_exportacao(tables_to_export, formato, iniciar=True)
+        if trabalho is not None:
+            andamento_exportacao(trabalho, estado, file_name)
+
+        if st.button("Cancelar", key="cancel_export", type="secondary"):
+            st.session_state[estado] = False
+            st.rerun()
+
+    export_dialog()
@@ -2,11 +2,13 @@
 import streamlit as st
 import pandas as pd
 import json 
+from .calendario import MESES_ABREV, MESES_ABREV_INVERSO
 
-def aplicar_filtros(df, cookies):
-    """Aplica filtros interativos no corpo principal da página, com estado persistente."""
-
-    # ==================== NORMALIZAÇÃO ====================
+def preparar_base_filtros(df):
+    """
+    Normaliza (no próprio DataFrame) as colunas usadas pelos filtros globais:
+    nomes em minúsculas, mes/ano inteiros, emissora/executivo/cliente presentes.
+    """
     df.columns = df.columns.str.strip().str.lower()
 
     if "mes" not in df.columns: 
@@ -39,6 +41,52 @@ def aplicar_filtros(df, cookies):
 
     df["ano"] = pd.to_numeric(df["ano"], errors="coerce").fillna(0).astype(int)
     df["mes"] = pd.to_numeric(df["mes"], errors="coerce").fillna(0).astype(int)
+    return df
+
+
+def anos_padrao(anos_disponiveis):
+    """Período padrão do filtro de anos: 2024 a 2025 (ou o primeiro/último ano da base)."""
+    default_ini = 2024 if 2024 in anos_disponiveis else (anos_disponiveis[0] if anos_disponiveis else 2024)
+    default_fim = 2025 if 2025 in anos_disponiveis else (anos_disponiveis[-1] if anos_disponiveis else 2025)
+    return default_ini, default_fim
+
+
+def filtrar_base(df, ano_ini, ano_fim, emissoras, executivos, meses, clientes=None):
+    """Recorte da base pelos filtros globais (sem clientes selecionados = todos)."""
+    ano_1, ano_2 = min(ano_ini, ano_fim), max(ano_ini, ano_fim)
+    df_filtrado = df[
+        (df["ano"].between(ano_1, ano_2)) &
+        (df["emissora"].isin(emissoras)) &
+        (df["executivo"].isin(executivos)) &
+        (df["mes"].isin(meses))
+    ]
+    if clientes:
+        df_filtrado = df_filtrado[df_filtrado["cliente"].isin(clientes)]
+    return df_filtrado
+
+
+def recorte_padrao(df):
+    """
+    Base filtrada com os filtros globais de quem abre o app pela primeira vez
+    (período padrão, todas as emissoras, executivos e meses, nenhum cliente).
+    Retorna (df_filtrado, mes_ini, mes_fim).
+    """
+    df = preparar_base_filtros(df)
+    anos_disponiveis = sorted(df["ano"].dropna().unique())
+    ano_ini, ano_fim = anos_padrao(anos_disponiveis)
+    meses = sorted(df[df["mes"].between(1, 12)]["mes"].dropna().unique())
+    df_filtrado = filtrar_base(
+        df, ano_ini, ano_fim,
+        df["emissora"].dropna().unique(), df["executivo"].dropna().unique(), meses,
+    )
+    return df_filtrado, (min(meses) if meses else 1), (max(meses) if meses else 12)
+
+
+def aplicar_filtros(df, cookies):
+    """Aplica filtros interativos no corpo principal da página, com estado persistente."""
+
+    # ==================== NORMALIZAÇÃO ====================
+    df = preparar_base_filtros(df)
 
 
     # ==================== DADOS BASE PARA FILTROS ====================
@@ -47,11 +95,8 @@ def aplicar_filtros(df, cookies):
     execs = sorted(df["executivo"].dropna().unique())
     clientes = sorted(df["cliente"].dropna().unique())
     
-    mes_map = {
-        1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
-        7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"
-    }
-    mes_map_inverso = {v: k for k, v in mes_map.items()}
+    mes_map = MESES_ABREV
+    mes_map_inverso = MESES_ABREV_INVERSO
     
     meses_disponiveis_num = sorted(df[df["mes"].between(1, 12)]["mes"].dropna().unique())
     meses_disponiveis_nomes = [mes_map.get(m, m) for m in meses_disponiveis_num]
@@ -59,8 +104,7 @@ def aplicar_filtros(df, cookies):
 
     # ==================== LÓGICA DE PERSISTÊNCIA (SESSION STATE) ====================
     
-    default_ini = 2024 if 2024 in anos_disponiveis else (anos_disponiveis[0] if anos_disponiveis else 2024)
-    default_fim = 2025 if 2025 in anos_disponiveis else (anos_disponiveis[-1] if anos_disponiveis else 2025)
+    default_ini, default_fim = anos_padrao(anos_disponiveis)
     
     if "filtro_ano_ini" not in st.session_state:
         st.session_state["filtro_ano_ini"] = default_ini
@@ -81,6 +125,21 @@ def aplicar_filtros(df, cookies):
     
     if "filtro_show_labels" not in st.session_state:
         st.session_state["filtro_show_labels"] = True 
+
+    # Valores restaurados do cookie podem não existir mais na base (ano fora do
+    # período, cliente renomeado pela resolução de entidades): descarta-os
+    if st.session_state["filtro_ano_ini"] not in anos_disponiveis:
+        st.session_state["filtro_ano_ini"] = default_ini
+    if st.session_state["filtro_ano_fim"] not in anos_disponiveis:
+        st.session_state["filtro_ano_fim"] = default_fim
+    for chave, opcoes in [
+        ("filtro_emis", emisoras),
+        ("filtro_execs", execs),
+        ("filtro_clientes", clientes),
+        ("filtro_meses_lista", meses_disponiveis_nomes),
+    ]:
+        validas = set(opcoes)
+        st.session_state[chave] = [v for v in st.session_state[chave] if v in validas]
         
     # ==================== WIDGETS DE FILTRO ====================
     with st.container():
@@ -190,15 +249,7 @@ def aplicar_filtros(df, cookies):
     show_labels = st.session_state["filtro_show_labels"]
     
     
-    df_filtrado = df[
-        (df["ano"].between(ano_1, ano_2)) &
-        (df["emissora"].isin(emis_sel)) &
-        (df["executivo"].isin(exec_sel)) &
-        (df["mes"].isin(meses_sel_num))
-    ]
-
-    if cli_sel:
-        df_filtrado = df_filtrado[df_filtrado["cliente"].isin(cli_sel)]
+    df_filtrado = filtrar_base(df, ano_1, ano_2, emis_sel, exec_sel, meses_sel_num, cli_sel)
 
     st.divider()
     
@@ -218,4 +269,47 @@ def aplicar_filtros(df, cookies):
     except Exception as e:
         print(f"Erro ao salvar cookie: {e}")
 
-    return df_filtrado, anos_sel, emis_sel, exec_sel, cli_sel, mes_ini, mes_fim, show_labels
\ No newline at end of file
+    return df_filtrado, anos_sel, emis_sel, exec_sel, cli_sel, mes_ini, mes_fim, show_labels
+
+
+def anos_comparacao(anos, ano_base=None, ano_comp=None):
+    """
+    Par (ano base, ano comparação) válido dentro de `anos`: valores fora da
+    lista voltam ao padrão (penúltimo × último ano). Sem anos, (None, None).
+    """
+    anos = sorted(int(a) for a in anos)
+    if not anos:
+        return None, None
+    if ano_base not in anos:
+        ano_base = anos[-2] if len(anos) > 1 else anos[0]
+    if ano_comp not in anos:
+        ano_comp = anos[-1]
+    return int(ano_base), int(ano_comp)
+
+
+def selecionar_comparacao(anos, key_prefix="filtro_comp"):
+    """
+    Seletores de ano base e ano de comparação (qualquer par dentro dos anos
+    filtrados). Padrão: penúltimo × último ano. Retorna (ano_base, ano_comp);
+    com um único ano disponível, os dois são iguais.
+    """
+    anos = sorted(int(a) for a in anos)
+    if not anos:
+        return None, None
+
+    key_base, key_comp = f"{key_prefix}_base", f"{key_prefix}_comp"
+    ano_base, ano_comp = anos_comparacao(anos, st.session_state.get(key_base), st.session_state.get(key_comp))
+    if st.session_state.get(key_base) != ano_base:
+        st.session_state[key_base] = ano_base
+    if st.session_state.get(key_comp) != ano_comp:
+        st.session_state[key_comp] = ano_comp
+
+    if len(anos) == 1:
+        return anos[0], anos[0]
+
+    col1, col2, _ = st.columns([1, 1, 2])
+    with col1:
+        st.selectbox("Ano base:", anos, key=key_base)
+    with col2:
+        st.selectbox("Ano comparação:", anos, key=key_comp)
+    return st.session_state[key_base], st.session_state[key_comp]
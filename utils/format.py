@@ -1,19 +1,114 @@
 # utils/format.py
+import numpy as np
 import pandas as pd
 import re
 import streamlit as st
+from .calendario import calendar_lookup
 
 PALETTE = ["#007dc3", "#00a8e0", "#7ad1e6", "#004b8d", "#0095d9"]
 
+# Tabelas de consulta: converter inteiro -> texto com astype(str) é o passo mais lento
+_GRUPOS = np.array([str(i) for i in range(1000)])
+_GRUPOS_3 = np.strings.zfill(_GRUPOS, 3)
+_CENTAVOS = np.strings.zfill(_GRUPOS[:100], 2)
+
+
+def _milhar(inteiros: np.ndarray) -> np.ndarray:
+    """
+    Inteiros não negativos como texto com separador de milhar ".".
+    Todos os grupos saem com 3 dígitos ("001.234") e os zeros à esquerda são
+    removidos no fim, com ufuncs de np.strings sobre o array inteiro.
+    """
+    texto = _GRUPOS_3[inteiros % 1000]
+    resto = inteiros // 1000
+    while resto.any():
+        texto = np.strings.add(np.strings.add(_GRUPOS_3[resto % 1000], "."), texto)
+        resto = resto // 1000
+    texto = np.strings.lstrip(texto, "0.")
+    return np.where(inteiros == 0, "0", texto)
+
+
+def _arredondar(valores: np.ndarray, casas: int) -> np.ndarray:
+    """
+    round(valor, casas) × 10**casas como inteiro, com o mesmo arredondamento
+    de f"{valor:.{casas}f}" (decimal exato do double, meio para o par).
+    A multiplicação em ponto flutuante pode cruzar o meio (0,285 × 100 =
+    28,499999...); só os valores nessa faixa são decididos pelo formato do
+    Python, o resto sai do np.rint.
+    """
+    escalados = valores * 10 ** casas
+    inteiros = np.rint(escalados).astype(np.int64)
+    distancia_meio = np.abs(escalados - np.floor(escalados) - 0.5)
+    for i in np.flatnonzero(distancia_meio < 1e-6 + escalados * 1e-15):
+        inteiros[i] = int(f"{valores[i]:.{casas}f}".replace(".", ""))
+    return inteiros
+
+
+def brl_array(valores, abreviado: bool = False, na_rep: str = None) -> np.ndarray:
+    """
+    Formata um array de valores em Real (pt-BR) de uma vez: a montagem do
+    texto usa ufuncs de np.strings, sem chamada Python por valor.
+
+    abreviado=False: "R$ 1.234.567,89" (NaN -> "—").
+    abreviado=True:  "R$ 1,2 Mi", "R$ 12 mil", abaixo de mil o valor completo
+                     (zero e NaN -> "R$ 0").
+
+    Retorna array de objetos (str), pronto para colunas de DataFrame e text de gráficos.
+    """
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    nulos = np.isnan(valores)
+    absolutos = np.abs(np.where(nulos, 0.0, valores))
+    negativos = valores < 0
+
+    # Completo: centavos inteiros -> parte inteira agrupada + 2 casas ("R$ -1.234,56")
+    centavos = _arredondar(absolutos, 2)
+    numero = np.strings.add(
+        np.strings.add(_milhar(centavos // 100), ","),
+        _CENTAVOS[centavos % 100],
+    )
+    numero = np.where(negativos & (centavos > 0), np.strings.add("-", numero), numero)
+    completo = np.strings.add("R$ ", numero)
+
+    if not abreviado:
+        return np.where(nulos, "—" if na_rep is None else na_rep, completo).astype(object)
+
+    # Abreviado: sinal antes do símbolo ("-R$ 1,2 Mi"); cada faixa só formata as suas linhas
+    resultado = completo.astype(object)
+    prefixo = np.where(negativos, "-R$ ", "R$ ")
+
+    faixa_mi = absolutos >= 1_000_000
+    if faixa_mi.any():
+        decimos = _arredondar(absolutos[faixa_mi] / 1_000_000, 1)   # milhões com 1 casa
+        resultado[faixa_mi] = np.strings.add(
+            np.strings.add(np.strings.add(prefixo[faixa_mi], _milhar(decimos // 10)), ","),
+            np.strings.add(_GRUPOS[decimos % 10], " Mi"),
+        )
+
+    faixa_mil = (absolutos >= 1_000) & ~faixa_mi
+    if faixa_mil.any():
+        milhares = np.rint(absolutos[faixa_mil] / 1_000).astype(np.int64)
+        resultado[faixa_mil] = np.strings.add(np.strings.add(prefixo[faixa_mil], _milhar(milhares)), " mil")
+
+    resultado[absolutos == 0] = "R$ 0"
+    if na_rep is not None:
+        resultado[nulos] = na_rep
+    return resultado
+
+
 def brl(valor):
     """Formata número para Real (R$)."""
     try:
         if pd.isna(valor):
             return "—"
-        return f"R$ {float(valor):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return brl_array([float(valor)])[0]
     except Exception:
         return str(valor)
 
+
+def brl_abrev(valor):
+    """Formata número em Real abreviado ("R$ 1,2 Mi", "R$ 12 mil")."""
+    return brl_array([valor], abreviado=True)[0]
+
 def parse_currency_br(valor):
     """Converte string monetária BR para float."""
     if pd.isna(valor) or valor == "":
@@ -39,6 +134,90 @@ def normalize_text(texto):
         return ""
     return " ".join(p.capitalize() for p in texto.split())
 
+# Termos societários ignorados na chave de anunciante (só no fim do nome:
+# "Me Leva" e "Sa Imoveis" mantêm o termo, que ali faz parte do nome)
+TERMOS_SOCIETARIOS = ("ltda", "ltd", "me", "epp", "eireli", "sa", "s a", "cia", "companhia", "inc", "mei")
+SUFIXOS_EMPRESA = r"(?<=\S)(?:\s+(?:" + "|".join(TERMOS_SOCIETARIOS) + r"))+$"
+
+def normalize_key(serie: pd.Series) -> pd.Series:
+    """
+    Chave normalizada de anunciante/emissora (sem acento, minúscula, sem
+    pontuação e sem os termos societários do fim do nome; um nome feito só
+    de termo societário fica como está). Vetorizada e calculada só sobre os
+    valores únicos da coluna.
+    """
+    codigos, unicos = pd.factorize(serie.fillna("").astype(str))
+    chaves = (
+        pd.Series(unicos, dtype=object)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9 ]", " ", regex=True)
+        .str.split()
+        .str.join(" ")
+        .str.replace(SUFIXOS_EMPRESA, "", regex=True)
+    )
+    return pd.Series(chaves.to_numpy()[codigos], index=serie.index, dtype=object)
+
+def _map_unicos(serie: pd.Series, func) -> pd.Series:
+    """Aplica func apenas sobre os valores únicos da coluna (bases com muita repetição)."""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    mapeados = pd.Series([func(v) for v in unicos], dtype=object).to_numpy()
+    return pd.Series(mapeados[codigos], index=serie.index, dtype=object)
+
+def normalize_crowley_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza exportações de monitoramento Crowley (anunciante × emissora × mês)."""
+    df = df_raw.copy()
+    df.columns = df.columns.map(lambda c: str(c).strip())
+    col_map = {
+        "ANUNCIANTE": "Anunciante",
+        "Anunciante": "Anunciante",
+        "EMISSORA": "Emissora",
+        "Emissora": "Emissora",
+        "VEÍCULO": "Emissora",
+        "Veículo": "Emissora",
+        "INSERÇÕES": "Insercoes",
+        "Inserções": "Insercoes",
+        "QTDE": "Insercoes",
+        "DATA": "data_ref",
+        "Data": "data_ref",
+        "MÊS/ANO": "data_ref",
+        "Mês/Ano": "data_ref",
+    }
+    df = df.rename(columns=col_map)
+
+    if "Anunciante" not in df.columns or "Emissora" not in df.columns:
+        st.error("❌ A base Crowley precisa conter as colunas 'Anunciante' e 'Emissora'.")
+        return pd.DataFrame()
+    if "Insercoes" not in df.columns:
+        df["Insercoes"] = 1
+
+    if "data_ref" in df.columns:
+        df["data_ref"] = pd.to_datetime(df["data_ref"], errors="coerce", dayfirst=True)
+    elif "Ano" in df.columns and "Mês" in df.columns:
+        df["data_ref"] = pd.to_datetime(
+            dict(year=df["Ano"].astype(int), month=df["Mês"].astype(int), day=1),
+            errors="coerce"
+        )
+    else:
+        st.error("❌ A base Crowley precisa conter 'Data' ou colunas 'Ano' e 'Mês'.")
+        return pd.DataFrame()
+
+    df = df.dropna(subset=["data_ref"])
+    out = pd.DataFrame({
+        "Anunciante": _map_unicos(df["Anunciante"], normalize_text),
+        "Emissora": _map_unicos(df["Emissora"], normalize_text),
+        "Ano": df["data_ref"].dt.year.astype("int16"),
+        "Mes": df["data_ref"].dt.month.astype("int8"),
+        "Insercoes": pd.to_numeric(df["Insercoes"], errors="coerce").fillna(0).astype("int64"),
+    })
+    out["Anunciante_Key"] = normalize_key(out["Anunciante"])
+    # Colunas de texto repetitivas em categoria: base Crowley é bem maior que a de vendas
+    for col in ["Anunciante", "Emissora", "Anunciante_Key"]:
+        out[col] = out[col].astype("category")
+    return out.reset_index(drop=True)
+
 @st.cache_data(ttl=600)
 def normalize_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
     """Normaliza estrutura de planilhas de vendas (NovaBrasil)."""
@@ -100,7 +279,8 @@ def normalize_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
     # adiciona colunas de tempo
     df["Ano"] = df["data_ref"].dt.year
     df["Mes"] = df["data_ref"].dt.month
-    df["MesLabel"] = df["data_ref"].dt.strftime("%b/%y")
+    # Rótulo pelo calendário (junção na chave do mês), sem strftime por linha nem locale
+    df["MesLabel"] = calendar_lookup(df["Ano"].to_numpy(), df["Mes"].to_numpy())
 
     # converte valores
     df["Faturamento"] = df["Faturamento"].apply(parse_currency_br)
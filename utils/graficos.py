@@ -0,0 +1,184 @@
+# utils/graficos.py
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from .cache import content_key, registrar_chave_figura
+from .format import brl_array
+
+# Acima disso os rótulos de uma série são espaçados (um a cada k pontos)
+LIMITE_ROTULOS = 40
+# Acima disso o heatmap não mostra texto nas células (valores seguem no hover)
+LIMITE_CELULAS = 400
+
+FONTE_ROTULO = dict(size=10, color="black")
+
+# Casas decimais mantidas nos dados numéricos das figuras em cache (centavos
+# não aparecem nos gráficos; valores inteiros até ~16 Mi cabem em float32)
+CASAS_FIGURA = 0
+
+
+def get_pretty_ticks(max_val, num_ticks=5):
+    """Ticks "redondos" do eixo Y, com textos em Real abreviado. Retorna (valores, textos, teto do eixo)."""
+    if not max_val or max_val <= 0 or np.isnan(max_val):
+        return [0], ["R$ 0"], 100
+
+    ideal_interval = max_val / num_ticks
+    magnitude = 10**np.floor(np.log10(ideal_interval))
+    residual = ideal_interval / magnitude
+
+    if residual < 1.5: nice_interval = 1 * magnitude
+    elif residual < 3: nice_interval = 2 * magnitude
+    elif residual < 7: nice_interval = 5 * magnitude
+    else: nice_interval = 10 * magnitude
+
+    max_y_rounded = np.ceil(max_val / nice_interval) * nice_interval
+
+    tick_values = np.arange(0, max_y_rounded + nice_interval, nice_interval)
+    tick_texts = list(brl_array(tick_values, abreviado=True))
+
+    y_axis_cap = max_y_rounded * 1.05
+
+    return tick_values, tick_texts, y_axis_cap
+
+
+def mascara_rotulos(n: int, limite: int = LIMITE_ROTULOS) -> np.ndarray:
+    """Quais dos n pontos recebem rótulo: todos até `limite`, senão um a cada k (sempre o último)."""
+    if n <= limite:
+        return np.ones(n, dtype=bool)
+    passo = int(np.ceil(n / limite))
+    mascara = np.arange(n) % passo == 0
+    mascara[-1] = True
+    return mascara
+
+
+def textos_rotulo(valores, formato: str = "brl_abrev", limite: int = LIMITE_ROTULOS) -> np.ndarray:
+    """Textos dos rótulos de uma série inteira (vazio nos pontos espaçados)."""
+    valores = np.asarray(valores, dtype=np.float64)
+    if formato == "pct":
+        textos = np.char.mod("%.1f%%", np.nan_to_num(valores)).astype(object)
+    else:
+        textos = brl_array(valores, abreviado=(formato == "brl_abrev"))
+    textos[~mascara_rotulos(len(textos), limite)] = ""
+    textos[np.isnan(valores)] = ""
+    return textos
+
+
+def aplicar_rotulos(fig: go.Figure, formato: str = "brl_abrev", limite: int = LIMITE_ROTULOS) -> go.Figure:
+    """
+    Rótulos de dados em todas as séries de barras/linhas pelo `text` do próprio
+    trace (um array por série, numa única atualização), no lugar de uma
+    anotação por ponto. Séries com muitos pontos são espaçadas.
+    """
+    for trace in fig.data:
+        if trace.type not in ("bar", "scatter"):
+            continue
+        orientacao_h = trace.type == "bar" and trace.orientation == "h"
+        valores = trace.x if orientacao_h else trace.y
+        if valores is None:
+            continue
+        trace.text = textos_rotulo(valores, formato, limite)
+        trace.texttemplate = "%{text}"
+        trace.textfont = FONTE_ROTULO
+        if trace.type == "bar":
+            trace.textposition = "outside"
+            trace.cliponaxis = False
+        else:
+            trace.mode = "lines+markers+text" if trace.mode and "lines" in trace.mode else "markers+text"
+            trace.textposition = "top center"
+    return fig
+
+
+def rotulos_heatmap(fig: go.Figure, textos, limite: int = LIMITE_CELULAS) -> go.Figure:
+    """
+    Texto nas células do heatmap via texttemplate (cor de contraste automática
+    do Plotly), no lugar de uma anotação por célula. Com mais de `limite`
+    células, não rotula.
+    """
+    textos = np.asarray(textos, dtype=object)
+    if textos.size == 0 or textos.size > limite:
+        return fig
+    fig.update_traces(text=textos, texttemplate="%{text}", textfont=dict(size=11), selector=dict(type="heatmap"))
+    return fig
+
+
+# Largura aproximada do gráfico (px) por layout e espaço mínimo por barra
+LARGURA_GRAFICO = {"inteira": 1200, "metade": 580}
+PX_POR_BARRA = 40
+ROTULO_OUTROS = "Outros"
+
+
+def barras_para_largura(largura: str = "inteira", px_por_barra: int = PX_POR_BARRA, minimo: int = 5) -> int:
+    """Quantas barras cabem legíveis num gráfico de largura `largura` ("inteira" ou "metade" da página)."""
+    return max(minimo, LARGURA_GRAFICO.get(largura, LARGURA_GRAFICO["inteira"]) // px_por_barra)
+
+
+def top_n_com_outros(
+    df: pd.DataFrame, coluna: str, n: int, valor: str = "faturamento", rotulo_outros: str = ROTULO_OUTROS
+) -> pd.DataFrame:
+    """
+    Mantém as n maiores entradas (ordem decrescente) e soma o restante numa
+    barra "Outros", para o gráfico ter no máximo n + 1 barras.
+    Seleção por argpartition (O(len)) e ordenação só das n escolhidas.
+    """
+    if len(df) <= n:
+        return df.sort_values(valor, ascending=False)
+
+    valores = df[valor].to_numpy(dtype=np.float64)
+    escolhidos = np.argpartition(-valores, n - 1)[:n]
+    escolhidos = escolhidos[np.argsort(-valores[escolhidos], kind="stable")]
+
+    topo = df.iloc[escolhidos][[coluna, valor]]
+    outros = pd.DataFrame({coluna: [f"{rotulo_outros} ({len(df) - n})"], valor: [valores.sum() - valores[escolhidos].sum()]})
+    return pd.concat([topo, outros], ignore_index=True)
+
+
+def _compactar_array(valores, casas: int):
+    """Arrays numéricos arredondados; float32 quando a precisão pedida cabe nos 24 bits da mantissa."""
+    if valores is None or isinstance(valores, (str, dict)):
+        return valores
+    array = np.asarray(valores)
+    if array.dtype.kind not in "iuf" or array.size == 0:
+        return valores
+    array = np.round(array.astype(np.float64), casas)
+    maximo = np.nanmax(np.abs(array)) if np.isfinite(array).any() else 0.0
+    if maximo * 10 ** casas < 2 ** 24:
+        return array.astype(np.float32)
+    return array
+
+
+def compactar_figura(fig: go.Figure, casas: int = CASAS_FIGURA) -> go.Figure:
+    """
+    Reduz o payload da figura: x/y/z numéricos viram arrays NumPy arredondados
+    (float32 quando possível), que o Plotly serializa como typed arrays
+    (base64) em vez de listas de floats em texto.
+    """
+    for trace in fig.data:
+        for atributo in ("x", "y", "z"):
+            if atributo in trace:
+                valores = _compactar_array(trace[atributo], casas)
+                if valores is not trace[atributo]:
+                    trace[atributo] = valores
+    return fig
+
+
+@st.cache_resource(ttl=600, max_entries=64, show_spinner=False)
+def _figura_cached(nome: str, chave: str, opcoes: str, casas: int, _construtor, _dados: pd.DataFrame) -> go.Figure:
+    fig = compactar_figura(_construtor(_dados, **json.loads(opcoes)), casas)
+    registrar_chave_figura(fig, f"{nome}:{chave}:{opcoes}:{casas}")
+    return fig
+
+
+def figura_cacheada(nome: str, construtor, dados: pd.DataFrame, casas: int = CASAS_FIGURA, **opcoes) -> go.Figure:
+    """
+    Figura montada por `construtor(dados, **opcoes)` e guardada em cache pelo
+    hash do agregado + opções (show_labels, métrica...). Reexecuções que não
+    mudam o agregado (seletores de outra seção, diálogo de exportação)
+    reaproveitam a figura já compactada.
+
+    A figura é compartilhada entre sessões: quem a recebe não deve alterá-la.
+    """
+    return _figura_cached(
+        nome, content_key(dados), json.dumps(opcoes, sort_keys=True, default=str), casas, construtor, dados
+    )
@@ -1,9 +1,118 @@
 # utils/loaders.py
 import os
+import hashlib
 import pandas as pd
 import streamlit as st
 from datetime import datetime
-from .format import normalize_dataframe
+from .format import normalize_dataframe, normalize_crowley_dataframe
+from .entidades import resolve_entities_cached, VERSAO_RESOLUCAO
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+CROWLEY_DIR = os.path.join(DATA_DIR, "crowley")
+
+# Versão do formato normalizado: muda o nome do cache colunar quando a normalização muda
+VERSAO_NORMALIZACAO = "2"
+
+
+def _versao_arquivo(file_path):
+    """Identificador da versão de um arquivo de dados (nome, tamanho e modificação)."""
+    info = os.stat(file_path)
+    assinatura = f"{os.path.basename(file_path)}:{info.st_size}:{info.st_mtime_ns}"
+    return hashlib.blake2b(assinatura.encode(), digest_size=8).hexdigest()
+
+
+def _ler_com_cache(file_path, leitor):
+    """
+    Lê um arquivo de dados já normalizado a partir do cache colunar (Parquet em
+    data/.cache), refazendo a leitura com `leitor(file_path)` só quando o
+    arquivo de origem muda. Sem pyarrow, lê direto da origem.
+    """
+    nome = os.path.splitext(os.path.basename(file_path))[0]
+    cache_path = os.path.join(CACHE_DIR, f"{nome}-{_versao_arquivo(file_path)}-n{VERSAO_NORMALIZACAO}.parquet")
+
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception:
+            pass # Cache corrompido: relê a origem
+
+    df = leitor(file_path)
+    if df is None or df.empty:
+        return df
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Remove versões antigas do mesmo arquivo
+        for antigo in os.listdir(CACHE_DIR):
+            if antigo.startswith(f"{nome}-") and antigo.endswith(".parquet"):
+                os.remove(os.path.join(CACHE_DIR, antigo))
+        df.to_parquet(cache_path, index=False)
+    except Exception as e:
+        print(f"AVISO: cache colunar não gravado para {file_path}: {e}")
+    return df
+
+
+def _resolver_clientes(df):
+    """
+    Troca cada nome de cliente pelo nome canônico da entidade (ex.: "Supermercado
+    Savegnago Ltda" e "Savegnago Supermercados" viram o mesmo cliente).
+    O nome original fica em Cliente_Original.
+    """
+    mapa = resolve_entities_cached(df["Cliente"], CACHE_DIR)
+    df["Cliente_Original"] = df["Cliente"]
+    df["Cliente"] = df["Cliente"].map(mapa).fillna(df["Cliente"])
+    return df
+
+
+def arquivo_base_principal():
+    """Caminho do .xlsx da base principal em data/ (o primeiro encontrado) ou None."""
+    os.makedirs(DATA_DIR, exist_ok=True) # Cria a pasta se não existir
+    excel_files = [f for f in os.listdir(DATA_DIR) if f.lower().endswith(".xlsx")]
+    return os.path.join(DATA_DIR, excel_files[0]) if excel_files else None
+
+
+def ler_base_principal(file_path):
+    """
+    Lê e prepara a base principal sem depender da sessão (usada também pelo
+    aquecimento): cache colunar, resolução de clientes e versão dos dados.
+    Retorna (df, data_modificação); df vazio se a planilha não tiver dados válidos.
+    """
+    df = _ler_com_cache(
+        file_path,
+        lambda p: normalize_dataframe(pd.read_excel(p, engine="openpyxl"))
+    )
+    if df.empty:
+        return df, None
+
+    df = _resolver_clientes(df)
+
+    # Versão dos dados: chave dos caches das análises (utils/cache.py)
+    df.attrs["data_version"] = f"{_versao_arquivo(file_path)}-er{VERSAO_RESOLUCAO}"
+
+    # --- NOVA LÓGICA: PEGAR ÚLTIMO MÊS/ANO DA BASE ---
+    ultima_atualizacao = "N/A" 
+    if "data_ref" in df.columns and pd.api.types.is_datetime64_any_dtype(df["data_ref"]):
+        
+        # Pega a data mais recente válida
+        latest_date = df["data_ref"].max()
+        
+        if pd.notna(latest_date):
+            latest_month = latest_date.month
+            latest_year = latest_date.year
+            # Formata como MM/YYYY (02d garante o zero à esquerda)
+            ultima_atualizacao = f"{latest_month:02d}/{latest_year}"
+        else:
+            ultima_atualizacao = "Data Inválida"
+
+    else:
+        # Fallback para o tempo de modificação do arquivo se data_ref não estiver disponível
+        mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        ultima_atualizacao = mod_time.strftime("%d/%m/%Y")
+    # --- FIM DA NOVA LÓGICA ---
+
+    return df, ultima_atualizacao
+
 
 def load_main_base():
     """
@@ -21,48 +130,19 @@ def load_main_base():
         return df, data_modificacao
 
     # --- 2. Se não houver, procura na pasta /data ---
-    base_dir = os.path.dirname(os.path.dirname(__file__)) 
-    data_dir = os.path.join(base_dir, "data")
-
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir) # Cria a pasta se não existir
-
     try:
-        excel_files = [f for f in os.listdir(data_dir) if f.lower().endswith(".xlsx")]
+        file_path = arquivo_base_principal()
     except FileNotFoundError:
-        st.error(f"❌ Erro: O diretório '{data_dir}' não foi encontrado.")
+        st.error(f"❌ Erro: O diretório '{DATA_DIR}' não foi encontrado.")
         return None, None
 
-    if excel_files:
-        file_path = os.path.join(data_dir, excel_files[0]) # Pega o primeiro .xlsx que encontrar
+    if file_path:
         try:
-            df_raw = pd.read_excel(file_path, engine="openpyxl")
-            df = normalize_dataframe(df_raw)
+            df, ultima_atualizacao = ler_base_principal(file_path)
             if df.empty:
                 st.warning("⚠️ Base encontrada, mas sem dados válidos.")
                 return None, None
 
-            # --- NOVA LÓGICA: PEGAR ÚLTIMO MÊS/ANO DA BASE ---
-            ultima_atualizacao = "N/A" 
-            if "data_ref" in df.columns and pd.api.types.is_datetime64_any_dtype(df["data_ref"]):
-                
-                # Pega a data mais recente válida
-                latest_date = df["data_ref"].max()
-                
-                if pd.notna(latest_date):
-                    latest_month = latest_date.month
-                    latest_year = latest_date.year
-                    # Formata como MM/YYYY (02d garante o zero à esquerda)
-                    ultima_atualizacao = f"{latest_month:02d}/{latest_year}"
-                else:
-                    ultima_atualizacao = "Data Inválida"
-
-            else:
-                # Fallback para o tempo de modificação do arquivo se data_ref não estiver disponível
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                ultima_atualizacao = mod_time.strftime("%d/%m/%Y")
-            # --- FIM DA NOVA LÓGICA ---
-
             # Salva no cache da sessão para não precisar ler do disco toda hora
             st.session_state.uploaded_dataframe = df
             st.session_state.uploaded_timestamp = ultima_atualizacao
@@ -77,6 +157,57 @@ def load_main_base():
     return None, None
 
 
+def _ler_crowley(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv":
+        df_raw = pd.read_csv(file_path, sep=None, engine="python")
+    elif ext == ".parquet":
+        df_raw = pd.read_parquet(file_path)
+    else:
+        df_raw = pd.read_excel(file_path, engine="openpyxl")
+    return normalize_crowley_dataframe(df_raw)
+
+
+@st.cache_data(ttl=600, show_spinner="Carregando base Crowley...")
+def _load_crowley_cached(arquivos_versao):
+    partes = [_ler_com_cache(path, _ler_crowley) for path, _ in arquivos_versao]
+    partes = [p for p in partes if p is not None and not p.empty]
+    if not partes:
+        return pd.DataFrame()
+    df = pd.concat(partes, ignore_index=True)
+    for col in ["Anunciante", "Emissora", "Anunciante_Key"]:
+        df[col] = df[col].astype("category")
+    return df
+
+
 def load_crowley_base():
-    """Placeholder para base Crowley (não usada atualmente)."""
-    return None, None
\ No newline at end of file
+    """
+    Carrega as exportações de monitoramento Crowley da pasta /data/crowley
+    (.xlsx, .csv ou .parquet), com o mesmo cache colunar da base de vendas.
+    Retorna (df, última referência MM/AAAA) ou (None, None) se não houver arquivos.
+    """
+    if not os.path.isdir(CROWLEY_DIR):
+        return None, None
+
+    arquivos = sorted(
+        os.path.join(CROWLEY_DIR, f) for f in os.listdir(CROWLEY_DIR)
+        if f.lower().endswith((".xlsx", ".csv", ".parquet"))
+    )
+    if not arquivos:
+        return None, None
+
+    try:
+        df = _load_crowley_cached(tuple((p, _versao_arquivo(p)) for p in arquivos))
+    except Exception as e:
+        st.error(f"Erro ao ler base Crowley: {e}")
+        return None, None
+
+    if df.empty:
+        return None, None
+
+    df.attrs["data_version"] = hashlib.blake2b(
+        "|".join(_versao_arquivo(p) for p in arquivos).encode(), digest_size=8
+    ).hexdigest()
+    ultimo = df["Ano"].astype(int) * 100 + df["Mes"].astype(int)
+    ultimo = int(ultimo.max())
+    return df, f"{ultimo % 100:02d}/{ultimo // 100}"
@@ -0,0 +1,128 @@
+# utils/periodos.py
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+
+@dataclass
+class SerieMensal:
+    """Matriz densa entidade × mês (meses contíguos; NaN nos meses fora do filtro)."""
+    entidades: pd.Index
+    periodos: np.ndarray   # chave do mês: ano * 12 + (mes - 1)
+    valores: np.ndarray    # float64, shape (entidades, meses)
+
+
+def build_monthly_matrix(df: pd.DataFrame, dimensao: str) -> SerieMensal:
+    """
+    Soma do faturamento por (entidade, mês) numa matriz densa, com todos os
+    meses entre o primeiro e o último da base. Meses sem venda ficam 0; meses
+    do calendário que não aparecem na base em nenhum ano (removidos pelo
+    filtro de meses) ficam NaN, para o TTM e o MoM não os tratarem como zero.
+    Um único bincount sobre as linhas; os kernels abaixo trabalham só na matriz.
+    """
+    base = df[df["mes"].between(1, 12)]
+    if base.empty:
+        return SerieMensal(pd.Index([], dtype=object), np.array([], dtype=np.int64), np.zeros((0, 0)))
+
+    codigos, entidades = pd.factorize(base[dimensao], sort=True)
+    chave = base["ano"].to_numpy(dtype=np.int64) * 12 + base["mes"].to_numpy(dtype=np.int64) - 1
+    inicio = chave.min()
+    n_meses = int(chave.max() - inicio + 1)
+
+    flat = codigos.astype(np.int64) * n_meses + (chave - inicio)
+    valores = np.bincount(
+        flat, weights=base["faturamento"].to_numpy(dtype=np.float64), minlength=len(entidades) * n_meses
+    ).reshape(len(entidades), n_meses)
+
+    periodos = np.arange(inicio, inicio + n_meses, dtype=np.int64)
+    valores[:, ~np.isin(periodos % 12 + 1, base["mes"].unique())] = np.nan
+    return SerieMensal(entidades, periodos, valores)
+
+
+# ==================== KERNELS (sobre a matriz entidade × mês) ====================
+
+def variacao_mom(valores: np.ndarray) -> np.ndarray:
+    """Variação % sobre o mês anterior; NaN no primeiro mês ou com mês anterior zerado."""
+    anterior = np.full_like(valores, np.nan)
+    anterior[:, 1:] = valores[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(anterior > 0, (valores - anterior) / anterior * 100, np.nan)
+
+
+def acumulado_ano(valores: np.ndarray, periodos: np.ndarray) -> np.ndarray:
+    """Acumulado no ano (YTD) dos meses do filtro: cumsum que reinicia em janeiro; NaN nos meses fora dele."""
+    acumulado = np.cumsum(np.nan_to_num(valores), axis=1)
+    # Coluna do último mês do ano anterior (-1 quando o ano começa na 1ª coluna)
+    fim_anterior = np.arange(len(periodos)) - periodos % 12 - 1
+    base = np.where(fim_anterior >= 0, acumulado[:, np.maximum(fim_anterior, 0)], 0.0)
+    return np.where(np.isnan(valores), np.nan, acumulado - base)
+
+
+def janela_movel(valores: np.ndarray, janela: int = 12) -> np.ndarray:
+    """
+    Soma móvel dos últimos `janela` meses (TTM); NaN enquanto a janela não
+    está completa ou quando ela inclui algum mês NaN (fora do filtro).
+    """
+    zeros = np.zeros((valores.shape[0], 1))
+    acumulado = np.concatenate([zeros, np.cumsum(np.nan_to_num(valores), axis=1)], axis=1)
+    faltantes = np.concatenate([zeros, np.cumsum(np.isnan(valores), axis=1)], axis=1)
+    soma = acumulado[:, janela:] - acumulado[:, :-janela]
+    completa = (faltantes[:, janela:] - faltantes[:, :-janela]) == 0
+    resultado = np.full_like(valores, np.nan)
+    resultado[:, janela - 1:] = np.where(completa, soma, np.nan)
+    return resultado
+
+
+def defasar(matriz: np.ndarray, meses: int) -> np.ndarray:
+    """Mesma métrica `meses` antes (ex.: 12 para o YTD do ano anterior); NaN fora da série."""
+    resultado = np.full_like(matriz, np.nan)
+    if meses < matriz.shape[1]:
+        resultado[:, meses:] = matriz[:, :-meses]
+    return resultado
+
+
+def build_period_kernels(serie: SerieMensal, dimensao: str, incluir_total: bool = True) -> pd.DataFrame:
+    """
+    Tabela longa (entidade, mês) com faturamento, MoM %, YTD, YTD do ano
+    anterior (mesmos meses), Δ% YTD e TTM, calculados de uma vez na matriz.
+    Com incluir_total, a linha "Total" soma todas as entidades.
+    """
+    colunas = [dimensao, "ano", "mes", "faturamento", "mom_pct", "ytd", "ytd_anterior", "ytd_pct", "ttm"]
+    if serie.valores.size == 0:
+        return pd.DataFrame(columns=colunas)
+
+    entidades = serie.entidades.to_numpy(dtype=object)
+    valores = serie.valores
+    if incluir_total:
+        valores = np.vstack([valores, valores.sum(axis=0, keepdims=True)])
+        entidades = np.append(entidades, "Total")
+
+    ytd = acumulado_ano(valores, serie.periodos)
+    ytd_anterior = defasar(ytd, 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ytd_pct = np.where(ytd_anterior > 0, (ytd - ytd_anterior) / ytd_anterior * 100, np.nan)
+
+    n_ent, n_meses = valores.shape
+    return pd.DataFrame({
+        dimensao: np.repeat(entidades, n_meses),
+        "ano": np.tile(serie.periodos // 12, n_ent),
+        "mes": np.tile(serie.periodos % 12 + 1, n_ent),
+        "faturamento": valores.ravel(),
+        "mom_pct": variacao_mom(valores).ravel(),
+        "ytd": ytd.ravel(),
+        "ytd_anterior": ytd_anterior.ravel(),
+        "ytd_pct": ytd_pct.ravel(),
+        "ttm": janela_movel(valores).ravel(),
+    }, columns=colunas)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _kernels_cached(chave: str, dimensao: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return build_period_kernels(build_monthly_matrix(_df, dimensao), dimensao)
+
+
+def get_period_kernels(df: pd.DataFrame, dimensao: str) -> pd.DataFrame:
+    """Versão em cache de build_period_kernels (por versão dos dados e filtros)."""
+    return _kernels_cached(frame_key(df), dimensao, df)
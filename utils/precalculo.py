@@ -0,0 +1,98 @@
+# utils/precalculo.py
+import importlib
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import streamlit as st
+from .abc import CORTE_A_PADRAO, CORTE_B_PADRAO, TOP_K_PADRAO
+from .cache import filtros_key, frame_key
+from .filters import anos_comparacao
+from .loaders import load_crowley_base
+from .relatorio import SECOES
+
+# Poucas threads: as sessões ativas têm prioridade na CPU
+TRABALHADORES_PRECALCULO = 2
+
+
+def filtros_padrao(df: pd.DataFrame, mes_ini: int, mes_fim: int) -> dict:
+    """
+    Filtros com que cada página abre (anos penúltimo × último, cortes ABC e
+    top-k padrão, coorte por ano), no mesmo formato que o render passa ao
+    compute_<página>. A navegação (?nav=N) recarrega a sessão, então é este
+    o estado que a próxima página vai procurar no cache.
+    """
+    ano_base, ano_comp = anos_comparacao(df["ano"].dropna().unique())
+    return {
+        "mes_ini": int(mes_ini),
+        "mes_fim": int(mes_fim),
+        "ano_base": ano_base,
+        "ano_comp": ano_comp,
+        "corte_a": int(CORTE_A_PADRAO),
+        "corte_b": int(CORTE_B_PADRAO),
+        "top_k": TOP_K_PADRAO,
+        "granularidade_coorte": "ano",
+    }
+
+
+def funcao_calculo(modulo: str):
+    """compute_<página> de pages.<modulo>."""
+    return getattr(importlib.import_module(f"pages.{modulo}"), f"compute_{modulo}")
+
+
+def extras_calculo(modulo: str, df_crowley=None) -> dict:
+    return {"df_crowley": df_crowley} if modulo == "crowley" else {}
+
+
+@st.cache_resource(show_spinner=False)
+def _fila_precalculo():
+    """Pool do processo + cálculos em andamento (chave -> futuro), compartilhados entre sessões."""
+    return ThreadPoolExecutor(max_workers=TRABALHADORES_PRECALCULO, thread_name_prefix="precalculo"), {}, threading.Lock()
+
+
+def _precalcular(compute, df, filtros, extras):
+    try:
+        compute(df, filtros, **extras)
+    except Exception:
+        # Vai para o log; na tela o erro reaparece quando a página for aberta e calcular de novo
+        print(f"AVISO: pré-cálculo de {compute.__module__}.{compute.__name__} falhou:")
+        traceback.print_exc()
+
+
+def agendar_precalculo(df: pd.DataFrame, filtros: dict, df_crowley=None) -> int:
+    """
+    Agenda em segundo plano o compute_<página> de todas as páginas do
+    relatório para o recorte `df`, guardando os resultados no cache
+    compartilhado (resultado_pagina). Páginas já em cache ou já sendo
+    calculadas por outra sessão são puladas. Retorna quantas foram agendadas.
+    """
+    pool, pendentes, trava = _fila_precalculo()
+    recorte = (frame_key(df), filtros_key(filtros))
+    agendadas = 0
+    with trava:
+        for chave in [k for k, futuro in pendentes.items() if futuro.done()]:
+            del pendentes[chave]
+        for _, modulo, _ in SECOES:
+            compute, extras = funcao_calculo(modulo), extras_calculo(modulo, df_crowley)
+            chave = (modulo,) + recorte
+            if chave in pendentes or compute.em_cache(df, filtros, **extras):
+                continue
+            pendentes[chave] = pool.submit(_precalcular, compute, df, filtros, extras)
+            agendadas += 1
+    return agendadas
+
+
+def precalcular_paginas(df: pd.DataFrame, mes_ini: int, mes_fim: int) -> int:
+    """
+    Chamado a cada execução do app, depois da página ativa: quando o recorte
+    filtrado mudou nesta sessão, agenda o cálculo das demais páginas com os
+    filtros padrão. Sem mudança, não faz nada.
+    """
+    filtros = filtros_padrao(df, mes_ini, mes_fim)
+    chave = f"{frame_key(df)}:{filtros_key(filtros)}"
+    if st.session_state.get("precalculo_chave") == chave:
+        return 0
+    st.session_state.precalculo_chave = chave
+
+    df_crowley, _ = load_crowley_base()
+    return agendar_precalculo(df, filtros, df_crowley)
@@ -0,0 +1,145 @@
+# utils/ranking.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .cache import frame_key
+
+TOP_N_OPCOES = [10, 25, 50]
+
+
+def build_top_n_index(df: pd.DataFrame, n_max: int = max(TOP_N_OPCOES)) -> dict:
+    """
+    Índice de rankings: para cada (emissora, ano), os n_max maiores clientes
+    por faturamento, já ordenados.
+
+    Monta o cubo agregado (emissora×ano) × cliente uma única vez e seleciona o
+    top-N de todos os grupos com um só argpartition por linha do cubo. Trocar
+    de emissora/ano ou de N vira uma consulta ao dicionário (+ head(N)).
+
+    Empates de faturamento são desfeitos pelo nome do cliente (ordem
+    alfabética), inclusive na fronteira do corte: cada grupo tem no máximo
+    n_max clientes e head(N) devolve exatamente N, na mesma ordem do rank de
+    build_rank_table. O índice não tem dimensão de meses: o recorte de meses
+    já vem aplicado em df e entra na chave do cache (frame_key).
+    """
+    if df.empty:
+        return {}
+
+    agg = df.groupby(["emissora", "ano", "cliente"], observed=True)["faturamento"].sum()
+    grupos, grupos_uni = pd.factorize(agg.index.droplevel("cliente"))
+    # Códigos em ordem alfabética: o menor código vence o empate
+    cli_codes, cli_uni = pd.factorize(agg.index.get_level_values("cliente"), sort=True)
+
+    # Cubo denso: -inf marca cliente sem faturamento no grupo
+    cubo = np.full((len(grupos_uni), len(cli_uni)), -np.inf)
+    cubo[grupos, cli_codes] = agg.to_numpy(dtype=np.float64)
+
+    k = min(n_max, cubo.shape[1])
+    if k < cubo.shape[1]:
+        # k-ésimo maior valor de cada grupo; entre os empatados nele entram
+        # os de menor código até completar k
+        limiar = -np.partition(-cubo, k - 1, axis=1)[:, k - 1:k]
+        acima = cubo > limiar
+        empate = cubo == limiar
+        vagas = k - acima.sum(axis=1, keepdims=True)
+        selecao = acima | (empate & (np.cumsum(empate, axis=1) <= vagas))
+        top_idx = np.nonzero(selecao)[1].reshape(cubo.shape[0], k)
+    else:
+        top_idx = np.broadcast_to(np.arange(k), (cubo.shape[0], k))
+    top_val = np.take_along_axis(cubo, top_idx, axis=1)
+
+    ordem = np.lexsort((top_idx, -top_val), axis=1)
+    top_idx = np.take_along_axis(top_idx, ordem, axis=1)
+    top_val = np.take_along_axis(top_val, ordem, axis=1)
+
+    indice = {}
+    for g, (emissora, ano) in enumerate(grupos_uni):
+        validos = np.isfinite(top_val[g])
+        indice[(emissora, int(ano))] = pd.DataFrame({
+            "cliente": cli_uni[top_idx[g][validos]],
+            "faturamento": top_val[g][validos],
+        })
+    return indice
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _top_n_cached(chave: str, n_max: int, _df: pd.DataFrame) -> dict:
+    return build_top_n_index(_df, n_max)
+
+
+def get_top_n_index(df: pd.DataFrame, n_max: int = max(TOP_N_OPCOES)) -> dict:
+    """Versão em cache de build_top_n_index (por versão dos dados e filtros)."""
+    return _top_n_cached(frame_key(df), n_max, df)
+
+
+def build_rank_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rank e percentil de todos os clientes em cada (emissora, ano), com o
+    rank do ano anterior e a variação (positiva = subiu no ranking).
+
+    O rank é a posição no ranking, sem repetição: empates de faturamento são
+    desfeitos pelo nome do cliente, como no índice de build_top_n_index, e
+    rank <= N seleciona exatamente N clientes. O percentil trata os empatados
+    igualmente. O rank anterior vem de um merge do próprio resultado
+    deslocado em um ano.
+    """
+    colunas = ["emissora", "ano", "cliente", "faturamento", "rank", "percentil", "rank_anterior", "delta_rank"]
+    if df.empty:
+        return pd.DataFrame(columns=colunas)
+
+    agg = df.groupby(["emissora", "ano", "cliente"], observed=True, as_index=False)["faturamento"].sum()
+    agg = agg.sort_values(
+        ["emissora", "ano", "faturamento", "cliente"], ascending=[True, True, False, True], kind="stable"
+    ).reset_index(drop=True)
+    por_grupo = agg.groupby(["emissora", "ano"], observed=True)
+    agg["rank"] = por_grupo.cumcount().astype(np.int64) + 1
+    agg["percentil"] = por_grupo["faturamento"].rank(method="max", pct=True) * 100
+
+    anterior = agg[["emissora", "ano", "cliente", "rank"]].rename(columns={"rank": "rank_anterior"})
+    anterior["ano"] = anterior["ano"] + 1
+    agg = agg.merge(anterior, on=["emissora", "ano", "cliente"], how="left")
+    agg["delta_rank"] = agg["rank_anterior"] - agg["rank"]
+    return agg[colunas]
+
+
+def build_rank_movers(rank_table: pd.DataFrame, ano: int, top_n: int) -> pd.DataFrame:
+    """
+    Movimentação do Top N de todas as emissoras entre ano-1 e ano: quem entrou,
+    saiu, subiu, caiu ou manteve a posição. Inclui quem esteve no Top N em
+    qualquer um dos dois anos.
+    """
+    colunas = ["emissora", "cliente", "rank_anterior", "rank", "delta_rank", "percentil", "faturamento", "status"]
+    atual = rank_table[rank_table["ano"] == ano]
+    passado = rank_table[rank_table["ano"] == ano - 1]
+    if atual.empty or passado.empty:
+        return pd.DataFrame(columns=colunas)
+
+    mov = atual[["emissora", "cliente", "rank", "percentil", "faturamento"]].merge(
+        passado[["emissora", "cliente", "rank"]].rename(columns={"rank": "rank_anterior"}),
+        on=["emissora", "cliente"],
+        how="outer",
+    )
+    no_top = mov["rank"].le(top_n).to_numpy()
+    no_top_antes = mov["rank_anterior"].le(top_n).to_numpy()
+    mov = mov[no_top | no_top_antes].copy()
+    no_top = mov["rank"].le(top_n).to_numpy()
+    no_top_antes = mov["rank_anterior"].le(top_n).to_numpy()
+
+    mov["delta_rank"] = mov["rank_anterior"] - mov["rank"]
+    delta = mov["delta_rank"].to_numpy()
+    mov["status"] = np.select(
+        [no_top & ~no_top_antes, ~no_top & no_top_antes, delta > 0, delta < 0],
+        [f"Entrou no Top {top_n}", f"Saiu do Top {top_n}", "Subiu", "Caiu"],
+        default="Manteve",
+    )
+    return mov.sort_values(["emissora", "rank", "rank_anterior"], na_position="last")[colunas].reset_index(drop=True)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _rank_table_cached(chave: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return build_rank_table(_df)
+
+
+def get_rank_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Versão em cache de build_rank_table (por versão dos dados e filtros)."""
+    return _rank_table_cached(frame_key(df), df)
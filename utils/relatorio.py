@@ -0,0 +1,191 @@
+# utils/relatorio.py
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import traceback
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import streamlit as st
+from .cache import data_version, frame_key
+from .export import PacoteZip, TrabalhoExportacao, andamento_exportacao, create_report_package, obter_trabalho
+
+# Páginas do relatório completo: (título, módulo em pages/, sigla usada no nome das abas)
+SECOES = [
+    ("Visão Geral", "visao_geral", "VG"),
+    ("Clientes & Faturamento", "clientes_faturamento", "CF"),
+    ("Perdas & Ganhos", "perdas_ganhos", "PG"),
+    ("Cruzamentos & Interseções", "cruzamentos", "CZ"),
+    ("Top 10", "top10", "T10"),
+    ("Crowley ABC", "crowley", "ABC"),
+    ("Retenção por Coorte", "cohort", "CO"),
+]
+
+# Abaixo disso as seções rodam em sequência (iniciar os processos custa mais que o cálculo)
+LINHAS_PARALELO = 200_000
+
+# Parte do progresso dedicada ao cálculo das seções (o restante é a gravação dos arquivos)
+PESO_CALCULO = 0.7
+
+
+def filtros_relatorio(mes_ini: int, mes_fim: int, show_labels: bool) -> dict:
+    """
+    Estado dos filtros usado pelo relatório: filtros globais + escolhas das
+    páginas guardadas na sessão (anos de comparação, tamanho do ranking,
+    cortes ABC...). O que não estiver na sessão fica no padrão de cada página.
+    """
+    estado = st.session_state
+    return {
+        "mes_ini": int(mes_ini),
+        "mes_fim": int(mes_fim),
+        "show_labels": bool(show_labels),
+        "ano_base": estado.get("filtro_comp_base"),
+        "ano_comp": estado.get("filtro_comp_comp"),
+        "top_n": estado.get("top10_n"),
+        "corte_a": estado.get("abc_corte_a"),
+        "corte_b": estado.get("abc_corte_b"),
+        "top_k": estado.get("abc_top_k"),
+        "granularidade_coorte": "mes" if estado.get("coorte_granularidade") == "Mês" else "ano",
+        "metrica_matriz": estado.get("cruzamentos_metric"),
+    }
+
+
+def _calcular_secao(modulo: str, df: pd.DataFrame, filtros: dict, extras: dict) -> dict:
+    """Executa pages.<modulo>.secao_relatorio (também nos processos do pool)."""
+    pagina = importlib.import_module(f"pages.{modulo}")
+    return pagina.secao_relatorio(df, filtros, **extras)
+
+
+def _em_cache(modulo: str, df: pd.DataFrame, filtros: dict, extras: dict) -> bool:
+    """Se o compute_<página> da seção já está no cache do processo (resultado_pagina)."""
+    pagina = importlib.import_module(f"pages.{modulo}")
+    return getattr(pagina, f"compute_{modulo}").em_cache(df, filtros, **extras)
+
+
+@contextlib.contextmanager
+def _main_limpo():
+    """
+    Troca sys.modules["__main__"] por um módulo vazio enquanto os processos
+    do pool são criados. No contexto "spawn" cada processo reimporta o
+    __main__ do pai; sob `streamlit run` ele é o app.py, que no processo
+    filho (sem sessão) falha nos cookies e quebra o pool. O original só é
+    devolvido se o Streamlit não tiver trocado o __main__ nesse meio-tempo.
+    """
+    original = sys.modules["__main__"]
+    limpo = types.ModuleType("__main__")
+    sys.modules["__main__"] = limpo
+    try:
+        yield
+    finally:
+        if sys.modules.get("__main__") is limpo:
+            sys.modules["__main__"] = original
+
+
+def calcular_secoes(df: pd.DataFrame, filtros: dict, df_crowley=None, progresso=None, paralelo: bool = True) -> dict:
+    """
+    Tabelas e gráficos de todas as páginas, sem Streamlit.
+
+    Seções cujo compute_<página> já está em cache são montadas no próprio
+    processo. As demais são independentes e rodam num pool de processos
+    (contexto "spawn", criados sem reimportar o app.py); se o pool falhar
+    (o motivo vai para o log) ou se a base for pequena (menos de
+    LINHAS_PARALELO linhas), as seções restantes rodam em sequência.
+    Retorna {título: (sigla, itens)} na ordem de SECOES.
+    """
+    tarefas = {
+        titulo: (modulo, {"df_crowley": df_crowley} if modulo == "crowley" else {})
+        for titulo, modulo, _ in SECOES
+    }
+    resultados = {}
+
+    def concluir(titulo, itens):
+        resultados[titulo] = itens
+        if progresso is not None:
+            progresso(len(resultados) / len(tarefas), titulo)
+
+    pendentes = {}
+    for titulo, (modulo, extras) in tarefas.items():
+        if _em_cache(modulo, df, filtros, extras):
+            concluir(titulo, _calcular_secao(modulo, df, filtros, extras))
+        else:
+            pendentes[titulo] = (modulo, extras)
+
+    if paralelo and len(pendentes) > 1 and len(df) >= LINHAS_PARALELO:
+        try:
+            contexto = multiprocessing.get_context("spawn")
+            trabalhadores = min(len(pendentes), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=trabalhadores, mp_context=contexto) as pool:
+                # Os processos nascem nos submit (um por tarefa até o limite)
+                with _main_limpo():
+                    futuros = {
+                        pool.submit(_calcular_secao, modulo, df, filtros, extras): titulo
+                        for titulo, (modulo, extras) in pendentes.items()
+                    }
+                for futuro in as_completed(futuros):
+                    concluir(futuros[futuro], futuro.result())
+        except Exception as e:
+            # Segue em sequência com o que faltou (erros reais da seção reaparecem abaixo)
+            print(f"AVISO: pool de processos do relatório falhou, seções restantes em sequência: {e!r}")
+            traceback.print_exc()
+
+    for titulo, (modulo, extras) in tarefas.items():
+        if titulo not in resultados:
+            concluir(titulo, _calcular_secao(modulo, df, filtros, extras))
+
+    return {titulo: (sigla, resultados[titulo]) for titulo, _, sigla in SECOES}
+
+
+def gerar_relatorio(df: pd.DataFrame, filtros: dict, df_crowley=None, progresso=None) -> PacoteZip:
+    """Calcula todas as seções e grava o pacote (XLSX único + HTML único dos gráficos)."""
+    def progresso_calculo(fracao, titulo):
+        if progresso is not None:
+            progresso(fracao * PESO_CALCULO, titulo)
+
+    def progresso_gravacao(fracao, nome):
+        if progresso is not None:
+            progresso(PESO_CALCULO + fracao * (1 - PESO_CALCULO), nome)
+
+    secoes = calcular_secoes(df, filtros, df_crowley, progresso=progresso_calculo)
+    return create_report_package(secoes, progresso=progresso_gravacao)
+
+
+def _executar_relatorio(trabalho: TrabalhoExportacao, df, filtros, df_crowley) -> PacoteZip:
+    def progresso(fracao, nome):
+        trabalho.progresso = fracao
+        trabalho.etapa = nome
+
+    trabalho.etapa = "Calculando as páginas"
+    return gerar_relatorio(df, filtros, df_crowley, progresso=progresso)
+
+
+def chave_relatorio(df: pd.DataFrame, filtros: dict, df_crowley=None) -> str:
+    """Recorte da base (versão + filtros), opções do relatório e versão da base Crowley."""
+    crowley = data_version(df_crowley) if df_crowley is not None and not df_crowley.empty else "-"
+    return f"relatorio:{frame_key(df)}:{json.dumps(filtros, sort_keys=True, default=str)}:{crowley}"
+
+
+def dialogo_relatorio(df: pd.DataFrame, filtros: dict, df_crowley=None, estado: str = "show_relatorio"):
+    """Diálogo do relatório completo: gera em segundo plano e oferece o download ao terminar."""
+
+    @st.dialog("Relatório Completo")
+    def relatorio_dialog():
+        st.write(
+            "Gera as tabelas e gráficos de **todas as páginas** com os filtros atuais: "
+            "uma planilha (uma aba por tabela) e um único HTML com todos os gráficos."
+        )
+
+        chave = chave_relatorio(df, filtros, df_crowley)
+        trabalho = obter_trabalho(chave)
+        if trabalho is None and st.button("Gerar relatório", key=f"{estado}_gerar", type="primary"):
+            trabalho = obter_trabalho(chave, _executar_relatorio, df, filtros, df_crowley)
+        if trabalho is not None:
+            andamento_exportacao(trabalho, estado, "Relatorio_Completo.zip")
+
+        if st.button("Cancelar", key="cancel_relatorio", type="secondary"):
+            st.session_state[estado] = False
+            st.rerun()
+
+    relatorio_dialog()
@@ -0,0 +1,114 @@
+# utils/tabela.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from .format import brl_array
+
+COR_POSITIVO = "color: #16a34a; font-weight: 600;" # verde
+COR_NEGATIVO = "color: #dc2626; font-weight: 600;" # vermelho
+
+POR_PAGINA = 25
+
+
+def formatar_coluna(valores, formato: str) -> np.ndarray:
+    """
+    Formata uma coluna inteira de uma vez.
+    formato: "brl" (R$ completo), "pct" ("12.34%"), "int" (inteiro) ou "texto".
+    Vazios viram "—".
+    """
+    valores = np.asarray(valores)
+    if formato == "brl":
+        return brl_array(valores)
+    if formato == "texto":
+        return valores.astype(str).astype(object)
+
+    numeros = valores.astype(np.float64)
+    nulos = np.isnan(numeros)
+    if formato == "pct":
+        texto = np.char.mod("%.2f%%", np.where(nulos, 0.0, numeros))
+    else:
+        texto = np.rint(np.where(nulos, 0.0, numeros)).astype(np.int64).astype(str)
+    return np.where(nulos, "—", texto).astype(object)
+
+
+def _estilos_sinal(sinais: np.ndarray) -> np.ndarray:
+    """Vetor de sinais (-1, 0, 1) -> CSS da célula."""
+    return np.where(sinais > 0, COR_POSITIVO, np.where(sinais < 0, COR_NEGATIVO, ""))
+
+
+def tabela_paginada(
+    df: pd.DataFrame,
+    key: str,
+    formatos: dict,
+    colunas_sinal: list = (),
+    coluna_busca: str = None,
+    linha_fixa: str = None,
+    por_pagina: int = POR_PAGINA,
+    column_config: dict = None,
+):
+    """
+    Exibe uma tabela com formatação e cores calculadas por coluna (vetorizadas)
+    e envia ao navegador só a página visível.
+
+    - formatos: {coluna: "brl" | "pct" | "int" | "texto"}; colunas fora do dict vão como estão.
+    - colunas_sinal: colunas coloridas pelo sinal (verde/vermelho), a partir do valor bruto.
+    - coluna_busca: coluna usada na busca por texto.
+    - linha_fixa: valor de coluna_busca da linha que fica sempre no fim (ex.: "Totalizador").
+
+    Busca, ordenação e paginação são feitas no servidor (sobre os valores
+    brutos); com até `por_pagina` linhas os controles não aparecem.
+    """
+    if df.empty:
+        st.dataframe(df, hide_index=True, width="stretch", column_config=column_config)
+        return
+
+    fixa = pd.Series(False, index=df.index)
+    if linha_fixa is not None and coluna_busca is not None:
+        fixa = df[coluna_busca] == linha_fixa
+    corpo, rodape = df[~fixa], df[fixa]
+
+    if len(corpo) > por_pagina:
+        colunas_ordem = [c for c in df.columns if c != "#"]
+        col_busca, col_ordem, col_dir, col_pag = st.columns([2, 1.5, 1, 1])
+        with col_busca:
+            termo = st.text_input(
+                "Buscar", key=f"{key}_busca", placeholder=f"Buscar {coluna_busca or ''}".strip()
+            ) if coluna_busca else ""
+        with col_ordem:
+            ordem = st.selectbox("Ordenar por", colunas_ordem, key=f"{key}_ordem")
+        with col_dir:
+            direcao = st.selectbox("Ordem", ["Crescente", "Decrescente"], key=f"{key}_direcao")
+
+        if termo:
+            corpo = corpo[corpo[coluna_busca].astype(str).str.contains(termo, case=False, regex=False)]
+
+        valores_ordem = corpo[ordem]
+        if pd.api.types.is_numeric_dtype(valores_ordem):
+            posicoes = np.argsort(valores_ordem.to_numpy(dtype=np.float64), kind="stable")
+        else:
+            posicoes = np.argsort(valores_ordem.astype(str).str.lower().to_numpy(), kind="stable")
+        if direcao == "Decrescente":
+            posicoes = posicoes[::-1]
+
+        n_paginas = max(1, -(-len(corpo) // por_pagina))
+        with col_pag:
+            pagina = st.number_input("Página", min_value=1, max_value=n_paginas, value=1, step=1, key=f"{key}_pagina")
+        pagina = min(int(pagina), n_paginas)
+        inicio = (pagina - 1) * por_pagina
+        corpo = corpo.iloc[posicoes[inicio:inicio + por_pagina]]
+        st.caption(f"{len(valores_ordem)} linhas · página {pagina} de {n_paginas}")
+
+    visivel = pd.concat([corpo, rodape]) if not rodape.empty else corpo
+
+    # Formatação e estilos só das linhas visíveis, uma coluna de cada vez
+    exibicao = pd.DataFrame(
+        {c: formatar_coluna(visivel[c].to_numpy(), formatos[c]) if c in formatos else visivel[c].to_numpy()
+         for c in visivel.columns}
+    )
+    estilos = pd.DataFrame("", index=exibicao.index, columns=exibicao.columns)
+    for c in colunas_sinal:
+        sinais = np.sign(np.nan_to_num(visivel[c].to_numpy(dtype=np.float64)))
+        estilos[c] = _estilos_sinal(sinais)
+
+    conteudo = exibicao.style.apply(lambda _: estilos, axis=None) if len(colunas_sinal) else exibicao
+    st.dataframe(conteudo, hide_index=True, width="stretch", column_config=column_config)
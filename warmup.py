@@ -0,0 +1,38 @@
+# warmup.py
+"""
+Aquecimento dos caches em disco antes de subir o servidor: lê a base
+principal e a Crowley, gravando o cache colunar e o mapeamento de entidades
+(resolução de clientes) em data/.cache, e mostra o tempo de cada etapa.
+Os caches em memória (índices, agregados, resultados das páginas) morrem
+com este processo; eles são aquecidos pelo próprio servidor, em segundo
+plano, a partir da primeira sessão autenticada (utils/aquecimento.py).
+
+Uso (na raiz do projeto, no deploy ou depois de trocar a planilha):
+    python warmup.py && streamlit run app.py
+"""
+import os
+import sys
+import time
+
+import streamlit.logger
+
+# Fora do `streamlit run` os caches ficam em memória; os avisos disso só poluem a saída
+streamlit.logger.set_log_level("error")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.aquecimento import aquecer_disco
+
+
+def main():
+    inicio = time.perf_counter()
+    print("Aquecimento dos caches em disco:")
+    df, _ = aquecer_disco()
+    if df is None:
+        print("  Nenhuma base válida encontrada em data/.")
+        return 1
+    print(f"  {'Total':<48} {time.perf_counter() - inicio:8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())